@@ -8,6 +8,8 @@ from src.shared.config.settings import settings
 from src.shared.models.organization import Organization
 from src.shared.models.work import Work, Category
 from src.shared.models.office import Office, Geo
+from src.shared.models.search import OrganizationSearch
+from src.shared.models.cache import CacheTagVersion
 from src.shared.models.base import Base
 from alembic import context
 
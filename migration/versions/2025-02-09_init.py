@@ -74,7 +74,7 @@ def downgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
     op.drop_index(op.f('ix_geo_office_id'), table_name='geo')
     op.drop_index(op.f('ix_geo_geo_id'), table_name='geo')
-    op.drop_index('idx_geo_geog', table_name='geo', postgresql_using='gist')
+    op.drop_index('idx_geo_geog', table_name='geo', postgresql_using='gist', if_exists=True)
     op.drop_table('geo')
     op.drop_index(op.f('ix_works_work_id'), table_name='works')
     op.drop_index(op.f('ix_works_org_id'), table_name='works')
@@ -0,0 +1,30 @@
+"""cache tag versions
+
+Revision ID: 4f2e8b61a3c9
+Revises: 9a4c7e2d5b18
+Create Date: 2026-10-18 18:12:07.402311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2e8b61a3c9'
+down_revision: Union[str, None] = '9a4c7e2d5b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('cache_tag_versions',
+    sa.Column('tag', sa.VARCHAR(length=255), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('tag')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cache_tag_versions')
@@ -0,0 +1,30 @@
+"""category ltree
+
+Revision ID: 6d2b8f41c9a7
+Revises: f09a6c3b8e21
+Create Date: 2026-10-18 14:12:08.315947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.shared.models.types import LTREE, PATH_TO_LTREE_SQL
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2b8f41c9a7'
+down_revision: Union[str, None] = 'f09a6c3b8e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS ltree')
+    op.add_column('categories', sa.Column('tree', LTREE(), sa.Computed(PATH_TO_LTREE_SQL, persisted=True), nullable=False))
+    op.create_index('ix_categories_tree_gist', 'categories', ['tree'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_categories_tree_gist', table_name='categories', postgresql_using='gist')
+    op.drop_column('categories', 'tree')
@@ -0,0 +1,26 @@
+"""geo geometry index
+
+Revision ID: 9a4c7e2d5b18
+Revises: 6d2b8f41c9a7
+Create Date: 2026-10-18 16:03:41.207519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c7e2d5b18'
+down_revision: Union[str, None] = '6d2b8f41c9a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_geo_geom_gist', 'geo', [sa.text('geometry(geog)')], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_geo_geom_gist', table_name='geo', postgresql_using='gist')
@@ -0,0 +1,27 @@
+"""geo gist index
+
+Revision ID: f09a6c3b8e21
+Revises: b52d9e0f7c14
+Create Date: 2026-10-18 13:05:52.661830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f09a6c3b8e21'
+down_revision: Union[str, None] = 'b52d9e0f7c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # В init индекс закомментирован, но базы, созданные через metadata.create_all,
+    # уже получили его от geoalchemy2 (spatial_index=True)
+    op.create_index('idx_geo_geog', 'geo', ['geog'], unique=False, postgresql_using='gist', if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_geo_geog', table_name='geo', postgresql_using='gist', if_exists=True)
@@ -0,0 +1,57 @@
+"""organization search projection
+
+Revision ID: 3e7a05c4d1f8
+Revises: 8c1f4e2a9b37
+Create Date: 2026-10-18 11:40:05.927114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import geoalchemy2
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7a05c4d1f8'
+down_revision: Union[str, None] = '8c1f4e2a9b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('organization_search',
+    sa.Column('org_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.VARCHAR(length=255), nullable=False),
+    sa.Column('address', sa.VARCHAR(length=255), nullable=False),
+    sa.Column('phones', postgresql.ARRAY(sa.VARCHAR(length=255)), nullable=False),
+    sa.Column('categories_titles', postgresql.ARRAY(sa.VARCHAR(length=255)), nullable=False),
+    sa.Column('categories_paths', postgresql.ARRAY(sa.VARCHAR(length=255)), nullable=False),
+    sa.Column('geog', geoalchemy2.types.Geography(geometry_type='POINT', srid=4326, from_text='ST_GeogFromText', name='geography', nullable=False), nullable=False, comment='WGS84'),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.org_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('org_id')
+    )
+    # Первичное заполнение проекции из нормализованных таблиц
+    op.execute("""
+        INSERT INTO organization_search
+            (org_id, title, address, phones, categories_titles, categories_paths, geog)
+        SELECT
+            o.org_id,
+            o.title,
+            f.address,
+            array_remove(array_agg(DISTINCT p.phone), NULL),
+            array_remove(array_agg(DISTINCT c.title), NULL),
+            array_remove(array_agg(DISTINCT c.path), NULL),
+            g.geog
+        FROM organizations o
+        JOIN offices f ON o.org_id = f.org_id
+        JOIN geo g ON f.office_id = g.office_id
+        LEFT JOIN phones p ON o.org_id = p.org_id
+        LEFT JOIN works w ON o.org_id = w.org_id
+        LEFT JOIN categories c ON w.category_id = c.category_id
+        GROUP BY o.org_id, f.office_id, g.geo_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('organization_search')
@@ -0,0 +1,30 @@
+"""trigram indexes
+
+Revision ID: b52d9e0f7c14
+Revises: 3e7a05c4d1f8
+Create Date: 2026-10-18 12:31:17.204559
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52d9e0f7c14'
+down_revision: Union[str, None] = '3e7a05c4d1f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_organizations_title_trgm', 'organizations', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_categories_title_trgm', 'categories', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_offices_address_trgm', 'offices', ['address'], unique=False, postgresql_using='gin', postgresql_ops={'address': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_offices_address_trgm', table_name='offices', postgresql_using='gin')
+    op.drop_index('ix_categories_title_trgm', table_name='categories', postgresql_using='gin')
+    op.drop_index('ix_organizations_title_trgm', table_name='organizations', postgresql_using='gin')
@@ -0,0 +1,51 @@
+"""unique category path
+
+Revision ID: 8c1f4e2a9b37
+Revises: 26377238d2ed
+Create Date: 2026-10-18 10:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f4e2a9b37'
+down_revision: Union[str, None] = '26377238d2ed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Переводим works на минимальный category_id среди категорий с одинаковым path
+    op.execute("""
+        UPDATE works w
+        SET category_id = d.keep_id
+        FROM (
+            SELECT category_id, min(category_id) OVER (PARTITION BY path) AS keep_id
+            FROM categories
+        ) d
+        WHERE w.category_id = d.category_id
+          AND d.category_id <> d.keep_id
+    """)
+    # После схлопывания у организации могут появиться одинаковые связи
+    op.execute("""
+        DELETE FROM works a
+        USING works b
+        WHERE a.org_id = b.org_id
+          AND a.category_id = b.category_id
+          AND a.work_id > b.work_id
+    """)
+    op.execute("""
+        DELETE FROM categories a
+        USING categories b
+        WHERE a.path = b.path
+          AND a.category_id > b.category_id
+    """)
+    op.create_index(op.f('ix_categories_path'), 'categories', ['path'], unique=True)
+
+
+def downgrade() -> None:
+    # Удаленные дубликаты не восстанавливаются
+    op.drop_index(op.f('ix_categories_path'), table_name='categories')
@@ -1,17 +1,166 @@
 '''registred operations'''
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from src.api.operations.base import OperationFactory
 from src.api.operations.ogranizations.find import FindOrganization
+from src.api.operations.ogranizations.stream import StreamOrganization
+from src.api.operations.ogranizations.batch import FindOrganizationBatch
+from src.api.operations.ogranizations.facets import FacetOrganization
+from src.api.operations.ogranizations.clusters import ClusterOrganization
+from src.api.operations.categories.tree import CategoryTree
+from src.api.operations.tiles.tile import OrganizationTile
+from src.api.operations.admin.slow_queries import SlowQueries
+from src.api.security.admission import AdmissionController, AdmittedOrganizationQuery
+from src.shared.database.base import get_session, engine
+from src.shared.database.pool import pool_waiting
 from src.shared.queries.organization import OrganizationQuery, OrganizationQueryBuilder
+from src.shared.queries.cache import CachedOrganizationQuery
+from src.shared.queries.category import CategoryQuery
+from src.shared.queries.cluster import ClusterQuery
+from src.shared.queries.tile import TileQuery
+from src.shared.queries.single_flight import SingleFlightOrganizationQuery
+from src.shared.queries.slow import SlowQueryOrganizationQuery, SlowQueryLog
+from src.shared.cache.single_flight import SingleFlight
+from src.shared.cache.base import TaggedCache, LRUCache
+from src.shared.cache.tiles import TileCache
+from src.shared.cache.postgres import PostgresTagVersions
+from src.shared.database.org_aggregate import OrgAggregate
+from src.shared.geo.replica import GeoReplica
+from src.shared.metrics.base import registry, StatsCollector, GaugeCallback
+from src.shared.metrics.multiprocess import WorkerMetrics
+from src.shared.config.settings import settings as shared_settings
+
+
+# Загружается и обновляется в lifespan приложения
+geo_replica = GeoReplica() if shared_settings.GEO_REPLICA_ENABLED else None
+
+# Кэш поиска и тайлов: значения в LRU воркера, версии тегов - в базе,
+# чтобы запись из любого процесса инвалидировала кэш всех воркеров.
+# Версии загружаются и обновляются в lifespan приложения
+tag_versions = PostgresTagVersions(get_session) if shared_settings.CACHE_ENABLED else None
+cache = TaggedCache(
+    LRUCache(shared_settings.CACHE_MAXSIZE, shared_settings.CACHE_TTL),
+    ttl=shared_settings.CACHE_TTL,
+    tag_versions=tag_versions
+) if shared_settings.CACHE_ENABLED else None
+
+
+# Метрики всех воркеров gunicorn для /metrics, запись - в lifespan приложения
+worker_metrics = WorkerMetrics(shared_settings.METRICS_DIR) if shared_settings.METRICS_DIR else None
+
+
+def org_aggregate(session: AsyncSession) -> OrgAggregate:
+    """
+    Агрегат записи организаций, который инвалидирует кэш приложения.
+    Любая загрузка данных должна идти через него.
+    """
+    return OrgAggregate(session, cache=cache)
 
 
 def bootstrap() -> OperationFactory:
     factory = OperationFactory()
+    organization_query = OrganizationQuery(
+        OrganizationQueryBuilder(
+            use_projection=shared_settings.USE_SEARCH_PROJECTION,
+            replica=geo_replica
+        ),
+        trusted_output=shared_settings.TRUSTED_OUTPUT
+    )
+    admission = None
+    if shared_settings.ADMISSION_ENABLED:
+        admission = AdmissionController(lambda: pool_waiting(engine.pool))
+        registry.register(
+            'admission',
+            StatsCollector('admission', lambda: admission.stats, gauges={'in_flight'})
+        )
+    find_query = organization_query
+    slow_query_log = SlowQueryLog()
+    if shared_settings.SLOW_QUERY_ENABLED:
+        find_query = SlowQueryOrganizationQuery(find_query, slow_query_log, get_session)
+    if shared_settings.SINGLE_FLIGHT_ENABLED:
+        single_flight = SingleFlight()
+        find_query = SingleFlightOrganizationQuery(find_query, single_flight)
+        registry.register('single_flight', StatsCollector('single_flight', lambda: single_flight.stats))
+    if admission is not None:
+        # Под кэшем: ответ из кэша не проходит допуск и не тратит лимит клиента
+        find_query = AdmittedOrganizationQuery(find_query, admission)
+    tile_cache = None
+    if cache is not None:
+        find_query = CachedOrganizationQuery(find_query, cache)
+        tile_cache = TileCache(
+            LRUCache(shared_settings.TILE_CACHE_MAXSIZE, shared_settings.TILE_CACHE_TTL),
+            cache
+        )
+        registry.register('cache', StatsCollector('cache', lambda: cache.stats))
+        registry.register('tile_cache', StatsCollector('tile_cache', lambda: tile_cache.stats))
+    registry.register(
+        'db_pool',
+        StatsCollector('db_pool', lambda: getattr(engine.pool, 'stats', None), gauges={'wait_seconds_max', 'waiting'})
+    )
+    if hasattr(engine.pool, 'checkedout'):
+        # У NullPool (профиль test) нет постоянных соединений
+        registry.register(
+            'db_pool_checked_out',
+            GaugeCallback('db_pool_checked_out', 'Соединений пула, выданных сессиям', engine.pool.checkedout)
+        )
     factory.register(
         key='find_organization',
         operation_class=FindOrganization,
         dependencies={
-            'query': OrganizationQuery(OrganizationQueryBuilder())
+            'query': find_query
+        }
+    )
+    factory.register(
+        key='find_organization_batch',
+        operation_class=FindOrganizationBatch,
+        dependencies={
+            'query': find_query,
+            'session_factory': get_session,
+            'concurrency': shared_settings.FIND_BATCH_CONCURRENCY
+        }
+    )
+    factory.register(
+        key='facet_organization',
+        operation_class=FacetOrganization,
+        dependencies={
+            'query': find_query
+        }
+    )
+    factory.register(
+        key='stream_organization',
+        operation_class=StreamOrganization,
+        dependencies={
+            'query': organization_query,
+            'admission': admission
+        }
+    )
+    factory.register(
+        key='cluster_organization',
+        operation_class=ClusterOrganization,
+        dependencies={
+            'query': ClusterQuery()
+        }
+    )
+    factory.register(
+        key='organization_tile',
+        operation_class=OrganizationTile,
+        dependencies={
+            'query': TileQuery(tile_cache)
+        }
+    )
+    factory.register(
+        key='slow_queries',
+        operation_class=SlowQueries,
+        dependencies={
+            'log': slow_query_log
+        }
+    )
+    factory.register(
+        key='category_tree',
+        operation_class=CategoryTree,
+        dependencies={
+            'query': CategoryQuery()
         }
     )
     return factory
@@ -1,12 +1,20 @@
+from typing import Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", env_ignore_empty=True)
     PROJECT_NAME: str = "API"
     API_VERSION: str = "/api/v1"
     SECRET_KEY: str
+    # Ключ из SECRET_KEY (generate_signature) принимается как клиент default
+    API_LEGACY_SIGNATURE: bool = True
+    # JSON файл ключей клиентов (ClientKeysI), None - только ключ из SECRET_KEY
+    API_KEYS_FILE: Optional[str] = None
+    # Как часто проверять изменения файла ключей, секунд
+    API_KEYS_RELOAD_INTERVAL: float = 5.0
     
     
     CORS_HEADERS: list[str] = Field(
@@ -26,7 +34,7 @@ class Settings(BaseSettings):
     )
     
     CORS_METHODS: list[str] = Field(
-        default=["GET"],
+        default=["GET", "POST"],
         title="Допустимые http методы",
     )
 
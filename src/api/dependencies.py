@@ -1,24 +1,66 @@
 from src.shared.database.base import get_session
-from typing import Annotated
-from fastapi import Depends, HTTPException, status
+from typing import Annotated, Any, Callable, Optional, Type
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import APIKeyHeader
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.api.security.security import verify_signature
-from src.api.config.settings import settings
+from src.api.security.keys import KeyStore, ApiClient
+from src.api.exceptoins.base import ForbiddenException, TooManyRequestsException
+from src.api.utils.query_parser import UnionQueryParser
 
 
 signature_header = APIKeyHeader(name="X-Signature")
 session_dependency = Annotated[AsyncSession, Depends(get_session)]
 
+key_store = KeyStore()
+
 async def verify_request_signature(
+    request: Request,
     signature: str = Depends(signature_header)
-):
+) -> ApiClient:
     """
-    Проверяет подпись из заголовка X-Signature на соответствие секретному ключу
+    Находит клиента по ключу из заголовка X-Signature и списывает запрос с его лимита
     """
-    if not verify_signature(signature):
+    client = key_store.get(signature)
+    if client is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Неверная подпись"
         )
-    return True
\ No newline at end of file
+    retry_after = client.acquire()
+    if retry_after:
+        raise TooManyRequestsException("Превышен лимит запросов клиента", retry_after)
+    request.state.client = client
+    return client
+
+
+def authorize_query(request: Request, query: Any):
+    """
+    Проверяет, что клиенту запроса разрешен тип запроса поиска
+    """
+    client: ApiClient = request.state.client
+    if not client.allows(type(query).__name__):
+        raise ForbiddenException(f"Тип запроса {type(query).__name__} недоступен клиенту")
+
+
+def require_admin(request: Request):
+    """
+    Пускает только клиентов с admin: /admin отдает запросы и SQL других клиентов
+    """
+    client: ApiClient = request.state.client
+    if not client.admin:
+        raise ForbiddenException("Доступно только администраторам")
+
+
+def authorized_query(union_type: Type, parse: Optional[Callable] = None) -> Any:
+    """
+    Зависимость FastAPI: разбор Union запроса (UnionQueryParser.parse
+    или своя обертка над ним) и проверка, что его тип разрешен клиенту
+    """
+    if parse is None:
+        parse = UnionQueryParser.parse(union_type)
+
+    async def dependency(request: Request, query: Any = Depends(parse)) -> Any:
+        authorize_query(request, query)
+        return query
+
+    return dependency
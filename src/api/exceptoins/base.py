@@ -1,11 +1,42 @@
+import math
+from typing import Optional
+
 from fastapi import HTTPException
 
 
 class BaseException(HTTPException):
-    def __init__(self, status_code: int, detail: str):
-        super().__init__(status_code=status_code, detail=detail)
+    def __init__(self, status_code: int, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
 
 
 class ServerException(BaseException):
     def __init__(self, detail: str):
         super().__init__(status_code=500, detail=detail)
+
+
+class BadRequestException(BaseException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=400, detail=detail)
+
+
+class ForbiddenException(BaseException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=403, detail=detail)
+
+
+class TooManyRequestsException(BaseException):
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(
+            status_code=429,
+            detail=detail,
+            headers={'Retry-After': str(max(1, math.ceil(retry_after)))}
+        )
+
+
+class ServiceUnavailableException(BaseException):
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail=detail,
+            headers={'Retry-After': str(max(1, math.ceil(retry_after)))}
+        )
@@ -1,9 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.api.routers import operations
+from src.api.routers import operations, tiles, admin
+from src.api.routers.metrics import metrics
 from src.api.config.settings import settings
-from src.api.dependencies import verify_request_signature
+from src.api.dependencies import verify_request_signature, key_store
+from src.api.bootstrap import geo_replica, tag_versions, worker_metrics
+from src.shared.database.base import get_session
+
+
+@asynccontextmanager
+async def lifespan(fastapi_app: FastAPI):
+    tasks = []
+    if key_store.path is not None:
+        tasks.append(asyncio.create_task(key_store.run()))
+    if geo_replica is not None:
+        # Запросы по радиусу и боксу ждут кандидатов из копии, поэтому она грузится до старта
+        async with get_session() as session:
+            await geo_replica.refresh(session)
+        tasks.append(asyncio.create_task(geo_replica.run(get_session)))
+    if tag_versions is not None:
+        # Версии тегов кэша читаются из памяти: до старта грузятся все записанные
+        await tag_versions.load()
+        tasks.append(asyncio.create_task(tag_versions.run()))
+    if worker_metrics is not None:
+        tasks.append(asyncio.create_task(worker_metrics.run()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        if worker_metrics is not None:
+            worker_metrics.remove()
 
 
 
@@ -11,7 +42,8 @@ def create_app():
     fastapi_app = FastAPI(
         title=settings.PROJECT_NAME,
         openapi_url=f"{settings.API_VERSION}/openapi.json",
-        dependencies=[Depends(verify_request_signature)]
+        dependencies=[Depends(verify_request_signature)],
+        lifespan=lifespan
     )
 
     fastapi_app.add_middleware(
@@ -25,6 +57,15 @@ def create_app():
         operations.router,
         prefix=settings.API_VERSION,
     )
+    fastapi_app.include_router(
+        tiles.router,
+        prefix=settings.API_VERSION,
+    )
+    fastapi_app.include_router(
+        admin.router,
+        prefix=settings.API_VERSION,
+    )
+    fastapi_app.add_route('/metrics', metrics, include_in_schema=False)
 
     return fastapi_app
 
@@ -0,0 +1,12 @@
+from src.api.operations.base import Operation
+from src.shared.queries.slow import SlowQueryLog
+from src.shared.schemas.diagnostics import SlowQueryO
+
+
+class SlowQueries(Operation):
+    
+    def __init__(self, log: SlowQueryLog):
+        self._log = log
+        
+    async def __call__(self, limit: int) -> list[SlowQueryO]:
+        return self._log.records()[:limit]
@@ -0,0 +1,24 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.api.operations.base import Operation
+from src.api.exceptoins.base import ServerException
+from src.shared.schemas.category import CategoryTreeQuery, CategoryTreeO
+from src.shared.queries.category import CategoryQuery
+
+
+class CategoryTree(Operation):
+    
+    def __init__(self, query: CategoryQuery):
+        self._query = query
+        
+    async def __call__(
+        self,
+        session: AsyncSession,
+        query: CategoryTreeQuery
+        ) -> CategoryTreeO:
+        try:
+            async with session as s:
+                return await self._query.find(s, query=query)
+        except SQLAlchemyError as e:
+            raise ServerException(str(e)) from e
@@ -0,0 +1,102 @@
+import asyncio
+from typing import AsyncContextManager, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.api.operations.base import Operation
+from src.api.exceptoins.base import ServerException, BadRequestException
+from src.api.security.admission import charged_to
+from src.api.security.keys import ApiClient
+from src.shared.schemas.organization import (
+    OrganizationQueryI,
+    OrganizationPageO,
+    OrganizationBatchO,
+    OrgIdQuery
+)
+from src.shared.queries.organization import OrganizationQuery
+
+
+class FindOrganizationBatch(Operation):
+    
+    def __init__(
+        self,
+        query: OrganizationQuery,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+        concurrency: int
+    ):
+        self._query = query
+        self._session_factory = session_factory
+        self._concurrency = concurrency
+        
+    async def __call__(
+        self,
+        queries: list[OrganizationQueryI],
+        client: Optional[ApiClient] = None
+        ) -> OrganizationBatchO:
+        '''
+        Все OrgIdQuery без курсора объединяются в один запрос org_id = ANY(...),
+        остальные выполняются параллельно, не больше concurrency сессий одновременно.
+        Каждая группа берет свою сессию, так как одна AsyncSession не допускает
+        конкурентных запросов.
+        Каждая группа, не найденная в кэше, проходит допуск с тем же весом,
+        что и отдельный find (объединенный запрос по id - как один OrgIdQuery),
+        с лимита client; отказ любой группы отклоняет весь batch с ее 429/503.
+        '''
+        results: dict[int, OrganizationPageO] = {}
+        by_id = {
+            index: query
+            for index, query in enumerate(queries)
+            if isinstance(query, OrgIdQuery) and query.cursor is None
+        }
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        tasks = [
+            self._find(semaphore, results, index, query)
+            for index, query in enumerate(queries)
+            if index not in by_id
+        ]
+        if by_id:
+            tasks.append(self._find_by_ids(semaphore, results, by_id))
+
+        # Дожидаемся всех групп, чтобы не оставлять запросы без сессии
+        with charged_to(client):
+            errors = [
+                error for error in await asyncio.gather(*tasks, return_exceptions=True)
+                if isinstance(error, BaseException)
+            ]
+        for error in errors:
+            if isinstance(error, ValueError):
+                raise BadRequestException(str(error)) from error
+        for error in errors:
+            if isinstance(error, SQLAlchemyError):
+                raise ServerException(str(error)) from error
+        if errors:
+            raise errors[0]
+        return OrganizationBatchO(results=dict(sorted(results.items())))
+
+    async def _find(
+        self,
+        semaphore: asyncio.Semaphore,
+        results: dict[int, OrganizationPageO],
+        index: int,
+        query: OrganizationQueryI
+    ) -> None:
+        async with semaphore, self._session_factory() as session:
+            results[index] = await self._query.find(session, query=query)
+
+    async def _find_by_ids(
+        self,
+        semaphore: asyncio.Semaphore,
+        results: dict[int, OrganizationPageO],
+        queries: dict[int, OrgIdQuery]
+    ) -> None:
+        org_ids = sorted({query.org_id for query in queries.values()})
+        async with semaphore, self._session_factory() as session:
+            organizations = await self._query.find_by_ids(session, org_ids)
+        for index, query in queries.items():
+            organization = organizations.get(query.org_id)
+            results[index] = OrganizationPageO(
+                items=[organization] if organization is not None else [],
+                next_cursor=None
+            )
@@ -0,0 +1,24 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.api.operations.base import Operation
+from src.api.exceptoins.base import ServerException
+from src.shared.schemas.cluster import GeoClusterQuery, GeoClustersO
+from src.shared.queries.cluster import ClusterQuery
+
+
+class ClusterOrganization(Operation):
+    
+    def __init__(self, query: ClusterQuery):
+        self._query = query
+        
+    async def __call__(
+        self,
+        session: AsyncSession,
+        query: GeoClusterQuery
+        ) -> GeoClustersO:
+        try:
+            async with session as s:
+                return await self._query.find(s, query=query)
+        except SQLAlchemyError as e:
+            raise ServerException(str(e)) from e
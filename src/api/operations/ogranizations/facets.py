@@ -0,0 +1,32 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.api.operations.base import Operation
+from src.api.exceptoins.base import ServerException, BadRequestException
+from src.api.security.admission import charged_to
+from src.api.security.keys import ApiClient
+from src.shared.schemas.organization import OrganizationQueryI, OrganizationFacetsO
+from src.shared.queries.base import BaseQuery
+
+
+class FacetOrganization(Operation):
+    
+    def __init__(self, query: BaseQuery):
+        self._query = query
+        
+    async def __call__(
+        self,
+        session: AsyncSession,
+        query: OrganizationQueryI,
+        client: Optional[ApiClient] = None
+        ) -> OrganizationFacetsO:
+        try:
+            with charged_to(client):
+                async with session as s:
+                    return await self._query.facets(s, query=query)
+        except ValueError as e:
+            raise BadRequestException(str(e)) from e
+        except SQLAlchemyError as e:
+            raise ServerException(str(e)) from e
@@ -1,24 +1,35 @@
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
 from src.api.operations.base import Operation
-from src.api.exceptoins.base import ServerException
-from src.shared.schemas.organization import OrganizationQueryI, OrganizationQueryO
-from src.shared.queries.organization import OrganizationQuery
+from src.api.exceptoins.base import ServerException, BadRequestException
+from src.api.security.admission import charged_to
+from src.api.security.keys import ApiClient
+from src.shared.schemas.organization import OrganizationQueryI, OrganizationPageO
+from src.shared.queries.base import BaseQuery
+from src.shared.metrics.find import FIND_ERRORS
 
 
 class FindOrganization(Operation):
     
-    def __init__(self, query: OrganizationQuery):
+    def __init__(self, query: BaseQuery):
         self._query = query
         
     async def __call__(
         self,
         session: AsyncSession,
-        query: OrganizationQueryI
-        ) -> list[OrganizationQueryO]:
+        query: OrganizationQueryI,
+        client: Optional[ApiClient] = None
+        ) -> OrganizationPageO:
         try:
-            async with session as s:
-                return await self._query.find(s, query=query)
+            with charged_to(client):
+                async with session as s:
+                    return await self._query.find(s, query=query)
+        except ValueError as e:
+            FIND_ERRORS.inc(type(query).__name__)
+            raise BadRequestException(str(e)) from e
         except SQLAlchemyError as e:
+            FIND_ERRORS.inc(type(query).__name__)
             raise ServerException(str(e)) from e
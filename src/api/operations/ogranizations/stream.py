@@ -0,0 +1,61 @@
+import logging
+from contextlib import nullcontext
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.api.operations.base import Operation
+from src.api.security.admission import AdmissionController, ClientCharge
+from src.api.security.keys import ApiClient
+from src.shared.schemas.organization import OrganizationQueryI
+from src.shared.queries.organization import OrganizationQuery
+
+
+logger = logging.getLogger(__name__)
+
+
+class StreamOrganization(Operation):
+    
+    def __init__(self, query: OrganizationQuery, admission: Optional[AdmissionController] = None):
+        self._query = query
+        self._admission = admission
+        
+    async def __call__(
+        self,
+        session: AsyncSession,
+        query: OrganizationQueryI,
+        client: Optional[ApiClient] = None
+        ) -> AsyncIterator[bytes]:
+        '''
+        NDJSON: по одной организации на строку, сериализация по мере чтения курсора.
+        Сессия открывается внутри генератора, так как он выполняется уже после
+        возврата StreamingResponse из endpoint.
+        Допуск проверяется до возврата генератора: отказ приходит статусом 429/503,
+        а не оборванным потоком. Генератор к этому моменту уже запущен, поэтому
+        допуск освобождается в его finally, даже если ответ так и не начнет чтение.
+        '''
+        stream = self._stream(session, query, client)
+        await anext(stream)
+        return stream
+
+    async def _stream(
+        self,
+        session: AsyncSession,
+        query: OrganizationQueryI,
+        client: Optional[ApiClient]
+        ) -> AsyncIterator[bytes]:
+        admission = (
+            self._admission.admit(query, ClientCharge(client))
+            if self._admission is not None else nullcontext()
+        )
+        async with admission:
+            # Первый шаг только занимает допуск, его значение не отправляется
+            yield b''
+            try:
+                async with session as s:
+                    async for organization in self._query.stream(s, query=query):
+                        yield organization.model_dump_json().encode() + b'\n'
+            except SQLAlchemyError:
+                # Статус ответа уже отправлен, остается только оборвать поток
+                logger.exception("Organization stream aborted")
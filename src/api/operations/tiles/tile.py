@@ -0,0 +1,30 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.api.operations.base import Operation
+from src.api.exceptoins.base import ServerException, BadRequestException
+from src.shared.queries.tile import TileQuery
+
+
+class OrganizationTile(Operation):
+    
+    def __init__(self, query: TileQuery):
+        self._query = query
+        
+    async def __call__(
+        self,
+        session: AsyncSession,
+        z: int,
+        x: int,
+        y: int,
+        category_path: Optional[str] = None
+        ) -> bytes:
+        if x >= 2 ** z or y >= 2 ** z:
+            raise BadRequestException(f"Tile {z}/{x}/{y} is out of range")
+        try:
+            async with session as s:
+                return await self._query.find(s, z, x, y, category_path)
+        except SQLAlchemyError as e:
+            raise ServerException(str(e)) from e
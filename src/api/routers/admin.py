@@ -0,0 +1,39 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from src.api.routers.operations import factory
+from src.api.dependencies import require_admin
+from src.api.schemas.base import ErrorResponse
+from src.api.utils.responses import PydanticJSONResponse
+from src.shared.schemas.diagnostics import SlowQueryO
+
+router = APIRouter(
+    prefix='/admin',
+    tags=['Admin'],
+    dependencies=[Depends(require_admin)]
+    )
+
+
+@router.get(
+    '/slow-queries',
+    responses={
+        200: {
+            'model': list[SlowQueryO],
+            'description': 'Последние медленные find воркера, новые первыми (пусто, если SLOW_QUERY_ENABLED выключен)'
+        },
+        403: {
+            'model': ErrorResponse,
+            'description': 'Ошибка проверки подписи запроса или клиент не администратор'
+        },
+        429: {
+            'model': ErrorResponse,
+            'description': 'Превышен лимит запросов клиента, см. заголовок Retry-After'
+        }
+    }
+)
+async def slow_queries(
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100
+) -> list[SlowQueryO]:
+    operation = factory['slow_queries']
+    return await operation(limit)
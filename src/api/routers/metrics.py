@@ -0,0 +1,19 @@
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.api.bootstrap import worker_metrics
+from src.shared.metrics.base import registry
+
+PROMETHEUS_MEDIA_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+async def metrics(request: Request) -> Response:
+    '''
+    Метрики в текстовом формате Prometheus.
+    Подключается как route приложения, а не APIRouter: скрейперу
+    не нужна подпись X-Signature, и в OpenAPI endpoint не попадает.
+    Registry у каждого воркера gunicorn свой: с METRICS_DIR ответ собирает
+    метрики всех воркеров с меткой worker, без него - только принявшего запрос.
+    '''
+    text = worker_metrics.render() if worker_metrics is not None else registry.render()
+    return Response(text, media_type=PROMETHEUS_MEDIA_TYPE)
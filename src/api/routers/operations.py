@@ -1,12 +1,26 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from src.api.bootstrap import bootstrap
 from src.api.utils.openapi import generate_union_openapi_schema
-from src.shared.schemas.organization import OrganizationQueryI, OrganizationQueryO
-from src.api.dependencies import session_dependency
+from src.shared.schemas.organization import (
+    OrganizationQueryI,
+    OrganizationPageO,
+    OrganizationBatchI,
+    OrganizationBatchO,
+    OrganizationFacetsO
+)
+from src.shared.schemas.category import CategoryTreeQuery, CategoryTreeO
+from src.shared.schemas.cluster import GeoClusterQuery, GeoClustersO
+from src.api.dependencies import session_dependency, authorized_query, authorize_query, verify_request_signature
+from src.api.security.keys import ApiClient
 from src.api.exceptoins.base import ServerException
 from src.api.schemas.base import ErrorResponse
 from typing import Annotated
+from functools import wraps
+from time import perf_counter
 from src.api.utils.query_parser import UnionQueryParser
+from src.api.utils.responses import PydanticJSONResponse
+from src.shared.metrics.find import FIND_STAGE_SECONDS
 
 router = APIRouter(
     prefix='/operations',
@@ -15,11 +29,28 @@ router = APIRouter(
 
 factory = bootstrap()
 
+
+def _timed_parser(union_type):
+    """
+    UnionQueryParser.parse с записью этапа parse в метрики find
+    """
+    parse = UnionQueryParser.parse(union_type)
+
+    @wraps(parse)
+    async def parser(**kwargs):
+        started = perf_counter()
+        query = await parse(**kwargs)
+        FIND_STAGE_SECONDS.observe(perf_counter() - started, type(query).__name__, 'parse')
+        return query
+
+    return parser
+
 @router.get(
     '/find/',
+    response_class=PydanticJSONResponse,
     responses={
         200: {
-            'model': list[OrganizationQueryO],
+            'model': OrganizationPageO,
             'description': 'Успешный поиск организаций'
         },
         400: {
@@ -30,15 +61,213 @@ factory = bootstrap()
             'model': ErrorResponse,
             'description': 'Ошибка проверки подписи запроса'
         },
+        429: {
+            'model': ErrorResponse,
+            'description': 'Превышен лимит запросов или стоимости запросов клиента, см. заголовок Retry-After'
+        },
         500: {
             'model': ErrorResponse,
             'description': 'Внутренняя ошибка сервера'
+        },
+        503: {
+            'model': ErrorResponse,
+            'description': 'Перегрузка базы или потолок одновременных запросов типа, см. заголовок Retry-After'
         }
     }
 )
 async def find_organization(
-    query: Annotated[OrganizationQueryI, Depends(UnionQueryParser.parse(OrganizationQueryI))],
+    query: Annotated[
+        OrganizationQueryI,
+        Depends(authorized_query(OrganizationQueryI, parse=_timed_parser(OrganizationQueryI)))
+    ],
+    client: Annotated[ApiClient, Depends(verify_request_signature)],
     session: session_dependency
-) -> list[OrganizationQueryO]:
+) -> PydanticJSONResponse:
     operation = factory['find_organization']
-    return await operation(session, query)
\ No newline at end of file
+    page = await operation(session, query, client=client)
+    # JSON рендерится в конструкторе ответа
+    started = perf_counter()
+    response = PydanticJSONResponse(page)
+    FIND_STAGE_SECONDS.observe(perf_counter() - started, type(query).__name__, 'serialize')
+    return response
+
+
+@router.get(
+    '/find/facets',
+    response_class=PydanticJSONResponse,
+    responses={
+        200: {
+            'model': OrganizationFacetsO,
+            'description': 'Количество найденных организаций по категориям и ячейкам гео-сетки'
+        },
+        400: {
+            'model': ErrorResponse,
+            'description': 'Ошибка валидации параметров запроса'
+        },
+        403: {
+            'model': ErrorResponse,
+            'description': 'Ошибка проверки подписи запроса'
+        },
+        429: {
+            'model': ErrorResponse,
+            'description': 'Превышен лимит запросов или стоимости запросов клиента, см. заголовок Retry-After'
+        },
+        500: {
+            'model': ErrorResponse,
+            'description': 'Внутренняя ошибка сервера'
+        },
+        503: {
+            'model': ErrorResponse,
+            'description': 'Перегрузка базы или потолок одновременных запросов типа, см. заголовок Retry-After'
+        }
+    }
+)
+async def facet_organization(
+    query: Annotated[OrganizationQueryI, Depends(authorized_query(OrganizationQueryI))],
+    client: Annotated[ApiClient, Depends(verify_request_signature)],
+    session: session_dependency
+) -> PydanticJSONResponse:
+    operation = factory['facet_organization']
+    return PydanticJSONResponse(await operation(session, query, client=client))
+
+
+@router.get(
+    '/find/clusters',
+    response_class=PydanticJSONResponse,
+    responses={
+        200: {
+            'model': GeoClustersO,
+            'description': 'Кластеры организаций в окне карты'
+        },
+        403: {
+            'model': ErrorResponse,
+            'description': 'Ошибка проверки подписи запроса'
+        },
+        429: {
+            'model': ErrorResponse,
+            'description': 'Превышен лимит запросов клиента, см. заголовок Retry-After'
+        },
+        500: {
+            'model': ErrorResponse,
+            'description': 'Внутренняя ошибка сервера'
+        }
+    }
+)
+async def cluster_organization(
+    query: Annotated[GeoClusterQuery, Query()],
+    session: session_dependency
+) -> PydanticJSONResponse:
+    operation = factory['cluster_organization']
+    return PydanticJSONResponse(await operation(session, query))
+
+
+@router.post(
+    '/find/batch',
+    response_class=PydanticJSONResponse,
+    responses={
+        200: {
+            'model': OrganizationBatchO,
+            'description': 'Результаты запросов по их индексу в queries'
+        },
+        400: {
+            'model': ErrorResponse,
+            'description': 'Ошибка валидации одного из запросов'
+        },
+        403: {
+            'model': ErrorResponse,
+            'description': 'Ошибка проверки подписи запроса'
+        },
+        429: {
+            'model': ErrorResponse,
+            'description': 'Превышен лимит запросов или стоимости запросов клиента, см. заголовок Retry-After'
+        },
+        500: {
+            'model': ErrorResponse,
+            'description': 'Внутренняя ошибка сервера'
+        },
+        503: {
+            'model': ErrorResponse,
+            'description': 'Перегрузка базы или потолок одновременных запросов типа, см. заголовок Retry-After'
+        }
+    }
+)
+async def find_organization_batch(
+    request: Request,
+    batch: OrganizationBatchI,
+    client: Annotated[ApiClient, Depends(verify_request_signature)]
+) -> PydanticJSONResponse:
+    queries = []
+    for index, item in enumerate(batch.queries):
+        try:
+            query = UnionQueryParser.resolve(OrganizationQueryI, item)
+            authorize_query(request, query)
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail={'index': index, 'error': e.detail}) from e
+        queries.append(query)
+    operation = factory['find_organization_batch']
+    return PydanticJSONResponse(await operation(queries, client=client))
+
+
+@router.get(
+    '/find/stream',
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            'content': {'application/x-ndjson': {}},
+            'description': 'Все найденные организации в формате NDJSON (OrganizationQueryO на строку), без пагинации'
+        },
+        400: {
+            'model': ErrorResponse,
+            'description': 'Ошибка валидации параметров запроса'
+        },
+        403: {
+            'model': ErrorResponse,
+            'description': 'Ошибка проверки подписи запроса'
+        },
+        429: {
+            'model': ErrorResponse,
+            'description': 'Превышен лимит запросов или стоимости запросов клиента, см. заголовок Retry-After'
+        },
+        503: {
+            'model': ErrorResponse,
+            'description': 'Перегрузка базы или потолок одновременных запросов типа, см. заголовок Retry-After'
+        }
+    }
+)
+async def stream_organization(
+    query: Annotated[OrganizationQueryI, Depends(authorized_query(OrganizationQueryI))],
+    client: Annotated[ApiClient, Depends(verify_request_signature)],
+    session: session_dependency
+) -> StreamingResponse:
+    operation = factory['stream_organization']
+    stream = await operation(session, query, client=client)
+    return StreamingResponse(stream, media_type='application/x-ndjson')
+
+
+@router.get(
+    '/categories/tree',
+    responses={
+        200: {
+            'model': CategoryTreeO,
+            'description': 'Дочерние категории с количеством организаций'
+        },
+        403: {
+            'model': ErrorResponse,
+            'description': 'Ошибка проверки подписи запроса'
+        },
+        429: {
+            'model': ErrorResponse,
+            'description': 'Превышен лимит запросов клиента, см. заголовок Retry-After'
+        },
+        500: {
+            'model': ErrorResponse,
+            'description': 'Внутренняя ошибка сервера'
+        }
+    }
+)
+async def category_tree(
+    query: Annotated[CategoryTreeQuery, Query()],
+    session: session_dependency
+) -> CategoryTreeO:
+    operation = factory['category_tree']
+    return await operation(session, query)
@@ -0,0 +1,57 @@
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Path, Query
+from fastapi.responses import Response
+
+from src.api.dependencies import session_dependency
+from src.api.routers.operations import factory
+from src.api.schemas.base import ErrorResponse
+from src.shared.config.settings import settings as shared_settings
+from src.shared.schemas.organization import CATEGORY_PATH_PATTERN
+
+MVT_MEDIA_TYPE = 'application/vnd.mapbox-vector-tile'
+
+router = APIRouter(
+    prefix='/tiles',
+    tags=['Tiles']
+    )
+
+
+@router.get(
+    '/{z}/{x}/{y}.mvt',
+    response_class=Response,
+    responses={
+        200: {
+            'content': {MVT_MEDIA_TYPE: {}},
+            'description': 'Слой organizations (org_id, title) в формате Mapbox Vector Tile'
+        },
+        400: {
+            'model': ErrorResponse,
+            'description': 'Координаты тайла вне сетки уровня z'
+        },
+        403: {
+            'model': ErrorResponse,
+            'description': 'Ошибка проверки подписи запроса'
+        },
+        429: {
+            'model': ErrorResponse,
+            'description': 'Превышен лимит запросов клиента, см. заголовок Retry-After'
+        },
+        500: {
+            'model': ErrorResponse,
+            'description': 'Внутренняя ошибка сервера'
+        }
+    }
+)
+async def organization_tile(
+    z: Annotated[int, Path(ge=0, le=shared_settings.TILE_MAX_ZOOM)],
+    x: Annotated[int, Path(ge=0)],
+    y: Annotated[int, Path(ge=0)],
+    session: session_dependency,
+    category_path: Annotated[Optional[str], Query(pattern=CATEGORY_PATH_PATTERN)] = None
+) -> Response:
+    operation = factory['organization_tile']
+    return Response(
+        content=await operation(session, z, x, y, category_path),
+        media_type=MVT_MEDIA_TYPE
+    )
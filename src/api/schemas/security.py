@@ -0,0 +1,41 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class ClientKeyI(BaseModel):
+    client: str = Field(..., description="Имя клиента")
+    key: str = Field(..., min_length=16, description="Ключ клиента, передается в заголовке X-Signature")
+    rate: Optional[float] = Field(None, gt=0, description="Единиц стоимости запросов в секунду (простой запрос - одна), None - без ограничения")
+    burst: Optional[int] = Field(None, ge=1, description="Запас единиц стоимости сверх rate, по умолчанию rate")
+    query_types: Optional[list[str]] = Field(
+        None,
+        description="Разрешенные типы запросов поиска (имена схем), None - все"
+    )
+    admin: bool = Field(False, description="Доступ к /admin: диагностика с запросами других клиентов")
+
+    @model_validator(mode='after')
+    def set_burst(self):
+        if self.burst is None and self.rate is not None:
+            self.burst = max(1, round(self.rate))
+        return self
+
+
+class ClientKeysI(BaseModel):
+    clients: list[ClientKeyI] = Field(..., description="Ключи клиентов")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "clients": [
+                    {
+                        "client": "mobile",
+                        "key": "3b5d5c3712955042212316173ccf37be",
+                        "rate": 20,
+                        "burst": 40,
+                        "query_types": ["OrgIdQuery", "GeoRadiusQuery", "GeoNearestQuery"]
+                    }
+                ]
+            }
+        }
+    }
@@ -0,0 +1,202 @@
+import math
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.exceptoins.base import TooManyRequestsException, ServiceUnavailableException
+from src.api.security.keys import ApiClient
+from src.shared.config.settings import settings
+from src.shared.models.organization import Organization
+from src.shared.queries.base import BaseQuery
+from src.shared.queries.cost import query_cost
+from src.shared.schemas.organization import (
+    OrganizationQueryI,
+    OrganizationQueryO,
+    OrganizationPageO,
+    OrganizationFacetsO,
+    OrgIdQuery
+)
+
+
+class AdmissionStats(BaseModel):
+    admitted: int = 0
+    # 429: клиент исчерпал лимит своего ключа
+    rejected_rate: int = 0
+    # 503: занят потолок одновременных запросов типа
+    rejected_concurrency: int = 0
+    # 503: к пулу соединений уже стоит очередь
+    rejected_pool: int = 0
+    in_flight: int = 0
+
+
+class _Lane:
+    __slots__ = ('capacity', 'in_use')
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_use = 0
+
+
+class ClientCharge:
+    '''
+    Списание веса запросов к базе с token bucket ключа клиента - того же,
+    что ограничивает запросы при проверке подписи. Один токен запрос уже
+    отдал там: его засчитывает первый допущенный запрос к базе, остальные
+    (элементы batch) платят вес полностью. У клиента без лимита (rate не задан,
+    ключ SECRET_KEY) списывать нечего.
+    '''
+
+    __slots__ = ('_bucket', '_prepaid')
+
+    def __init__(self, client: Optional[ApiClient], prepaid: float = 1.0):
+        self._bucket = client.bucket if client is not None else None
+        self._prepaid = prepaid
+
+    def acquire(self, weight: int) -> float:
+        '''
+        Returns:
+            0.0 - вес списан, иначе через сколько секунд повторить
+        '''
+        if self._bucket is None:
+            return 0.0
+        # Больше запаса bucket не накопится никогда
+        weight = min(weight, max(1, math.floor(self._bucket.burst)))
+        prepaid = min(self._prepaid, weight)
+        retry_after = self._bucket.acquire(weight - prepaid) if weight > prepaid else 0.0
+        if not retry_after:
+            self._prepaid -= prepaid
+        return retry_after
+
+
+# Клиент текущего запроса: его задает операция, списывает допуск под кэшем
+_current_charge: ContextVar[Optional[ClientCharge]] = ContextVar('current_charge', default=None)
+
+
+@contextmanager
+def charged_to(client: Optional[ApiClient]) -> Iterator[ClientCharge]:
+    '''
+    Допуски к базе внутри блока (и в задачах, созданных в нем) списываются
+    с лимита client
+    '''
+    charge = ClientCharge(client)
+    token = _current_charge.set(charge)
+    try:
+        yield charge
+    finally:
+        _current_charge.reset(token)
+
+
+class AdmissionController:
+    '''
+    Допуск запросов поиска к базе в пределах воркера. Вес запроса - его оценка
+    стоимости (query_cost), округленная вверх. Запрос отклоняется сразу, без
+    ожидания: 503, пока к пулу соединений стоит очередь длиннее max_pool_waiters
+    или тип запроса уже занял свой потолок concurrency (в единицах веса);
+    429, если в лимите ключа клиента не хватает токенов на вес запроса.
+    Проверки и захват идут без await, поэтому атомарны в event loop.
+    '''
+
+    def __init__(
+        self,
+        pool_waiting: Callable[[], int],
+        concurrency: Optional[dict[str, int]] = None,
+        max_pool_waiters: int = settings.ADMISSION_MAX_POOL_WAITERS,
+        retry_after: float = settings.ADMISSION_RETRY_AFTER,
+        cost: Callable[[Any], float] = query_cost
+    ):
+        self._pool_waiting = pool_waiting
+        self._max_pool_waiters = max_pool_waiters
+        self._retry_after = retry_after
+        self._cost = cost
+        self._lanes = {
+            query_type: _Lane(capacity)
+            for query_type, capacity in (
+                concurrency if concurrency is not None else settings.ADMISSION_CONCURRENCY
+            ).items()
+        }
+        self.stats = AdmissionStats()
+
+    def weight(self, query: Any) -> int:
+        '''
+        Вес запроса: не меньше 1 и не больше потолка его типа,
+        иначе запрос не допустить никогда
+        '''
+        weight = max(1, math.ceil(self._cost(query)))
+        lane = self._lanes.get(type(query).__name__)
+        if lane is not None:
+            weight = min(weight, lane.capacity)
+        return weight
+
+    @asynccontextmanager
+    async def admit(self, query: Any, charge: Optional[ClientCharge] = None) -> AsyncIterator[int]:
+        '''
+        Допускает запрос на время блока. Вес списывается с charge,
+        по умолчанию - с клиента текущего запроса (charged_to)
+        Returns:
+            вес допущенного запроса
+        Raises:
+            ServiceUnavailableException 503, TooManyRequestsException 429 - с Retry-After
+        '''
+        if self._pool_waiting() > self._max_pool_waiters:
+            self.stats.rejected_pool += 1
+            raise ServiceUnavailableException("База перегружена, повторите запрос позже", self._retry_after)
+
+        weight = self.weight(query)
+        lane = self._lanes.get(type(query).__name__)
+        if lane is not None and lane.in_use + weight > lane.capacity:
+            self.stats.rejected_concurrency += 1
+            raise ServiceUnavailableException(
+                f"Слишком много одновременных запросов {type(query).__name__}, повторите запрос позже",
+                self._retry_after
+            )
+
+        if charge is None:
+            charge = _current_charge.get()
+        retry_after = charge.acquire(weight) if charge is not None else 0.0
+        if retry_after:
+            self.stats.rejected_rate += 1
+            raise TooManyRequestsException("Превышен лимит стоимости запросов клиента", retry_after)
+
+        self.stats.admitted += 1
+        self.stats.in_flight += 1
+        if lane is not None:
+            lane.in_use += weight
+        try:
+            yield weight
+        finally:
+            self.stats.in_flight -= 1
+            if lane is not None:
+                lane.in_use -= weight
+
+
+class AdmittedOrganizationQuery(BaseQuery):
+    '''
+    Обертка над запросами к базе, которая пропускает их через AdmissionController.
+    Стоит под кэшем: ответ из кэша не занимает потолок типа и не тратит
+    лимит клиента сверх одного запроса.
+    '''
+    _model = Organization
+
+    def __init__(self, query: BaseQuery, admission: AdmissionController):
+        self._query = query
+        self._admission = admission
+
+    async def find(self, session: AsyncSession, query: OrganizationQueryI) -> OrganizationPageO:
+        async with self._admission.admit(query):
+            return await self._query.find(session, query)
+
+    async def facets(self, session: AsyncSession, query: OrganizationQueryI) -> OrganizationFacetsO:
+        async with self._admission.admit(query):
+            return await self._query.facets(session, query)
+
+    async def find_by_ids(self, session: AsyncSession, org_ids: list[int]) -> dict[int, OrganizationQueryO]:
+        # Один запрос org_id = ANY(...) по первичному ключу - вес OrgIdQuery
+        async with self._admission.admit(OrgIdQuery(org_id=org_ids[0])):
+            return await self._query.find_by_ids(session, org_ids)
+
+    def stream(self, session: AsyncSession, query: OrganizationQueryI, **kwargs):
+        # Поток допускается целиком в StreamOrganization, до начала ответа
+        return self._query.stream(session, query, **kwargs)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+from hashlib import sha256
+from typing import Optional
+
+from src.api.config.settings import settings
+from src.api.schemas.security import ClientKeyI, ClientKeysI
+from src.api.security.rate_limit import TokenBucket
+from src.api.security.security import expected_signature
+
+
+logger = logging.getLogger(__name__)
+
+# Клиент ключа из SECRET_KEY
+LEGACY_CLIENT = 'default'
+
+
+def _digest(key: str) -> bytes:
+    # В таблице лежат хэши ключей: поиск по dict не сравнивает сами секреты
+    return sha256(key.encode()).digest()
+
+
+class ApiClient:
+    """
+    Клиент API: разрешенные типы запросов, token bucket его лимита
+    и доступ к /admin
+    """
+
+    __slots__ = ('name', 'query_types', 'bucket', 'admin')
+
+    def __init__(
+        self,
+        name: str,
+        query_types: Optional[frozenset[str]] = None,
+        bucket: Optional[TokenBucket] = None,
+        admin: bool = False
+    ):
+        self.name = name
+        self.query_types = query_types
+        self.bucket = bucket
+        self.admin = admin
+
+    def allows(self, query_type: str) -> bool:
+        return self.query_types is None or query_type in self.query_types
+
+    def acquire(self) -> float:
+        """
+        Returns:
+            0.0 - запрос в пределах лимита, иначе через сколько секунд повторить
+        """
+        if self.bucket is None:
+            return 0.0
+        return self.bucket.acquire()
+
+
+class KeyStore:
+    """
+    Таблица ключей клиентов в памяти: хэш ключа -> ApiClient.
+    Ключи читаются из JSON файла (ClientKeysI) и перечитываются при его
+    изменении; таблица подменяется целиком, token bucket клиентов
+    с прежним лимитом переживают перезагрузку.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = settings.API_KEYS_FILE,
+        legacy: bool = settings.API_LEGACY_SIGNATURE
+    ):
+        self._path = path
+        self._legacy = legacy
+        self._clients: dict[bytes, ApiClient] = {}
+        self._version: Optional[tuple[int, int]] = None
+        self.reload()
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def get(self, key: str) -> Optional[ApiClient]:
+        """
+        Клиент по ключу из заголовка, None - ключ неизвестен
+        """
+        return self._clients.get(_digest(key))
+
+    def reload(self) -> bool:
+        """
+        Перечитывает файл ключей, если он изменился с прошлой загрузки.
+        Returns:
+            True - таблица ключей заменена
+        Raises:
+            OSError, ValidationError, ValueError: файл не читается или некорректен,
+            прежняя таблица остается в силе
+        """
+        keys: list[ClientKeyI] = []
+        version = None
+        if self._path is not None:
+            stat = os.stat(self._path)
+            version = (stat.st_mtime_ns, stat.st_size)
+            if self._version is not None and version == self._version:
+                return False
+            with open(self._path, 'rb') as file:
+                keys = ClientKeysI.model_validate_json(file.read()).clients
+
+        self._clients = self._build(keys)
+        self._version = version
+        logger.info("API keys loaded: %d clients", len(self._clients))
+        return True
+
+    def _build(self, keys: list[ClientKeyI]) -> dict[bytes, ApiClient]:
+        previous = {client.name: client for client in self._clients.values()}
+        clients = {}
+        if self._legacy:
+            # Ключ из SECRET_KEY - ключ оператора сервиса
+            clients[_digest(expected_signature())] = ApiClient(LEGACY_CLIENT, admin=True)
+        for key in keys:
+            digest = _digest(key.key)
+            if digest in clients:
+                raise ValueError(f"Duplicate API key for client {key.client}")
+            clients[digest] = ApiClient(
+                key.client,
+                frozenset(key.query_types) if key.query_types is not None else None,
+                self._bucket(key, previous.get(key.client)),
+                key.admin
+            )
+        return clients
+
+    @staticmethod
+    def _bucket(key: ClientKeyI, previous: Optional[ApiClient]) -> Optional[TokenBucket]:
+        if key.rate is None:
+            return None
+        bucket = previous.bucket if previous is not None else None
+        if bucket is not None and (bucket.rate, bucket.burst) == (key.rate, key.burst):
+            return bucket
+        return TokenBucket(key.rate, key.burst)
+
+    async def run(self, interval: float = settings.API_KEYS_RELOAD_INTERVAL):
+        """
+        Фоновая проверка файла ключей раз в interval секунд, до отмены задачи
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("API keys reload failed")
@@ -0,0 +1,34 @@
+from time import monotonic
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Token bucket: rate токенов в секунду, не больше burst в запасе.
+    Не потокобезопасен, рассчитан на один event loop.
+    """
+
+    __slots__ = ('rate', 'burst', '_tokens', '_updated', '_clock')
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Забирает tokens, если они есть.
+        Returns:
+            0.0 - токены взяты, иначе через сколько секунд они накопятся
+        """
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        if self.rate <= 0:
+            return float('inf')
+        return (tokens - self._tokens) / self.rate
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from hashlib import sha256
 import hmac
 from src.api.config.settings import settings
@@ -13,9 +14,16 @@ def generate_signature() -> str:
     ).hexdigest()
 
 
+@lru_cache
+def expected_signature() -> str:
+    """
+    Ключ из SECRET_KEY, посчитанный один раз за процесс
+    """
+    return generate_signature()
+
+
 def verify_signature(signature: str) -> bool:
     """
     Проверяет, что присланный в заголовке ключ был сгенерирован нами
     """
-    expected_signature = generate_signature()
-    return hmac.compare_digest(signature, expected_signature)
+    return hmac.compare_digest(signature, expected_signature())
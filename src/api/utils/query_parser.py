@@ -1,11 +1,47 @@
-from typing import TypeVar, Type, get_args, Any
+from typing import TypeVar, Type, get_args, Any, Annotated, Union
+from dataclasses import dataclass
 from fastapi import Query, HTTPException
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, ValidationError, TypeAdapter, Discriminator, Tag
+from pydantic_core import from_json
 import json
-from functools import wraps
+from functools import wraps, lru_cache
+from itertools import combinations
 
 T = TypeVar('T')
 
+# Необязательное поле запроса с именем схемы: выбор схемы без сравнения ключей
+TYPE_FIELD = 'type'
+
+# Схемы с большим числом необязательных полей не раскладываются в индекс
+# (2^n наборов ключей) и проверяются перебором
+_MAX_OPTIONAL_FIELDS = 12
+
+
+@dataclass(frozen=True)
+class _Dispatch:
+    schemas: dict[str, type[BaseModel]]
+    fields: dict[str, frozenset]
+    required: dict[str, frozenset]
+    # набор ключей запроса -> подходящие схемы (больше одной - неоднозначность)
+    by_keys: dict[frozenset, tuple[str, ...]]
+    wide: tuple[str, ...]
+    tagged: TypeAdapter
+
+
+def _most_specific(names: list[str], fields: dict[str, frozenset]) -> tuple[str, ...]:
+    # Побеждает самая конкретная схема (с наименьшим числом полей),
+    # например OrgTitleQuery, а не составной запрос с тем же полем
+    if not names:
+        return ()
+    smallest = min(len(fields[name]) for name in names)
+    return tuple(name for name in names if len(fields[name]) == smallest)
+
+
+def _type_tag(value: Any) -> Any:
+    if isinstance(value, dict):
+        return value.get(TYPE_FIELD)
+    return type(value).__name__
+
 class UnionQueryParser:
     """
     Универсальный парсер для Union типов в GET запросах.
@@ -14,7 +50,9 @@ class UnionQueryParser:
     Позволяет валидировать входящие параметры на соответствие одной из схем Union.
     
     Особенности:
-    - Строгая проверка соответствия полей только одной схеме
+    - Строгая проверка соответствия полей схеме, при нескольких совпадениях - самой конкретной
+    - Выбор схемы одним поиском в индексе, построенном при старте,
+      или по явному полю "type" с именем схемы (дискриминированный Union)
     - Автоматическая генерация документации и примеров
     - Подробные сообщения об ошибках
     - Поддержка вложенных Pydantic моделей
@@ -41,6 +79,7 @@ class UnionQueryParser:
             dict: Словарь содержащий:
                 - example: Пример данных из схемы
                 - properties: Описание полей схемы
+                - required: Обязательные поля схемы
                 - title: Название схемы
                 - description: Описание схемы
                 
@@ -50,10 +89,163 @@ class UnionQueryParser:
         return {
             'example': json_schema.get('example', {}),
             'properties': json_schema.get('properties', {}),
+            'required': json_schema.get('required', []),
             'title': json_schema.get('title', schema.__name__),
             'description': json_schema.get('description', '')
         }
 
+    @staticmethod
+    @lru_cache
+    def _dispatch(union_type: Type[T]) -> _Dispatch:
+        """
+        Индекс диспетчеризации Union: набор ключей запроса -> схема.
+        Для каждой схемы перечисляются все допустимые наборы ключей
+        (обязательные поля + любое подмножество необязательных), поэтому
+        выбор схемы - один поиск в словаре. Считается один раз на Union тип.
+        """
+        schemas, fields, required = {}, {}, {}
+        for schema in get_args(union_type):
+            if not issubclass(schema, BaseModel):
+                continue
+            schema_info = UnionQueryParser.get_schema_examples(schema)
+            schemas[schema.__name__] = schema
+            fields[schema.__name__] = frozenset(schema_info['properties'].keys())
+            required[schema.__name__] = frozenset(schema_info['required'])
+
+        candidates: dict[frozenset, list[str]] = {}
+        wide = []
+        for name in schemas:
+            optional = sorted(fields[name] - required[name])
+            if len(optional) > _MAX_OPTIONAL_FIELDS:
+                wide.append(name)
+                continue
+            for size in range(len(optional) + 1):
+                for keys in combinations(optional, size):
+                    candidates.setdefault(required[name].union(keys), []).append(name)
+
+        tagged = TypeAdapter(Annotated[
+            Union[tuple(Annotated[schema, Tag(name)] for name, schema in schemas.items())],
+            Discriminator(_type_tag)
+        ])
+        return _Dispatch(
+            schemas=schemas,
+            fields=fields,
+            required=required,
+            by_keys={
+                keys: _most_specific(names, fields)
+                for keys, names in candidates.items()
+            },
+            wide=tuple(wide),
+            tagged=tagged
+        )
+
+    @staticmethod
+    def resolve(union_type: Type[T], data: Any) -> T:
+        """
+        Выбирает схему Union и валидирует данные: по явному полю type
+        (дискриминированный Union) или по набору полей через индекс.
+        
+        Args:
+            union_type: Union тип (например, Union[ModelA, ModelB])
+            data: уже разобранный JSON объект
+            
+        Returns:
+            экземпляр единственной подходящей схемы
+            
+        Raises:
+            HTTPException 400: не объект, неизвестный type, поля не подходят
+            ни одной или подходят нескольким схемам, ошибка валидации значений
+        """
+        dispatch = UnionQueryParser._dispatch(union_type)
+        if not isinstance(data, dict):
+            raise HTTPException(
+                status_code=400,
+                detail="Query parameter must be a JSON object"
+            )
+        if TYPE_FIELD in data:
+            return UnionQueryParser._resolve_tagged(dispatch, data)
+
+        request_fields = frozenset(data)
+        matching_schemas = dispatch.by_keys.get(request_fields, ())
+        if dispatch.wide:
+            matching_schemas = _most_specific(
+                [
+                    *matching_schemas,
+                    *(
+                        name for name in dispatch.wide
+                        if dispatch.required[name] <= request_fields <= dispatch.fields[name]
+                    )
+                ],
+                dispatch.fields
+            )
+
+        if len(matching_schemas) == 0:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "message": "Query fields don't match any schema exactly",
+                    "your_fields": list(request_fields),
+                    "available_schemas": {
+                        name: list(fields)
+                        for name, fields in dispatch.fields.items()
+                    }
+                }
+            )
+        if len(matching_schemas) > 1:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "message": "Query fields match multiple schemas",
+                    "matching_schemas": list(matching_schemas)
+                }
+            )
+
+        schema = dispatch.schemas[matching_schemas[0]]
+        try:
+            return schema.model_validate(data)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "message": f"Validation failed for {schema.__name__}",
+                    "errors": str(e)
+                }
+            )
+
+    @staticmethod
+    def _resolve_tagged(dispatch: _Dispatch, data: dict) -> Any:
+        name = data[TYPE_FIELD]
+        # type из JSON может быть списком или объектом - они не хешируются
+        if not isinstance(name, str) or name not in dispatch.schemas:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "message": f"Unknown query type: {name}",
+                    "available_types": list(dispatch.schemas)
+                }
+            )
+        # Лишние поля запрещены так же, как и без type
+        unknown = data.keys() - dispatch.fields[name] - {TYPE_FIELD}
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "message": f"Query fields don't match {name}",
+                    "unknown_fields": sorted(unknown),
+                    "available_fields": sorted(dispatch.fields[name])
+                }
+            )
+        try:
+            return dispatch.tagged.validate_python(data)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "message": f"Validation failed for {name}",
+                    "errors": str(e)
+                }
+            )
+
     @staticmethod
     def parse(union_type: Type[T]) -> Any:
         """
@@ -66,27 +258,27 @@ class UnionQueryParser:
             Callable: FastAPI зависимость для парсинга и валидации
             
         Особенности:
-        - Проверяет точное соответствие полей одной из схем
+        - Проверяет соответствие полей одной из схем: все обязательные поля
+          присутствуют, необязательные можно опустить, лишних полей нет;
+          из нескольких подходящих выбирается схема с наименьшим числом полей
+        - Поле "type" с именем схемы выбирает её явно
+        - Индекс схем строится сразу, при объявлении эндпоинта
         - Генерирует подробную документацию для Swagger
         - Предоставляет информативные сообщения об ошибках
         
         Возможные ошибки:
         - 400: Неверный формат JSON
         - 400: Поля не соответствуют ни одной схеме
-        - 400: Поля соответствуют нескольким схемам
+        - 400: Поля одинаково подходят нескольким схемам
+        - 400: Неизвестный type
         - 400: Ошибка валидации значений полей
         
         Пример запроса:
         GET /endpoint?query={"field1": "value1"}
+        GET /endpoint?query={"type": "ModelA", "field1": "value1"}
         """
+        UnionQueryParser._dispatch(union_type)
         schemas = get_args(union_type)
-        
-        schema_fields = {}
-        for schema in schemas:
-            if not issubclass(schema, BaseModel):
-                continue
-            schema_info = UnionQueryParser.get_schema_examples(schema)
-            schema_fields[schema.__name__] = set(schema_info['properties'].keys())
 
         examples = {}
         query_formats = []
@@ -119,7 +311,10 @@ class UnionQueryParser:
                     "value": json.dumps(schema_info['example'])
                 }
 
-        formats_description = "\n\nPossible formats:\n" + "\n".join(
+        formats_description = (
+            f"\n\nOptional \"{TYPE_FIELD}\" field selects the schema by name explicitly."
+            "\n\nPossible formats:\n"
+        ) + "\n".join(
             f"- {fmt['name']}:\n" + "\n".join(
                 f"  * {field}: {details['type']} - {details['description']}"
                 for field, details in fmt['fields'].items()
@@ -135,58 +330,12 @@ class UnionQueryParser:
             )
         ) -> T:
             try:
-                data = json.loads(query)
-                if not isinstance(data, dict):
-                    raise HTTPException(
-                        status_code=400,
-                        detail="Query parameter must be a JSON object"
-                    )
-
-                request_fields = set(data.keys())
-                matching_schemas = []
-                
-                for schema_name, fields in schema_fields.items():
-                    if request_fields == fields:
-                        matching_schemas.append(schema_name)
-
-                if len(matching_schemas) == 0:
-                    raise HTTPException(
-                        status_code=400,
-                        detail={
-                            "message": "Query fields don't match any schema exactly",
-                            "your_fields": list(request_fields),
-                            "available_schemas": {
-                                name: list(fields)
-                                for name, fields in schema_fields.items()
-                            }
-                        }
-                    )
-                elif len(matching_schemas) > 1:
-                    raise HTTPException(
-                        status_code=400,
-                        detail={
-                            "message": "Query fields match multiple schemas",
-                            "matching_schemas": matching_schemas
-                        }
-                    )
-
-                for schema in schemas:
-                    if schema.__name__ == matching_schemas[0]:
-                        try:
-                            return schema(**data)
-                        except ValidationError as e:
-                            raise HTTPException(
-                                status_code=400,
-                                detail={
-                                    "message": f"Validation failed for {schema.__name__}",
-                                    "errors": str(e)
-                                }
-                            )
-
-            except json.JSONDecodeError:
+                data = from_json(query)
+            except ValueError:
                 raise HTTPException(
                     status_code=400,
                     detail="Invalid JSON format in query parameter"
                 )
+            return UnionQueryParser.resolve(union_type, data)
 
-        return parser 
\ No newline at end of file
+        return parser
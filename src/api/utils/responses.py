@@ -0,0 +1,18 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class PydanticJSONResponse(JSONResponse):
+    '''
+    Сериализует pydantic-модель сразу в JSON байты через pydantic-core,
+    минуя повторную валидацию response_model и json.dumps в FastAPI.
+    Endpoint должен возвращать этот Response явно, иначе FastAPI
+    все равно провалидирует результат по аннотации.
+    '''
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode()
+        return super().render(content)
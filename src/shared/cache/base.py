@@ -0,0 +1,164 @@
+import json
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Optional, Protocol, TypeVar
+
+from pydantic import BaseModel
+
+
+M = TypeVar('M', bound=BaseModel)
+
+
+class LRUCache:
+    '''
+    In-process LRU с TTL на запись
+    '''
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = (monotonic() + self._ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TagVersionStore(Protocol):
+    '''
+    Общие для всех воркеров версии тегов, без хранения значений
+    '''
+
+    async def get_counters(self, keys: list[str]) -> list[int]:
+        ...
+
+    async def incr(self, keys: list[str]) -> None:
+        ...
+
+
+class SharedCache(TagVersionStore, Protocol):
+    '''
+    Общий для всех воркеров уровень кэша (например Redis): значения и версии тегов
+    '''
+
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        ...
+
+
+class InMemorySharedCache(SharedCache):
+    '''
+    Локальная замена общего кэша для тестов и запуска без внешнего хранилища
+    '''
+
+    def __init__(self):
+        self._values: dict[str, tuple[float, str]] = {}
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._values.get(key)
+        if item is None or item[0] < monotonic():
+            return None
+        return item[1]
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._values[key] = (monotonic() + ttl, value)
+
+    async def get_counters(self, keys: list[str]) -> list[int]:
+        return [self._counters.get(key, 0) for key in keys]
+
+    async def incr(self, keys: list[str]) -> None:
+        for key in keys:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+
+class CacheStats(BaseModel):
+    local_hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+
+class TaggedCache:
+    '''
+    Двухуровневый кэш (LRU воркера + необязательный общий) с инвалидацией по тегам.
+    У каждого тега есть версия; запись хранит версии своих тегов на момент чтения
+    из базы, а инвалидация тега просто увеличивает его версию, поэтому устаревшие
+    записи не нужно искать и удалять.
+    Версии тегов берутся из tag_versions, если он задан, иначе из общего уровня.
+    Без них версии живут в процессе и инвалидируются только записями
+    из этого же процесса, остальное ограничено TTL.
+    '''
+
+    def __init__(
+        self,
+        local: LRUCache,
+        shared: Optional[SharedCache] = None,
+        ttl: float = 60.0,
+        tag_versions: Optional[TagVersionStore] = None
+    ):
+        self._local = local
+        self._shared = shared
+        self._ttl = ttl
+        self._versions_store = tag_versions if tag_versions is not None else shared
+        self._tag_versions: dict[str, int] = {}
+        self.stats = CacheStats()
+
+    async def versions(self, tags: list[str]) -> tuple[int, ...]:
+        if self._versions_store is not None:
+            return tuple(await self._versions_store.get_counters([f"tag:{tag}" for tag in tags]))
+        return tuple(self._tag_versions.get(tag, 0) for tag in tags)
+
+    async def get(self, key: str, versions: tuple[int, ...], model: type[M]) -> Optional[M]:
+        entry = self._local.get(key)
+        if entry is not None and entry[0] == versions:
+            self.stats.local_hits += 1
+            return entry[1]
+
+        if self._shared is not None:
+            raw = await self._shared.get(key)
+            if raw is not None:
+                stored = json.loads(raw)
+                if tuple(stored['versions']) == versions:
+                    value = model.model_validate(stored['value'])
+                    self._local.set(key, (versions, value))
+                    self.stats.shared_hits += 1
+                    return value
+
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, versions: tuple[int, ...], value: BaseModel) -> None:
+        self._local.set(key, (versions, value))
+        if self._shared is not None:
+            raw = json.dumps({'versions': versions, 'value': value.model_dump(mode='json')})
+            await self._shared.set(key, raw, self._ttl)
+
+    async def invalidate(self, tags: list[str]) -> None:
+        self.stats.invalidations += 1
+        if self._versions_store is not None:
+            await self._versions_store.incr([f"tag:{tag}" for tag in tags])
+            return
+        for tag in tags:
+            self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
@@ -0,0 +1,132 @@
+import json
+import math
+from typing import Any
+
+from src.shared.config.settings import settings
+from src.shared.schemas.organization import (
+    OrganizationI,
+    OrganizationQueryI,
+    OrgIdQuery,
+    OrgTitleQuery,
+    CategoryPathQuery,
+    CategoryTitleQuery,
+    OfficeAddressQuery,
+    GeoRadiusQuery,
+    GeoBoxQuery,
+    CompoundQuery,
+    GeoI,
+)
+
+
+# Теги текстовых запросов: любая новая организация может попасть в их выдачу
+TITLE_TAG = 'title'
+CATEGORY_TITLE_TAG = 'category_title'
+ADDRESS_TAG = 'address'
+GEO_ALL_TAG = 'geo:all'
+# Версия данных: меняется после любой записи организаций
+DATA_TAG = 'data'
+
+# Метров в градусе широты
+_METERS_PER_DEGREE = 111_320.0
+
+# Текстовые поля, которые ищутся без учета регистра (ILIKE, pg_trgm)
+_CASE_INSENSITIVE_FIELDS = {'org_title', 'category_title', 'office_address'}
+
+
+def _normalize(name: str, value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _normalize(key, item) for key, item in value.items()}
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, str) and name in _CASE_INSENSITIVE_FIELDS:
+        # Только регистр: ILIKE '%' || :v || '%' различает пробелы в значении
+        return value.lower()
+    return value
+
+
+def query_cache_key(query: OrganizationQueryI) -> str:
+    '''
+    Канонический ключ запроса: тип + нормализованные поля
+    (регистр текста, округление координат), чтобы
+    эквивалентные запросы попадали в одну запись кэша
+    '''
+    fields = _normalize('', query.model_dump())
+    return f"{type(query).__name__}:{json.dumps(fields, sort_keys=True, ensure_ascii=False)}"
+
+
+def _cell(lon: float, lat: float) -> tuple[int, int]:
+    size = settings.CACHE_GEO_CELL
+    return math.floor(lon / size), math.floor(lat / size)
+
+
+def _cell_tag(cell: tuple[int, int]) -> str:
+    return f"geo:{cell[0]}:{cell[1]}"
+
+
+def _box_tags(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> list[str]:
+    (x_min, y_min), (x_max, y_max) = _cell(min_lon, min_lat), _cell(max_lon, max_lat)
+    if (x_max - x_min + 1) * (y_max - y_min + 1) > settings.CACHE_GEO_MAX_CELLS:
+        return [GEO_ALL_TAG]
+    return [_cell_tag((x, y)) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1)]
+
+
+def _radius_tags(geo: GeoI, radius: float) -> list[str]:
+    dlat = radius / _METERS_PER_DEGREE
+    dlon = radius / (_METERS_PER_DEGREE * max(math.cos(math.radians(geo.lat)), 1e-6))
+    return _box_tags(geo.lon - dlon, geo.lat - dlat, geo.lon + dlon, geo.lat + dlat)
+
+
+def _compound_tags(query: CompoundQuery) -> list[str]:
+    # Новая организация попадает в выдачу, только если подходит под все фильтры,
+    # значит достаточно тегов одного из них - самого узкого
+    if query.box is not None:
+        return _box_tags(query.box.min_lon, query.box.min_lat, query.box.max_lon, query.box.max_lat)
+    if query.geo is not None:
+        return _radius_tags(query.geo, query.radius)
+    if query.category_path is not None:
+        return [f"path:{query.category_path}"]
+    if query.org_title is not None:
+        return [TITLE_TAG]
+    if query.category_title is not None:
+        return [CATEGORY_TITLE_TAG]
+    return [ADDRESS_TAG]
+
+
+def _category_prefixes(path: str) -> list[str]:
+    parts = [part for part in path.split('/') if part]
+    return ['/' + '/'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+def query_tags(query: OrganizationQueryI) -> list[str]:
+    '''
+    Теги, по которым инвалидируется закэшированная выдача запроса
+    '''
+    if isinstance(query, OrgIdQuery):
+        return [f"org:{query.org_id}"]
+    if isinstance(query, OrgTitleQuery):
+        return [TITLE_TAG]
+    if isinstance(query, CategoryTitleQuery):
+        return [CATEGORY_TITLE_TAG]
+    if isinstance(query, OfficeAddressQuery):
+        return [ADDRESS_TAG]
+    if isinstance(query, CategoryPathQuery):
+        return [f"path:{query.category_path}"]
+    if isinstance(query, GeoBoxQuery):
+        return _box_tags(query.min_lon, query.min_lat, query.max_lon, query.max_lat)
+    if isinstance(query, GeoRadiusQuery):
+        return _radius_tags(query.geo, query.radius)
+    if isinstance(query, CompoundQuery):
+        return _compound_tags(query)
+    # Ближайшие соседи не ограничены областью
+    return [GEO_ALL_TAG]
+
+
+def organization_tags(org_id: int, data: OrganizationI) -> list[str]:
+    '''
+    Теги, которые нужно инвалидировать после записи организации
+    '''
+    tags = {f"org:{org_id}", TITLE_TAG, CATEGORY_TITLE_TAG, ADDRESS_TAG, GEO_ALL_TAG, DATA_TAG}
+    tags.add(_cell_tag(_cell(data.office.geo.lon, data.office.geo.lat)))
+    for category in data.categories:
+        tags.update(f"path:{prefix}" for prefix in _category_prefixes(category.path))
+    return sorted(tags)
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from typing import Callable, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from .base import TagVersionStore
+from src.shared.config.settings import settings
+from src.shared.models.cache import CacheTagVersion
+
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresTagVersions(TagVersionStore):
+    '''
+    Версии тегов TaggedCache в таблице cache_tag_versions: их увеличивают все
+    воркеры API и процессы записи, так что запись организаций из любого процесса
+    инвалидирует кэш остальных. Значения в базе не хранятся - они остаются в LRU воркера.
+    Чтение версий идет из копии в памяти процесса, которую run обновляет раз
+    в refresh interval, поэтому попадание в кэш не обращается к базе. Запись
+    из другого процесса видна с задержкой до refresh interval, своя - сразу.
+    read_through (опционально) читает версии из базы на каждый запрос:
+    инвалидация без задержки ценой соединения пула и запроса на каждый find.
+    '''
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        read_through: bool = settings.CACHE_TAG_VERSIONS_READ_THROUGH
+    ):
+        self._session_factory = session_factory
+        self._read_through = read_through
+        self._versions: dict[str, int] = {}
+        self._all = select(CacheTagVersion.tag, CacheTagVersion.version)
+
+    def _merge(self, rows: Iterable[tuple[str, int]]) -> None:
+        # Версии только растут: чтение, начатое до incr, не откатывает его результат
+        for tag, version in rows:
+            if version > self._versions.get(tag, 0):
+                self._versions[tag] = version
+
+    async def get_counters(self, keys: list[str]) -> list[int]:
+        if self._read_through:
+            stmt = self._all.where(CacheTagVersion.tag.in_(keys))
+            async with self._session_factory() as session:
+                self._merge((await session.execute(stmt)).tuples().all())
+        return [self._versions.get(key, 0) for key in keys]
+
+    async def incr(self, keys: list[str]) -> None:
+        if not keys:
+            return
+        stmt = insert(CacheTagVersion).values([{"tag": key, "version": 1} for key in sorted(set(keys))])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheTagVersion.tag],
+            set_={"version": CacheTagVersion.version + 1}
+        ).returning(CacheTagVersion.tag, CacheTagVersion.version)
+        async with self._session_factory() as session:
+            rows = (await session.execute(stmt)).tuples().all()
+            await session.commit()
+        self._merge(rows)
+
+    async def load(self) -> int:
+        '''
+        Перечитывает все версии из базы
+        Returns:
+            количество тегов
+        '''
+        async with self._session_factory() as session:
+            rows = (await session.execute(self._all)).tuples().all()
+        self._merge(rows)
+        return len(rows)
+
+    async def run(self, interval: float = settings.CACHE_TAG_VERSIONS_REFRESH_INTERVAL):
+        '''
+        Фоновое обновление раз в interval секунд, до отмены задачи
+        '''
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Cache tag versions refresh failed")
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+from pydantic import BaseModel
+
+
+T = TypeVar('T')
+
+
+class SingleFlightStats(BaseModel):
+    executed: int = 0
+    coalesced: int = 0
+
+
+class SingleFlight:
+    '''
+    Объединение одинаковых конкурентных вызовов в пределах event loop воркера:
+    первый вызов по ключу выполняет fn, остальные ждут его результат или ошибку.
+    Если первый вызов отменен (клиент отключился), ожидающие повторяют попытку сами.
+    '''
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Future] = {}
+        self.stats = SingleFlightStats()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        while (future := self._calls.get(key)) is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    continue
+                raise
+            self.stats.coalesced += 1
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.stats.executed += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Ошибку получат ожидающие, если они есть; без них не логировать как потерянную
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
@@ -0,0 +1,35 @@
+from typing import Optional
+
+from .base import LRUCache, TaggedCache, CacheStats
+from .organization import DATA_TAG
+
+
+class TileCache:
+    '''
+    Байты тайлов в LRU воркера. Версия данных (тег DATA_TAG общего
+    TaggedCache) входит в ключ: после записи организаций старые тайлы
+    перестают находиться и вытесняются LRU.
+    '''
+
+    def __init__(self, local: LRUCache, tags: TaggedCache):
+        self._local = local
+        self._tags = tags
+        self.stats = CacheStats()
+
+    async def version(self) -> int:
+        return (await self._tags.versions([DATA_TAG]))[0]
+
+    @staticmethod
+    def key(version: int, z: int, x: int, y: int, category_path: Optional[str]) -> str:
+        return f"{version}:{z}/{x}/{y}:{category_path or ''}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        tile = self._local.get(key)
+        if tile is None:
+            self.stats.misses += 1
+        else:
+            self.stats.local_hits += 1
+        return tile
+
+    def set(self, key: str, tile: bytes) -> None:
+        self._local.set(key, tile)
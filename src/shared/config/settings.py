@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,16 +13,119 @@ class Settings(BaseSettings):
     PGBOUNCER_PORT: int = 6432
     EXTERNAL_HOST: bool = False
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
-    POSTGRES_POOL_SIZE: int = 10
-    POSTGRES_MAX_OVERFLOW: int = 20
+    # Профиль движка: direct - прямое подключение к Postgres, pgbouncer -
+    # PgBouncer в transaction mode, test - NullPool. По умолчанию из MODE и EXTERNAL_HOST
+    DB_PROFILE: Optional[Literal["direct", "pgbouncer", "test"]] = None
+    # Воркеры gunicorn (та же переменная, что в api.dockerfile): пул делится между ними
+    WORKERS: int = 4
+    # Общий каталог метрик воркеров: /metrics отдает метрики всех воркеров
+    # с меткой worker, иначе - только воркера, принявшего запрос
+    METRICS_DIR: Optional[str] = None
+    METRICS_FLUSH_INTERVAL: float = 5.0
+    # Явный размер пула воркера, иначе считается из профиля
+    POSTGRES_POOL_SIZE: Optional[int] = None
+    POSTGRES_MAX_OVERFLOW: Optional[int] = None
+    POSTGRES_POOL_TIMEOUT: float = 10.0
+    # max_connections сервера и запас на миграции, админку и репликацию
+    POSTGRES_MAX_CONNECTIONS: int = 100
+    POSTGRES_RESERVED_CONNECTIONS: int = 10
+    POSTGRES_POOL_RECYCLE: float = 1800.0
+    # Проверка соединения на checkout: без нее после рестарта Postgres или PgBouncer
+    # первый запрос на каждом оборванном соединении пула завершается ошибкой
+    POSTGRES_POOL_PRE_PING: bool = True
+    # Должны совпадать с pgbouncer.ini
+    PGBOUNCER_DEFAULT_POOL_SIZE: int = 20
+    PGBOUNCER_RESERVE_POOL_SIZE: int = 5
+    PGBOUNCER_CLIENT_IDLE_TIMEOUT: float = 300.0
+    # cached - PgBouncer >= 1.21 с max_prepared_statements или прямое подключение:
+    #          подготовленные выражения кэшируются asyncpg и SQLAlchemy
+    # unnamed - PgBouncer в transaction mode без поддержки prepared statements:
+    #          кэши выключены, имена выражений уникальны
+    PREPARED_STATEMENTS: Literal["cached", "unnamed"] = "cached"
     SRID_GEO: int = 4326
+    BULK_BATCH_SIZE: int = 1000
+    USE_SEARCH_PROJECTION: bool = True
+    FIND_DEFAULT_LIMIT: int = 100
+    FIND_MAX_LIMIT: int = 1000
+    STREAM_BATCH_SIZE: int = 500
+    FIND_BATCH_MAX_SIZE: int = 50
+    FIND_BATCH_CONCURRENCY: int = 4
+    FACET_GEO_CELL: float = 0.01
+    FACET_LIMIT: int = 50
+    # Ячеек сетки кластеризации на сторону тайла 256px (шаг ~32px на любом zoom)
+    CLUSTER_CELLS_PER_TILE: int = 8
+    # Не больше стольких ячеек на сторону окна: размер ответа ограничен
+    CLUSTER_MAX_CELLS_PER_SIDE: int = 32
+    CLUSTER_SAMPLE_SIZE: int = 5
+    # Копия geo в памяти процесса для поиска по радиусу и боксу
+    GEO_REPLICA_ENABLED: bool = False
+    GEO_REPLICA_REFRESH_INTERVAL: float = 5.0
+    # Полная перезагрузка: удаленные и перемещенные офисы не видны по updated_at
+    GEO_REPLICA_FULL_RELOAD_INTERVAL: float = 3600.0
+    # Запас по updated_at на транзакции, закоммиченные позже своего now()
+    GEO_REPLICA_OVERLAP: float = 60.0
+    # Копия, не обновлявшаяся дольше, не используется: поиск идет чистым PostGIS
+    GEO_REPLICA_MAX_STALENESS: float = 60.0
+    # Запас радиуса на отличие сферы (haversine) от сфероида PostGIS
+    GEO_REPLICA_TOLERANCE: float = 0.01
+    TILE_MAX_ZOOM: int = 22
+    TILE_EXTENT: int = 4096
+    TILE_BUFFER: int = 64
+    TILE_CACHE_MAXSIZE: int = 2000
+    TILE_CACHE_TTL: float = 300.0
+    SINGLE_FLIGHT_ENABLED: bool = True
+    CACHE_ENABLED: bool = True
+    CACHE_MAXSIZE: int = 10000
+    CACHE_TTL: float = 60.0
+    # Версии тегов кэша читаются из памяти и перечитываются из базы раз в интервал;
+    # READ_THROUGH - чтение из базы на каждый запрос, без задержки инвалидации
+    CACHE_TAG_VERSIONS_REFRESH_INTERVAL: float = 1.0
+    CACHE_TAG_VERSIONS_READ_THROUGH: bool = False
+    CACHE_GEO_CELL: float = 0.05
+    CACHE_GEO_MAX_CELLS: int = 64
+    TRUSTED_OUTPUT: bool = True
+    # Диагностика медленных find: SQL, параметры и этапы запросов дольше порога,
+    # для доли из них - EXPLAIN ANALYZE на отдельном соединении
+    SLOW_QUERY_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD: float = 0.5
+    SLOW_QUERY_EXPLAIN_RATE: float = 0.1
+    SLOW_QUERY_BUFFER_SIZE: int = 100
+    # Допуск find к базе: стоимость запроса списывается с лимита (rate, burst)
+    # ключа клиента, потолок одновременных запросов типа - в единицах стоимости,
+    # быстрый отказ, пока к пулу соединений стоит очередь.
+    # Клиент общей подписи SECRET_KEY и ключи без rate по стоимости не ограничены
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_CONCURRENCY: dict[str, int] = {
+        'GeoBoxQuery': 8,
+        'GeoRadiusQuery': 8,
+        'CategoryPathQuery': 8,
+        'CompoundQuery': 8,
+    }
+    ADMISSION_MAX_POOL_WAITERS: int = 10
+    ADMISSION_RETRY_AFTER: float = 1.0
+    # Площадь бокса или круга поиска, которая стоит одну единицу
+    ADMISSION_AREA_UNIT_KM2: float = 100.0
     
+    @property
+    def db_profile(self) -> str:
+        if self.DB_PROFILE is not None:
+            return self.DB_PROFILE
+        if self.MODE == "test":
+            return "test"
+        return "direct" if self.EXTERNAL_HOST else "pgbouncer"
+
+    @property
+    def direct_uri(self) -> str:
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
+    @property
+    def pgbouncer_uri(self) -> str:
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.PGBOUNCER_HOST}:{self.PGBOUNCER_PORT}/{self.POSTGRES_DB}"
+
     @property
     def postgres_uri(self) -> str:
         # Используем pgbouncer для приложения
-        host = self.PGBOUNCER_HOST if not self.EXTERNAL_HOST else self.POSTGRES_HOST
-        port = self.PGBOUNCER_PORT if not self.EXTERNAL_HOST else self.POSTGRES_PORT
-        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{host}:{port}/{self.POSTGRES_DB}"
+        return self.direct_uri if self.EXTERNAL_HOST else self.pgbouncer_uri
     
 
 settings = Settings()
\ No newline at end of file
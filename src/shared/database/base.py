@@ -3,29 +3,15 @@ from contextlib import asynccontextmanager
 from datetime import datetime
 
 from sqlalchemy.orm import mapped_column
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from sqlalchemy import text, NullPool
+from sqlalchemy import text
 
 from src.shared.config.settings import settings
+from src.shared.database.profiles import create_engine
 
 
-DATABASE_PARAMS = {
-    "pool_pre_ping": True,
-    "pool_size": settings.POSTGRES_POOL_SIZE,
-    "max_overflow": settings.POSTGRES_MAX_OVERFLOW
-    }
-
-if settings.MODE.lower() == "test":
-    DATABASE_PARAMS = {
-        "poolclass": NullPool,   
-    }
-
-
-engine = create_async_engine(
-    settings.postgres_uri,
-    **DATABASE_PARAMS
-)
+engine = create_engine(settings.db_profile)
 
 async_session = async_sessionmaker(
     engine,
@@ -0,0 +1,55 @@
+from typing import Any, Iterator
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    '''
+    EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) <statement> с параметрами statement
+    '''
+    inherit_cache = False
+
+    def __init__(self, statement: ClauseElement, analyze: bool = True):
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(Explain, 'postgresql')
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    options = 'ANALYZE, BUFFERS, FORMAT JSON' if element.analyze else 'FORMAT JSON'
+    return f'EXPLAIN ({options}) {compiler.process(element.statement, **kw)}'
+
+
+# Фактических строк во столько раз больше или меньше оценки - план построен на неверной статистике
+MISESTIMATE_RATIO = 10
+
+
+def _nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get('Plans', []):
+        yield from _nodes(child)
+
+
+def plan_problems(plan: Any) -> tuple[list[str], list[str]]:
+    '''
+    Разбор JSON-плана EXPLAIN ANALYZE
+    Returns:
+        (таблицы с Seq Scan, узлы с оценкой строк, ошибочной больше чем в MISESTIMATE_RATIO раз)
+    '''
+    root = plan[0]['Plan'] if isinstance(plan, list) else plan['Plan']
+    seq_scans, misestimates = [], []
+    for node in _nodes(root):
+        if node.get('Node Type') == 'Seq Scan':
+            seq_scans.append(node.get('Relation Name', '?'))
+        if 'Actual Rows' not in node:
+            continue
+        # Actual Rows - среднее на один проход (loops), Plan Rows - оценка на проход
+        actual, estimated = max(node['Actual Rows'], 1), max(node['Plan Rows'], 1)
+        if actual / estimated >= MISESTIMATE_RATIO or estimated / actual >= MISESTIMATE_RATIO:
+            target = node.get('Relation Name') or node.get('Join Type') or ''
+            misestimates.append(
+                f"{node['Node Type']} {target}".strip()
+                + f": estimated {node['Plan Rows']}, actual {node['Actual Rows']}"
+            )
+    return seq_scans, misestimates
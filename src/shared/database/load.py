@@ -0,0 +1,122 @@
+"""
+Нагрузочный прогон пула одного воркера:
+
+    python -m src.shared.database.load --profile pgbouncer --workers 4 --concurrency 64 --requests 5000
+
+Пул считается как у одного из --workers воркеров gunicorn, --concurrency -
+одновременные запросы этого воркера. Смесь запросов - поиск по названию,
+пути категории и радиусу по уже загруженным данным.
+"""
+import argparse
+import asyncio
+from itertools import cycle
+from time import perf_counter
+from typing import Awaitable, Callable, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.shared.database.pool import PoolStats
+
+
+class LoadReport(BaseModel):
+    requests: int
+    errors: int
+    concurrency: int
+    elapsed: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    pool: Optional[PoolStats] = None
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+
+def _percentile(latencies: list[float], q: float) -> float:
+    if not latencies:
+        return 0.0
+    return latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+
+
+async def run_load(
+    engine: AsyncEngine,
+    call: Callable[[AsyncSession, int], Awaitable],
+    concurrency: int,
+    requests: int
+) -> LoadReport:
+    '''
+    requests вызовов call(session, i), не больше concurrency одновременно,
+    каждый со своей сессией (как запросы API)
+    Returns:
+        задержки, ошибки и статистика пула (для TimedAsyncPool)
+    '''
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    counter = iter(range(requests))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = perf_counter()
+            try:
+                async with session_factory() as session:
+                    await call(session, i)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(perf_counter() - started)
+
+    started = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - started
+
+    latencies.sort()
+    stats = getattr(engine.pool, 'stats', None)
+    return LoadReport(
+        requests=requests,
+        errors=errors,
+        concurrency=concurrency,
+        elapsed=elapsed,
+        p50_ms=_percentile(latencies, 0.5),
+        p95_ms=_percentile(latencies, 0.95),
+        p99_ms=_percentile(latencies, 0.99),
+        pool=stats.model_copy() if stats is not None else None
+    )
+
+
+async def _main(args: argparse.Namespace):
+    from src.shared.database.profiles import create_engine
+    from src.shared.queries.organization import OrganizationQuery, OrganizationQueryBuilder
+    from src.shared.schemas.organization import OrgTitleQuery, CategoryPathQuery, GeoRadiusQuery, GeoI
+
+    engine = create_engine(args.profile, workers=args.workers)
+    org_query = OrganizationQuery(OrganizationQueryBuilder(use_projection=True))
+    queries = [
+        OrgTitleQuery(org_title="Test", limit=20),
+        CategoryPathQuery(category_path="/food", limit=20),
+        GeoRadiusQuery(geo=GeoI(lon=37.6173, lat=55.7558), radius=1000, limit=20),
+    ]
+    mix = cycle(queries)
+
+    async def call(session: AsyncSession, i: int):
+        await org_query.find(session, next(mix))
+
+    try:
+        report = await run_load(engine, call, args.concurrency, args.requests)
+    finally:
+        await engine.dispose()
+    print(f"pool: size={engine.pool.size()}, profile={args.profile}, workers={args.workers}")
+    print(report.model_dump_json(indent=2))
+    print(f"rps: {report.rps:.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон пула соединений")
+    parser.add_argument("--profile", choices=["direct", "pgbouncer", "test"], default=None)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=5000)
+    asyncio.run(_main(parser.parse_args()))
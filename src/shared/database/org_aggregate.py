@@ -1,17 +1,40 @@
+import logging
+from itertools import islice
+from time import perf_counter
+from typing import Iterable, Iterator, Optional
+
 from src.shared.models.organization import Organization, Phone
 from src.shared.models.office import Office, Geo
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import insert, ARRAY
+from sqlalchemy import select, func, cast, Integer, Float
+from geoalchemy2 import Geography
 from geoalchemy2.shape import from_shape
 from shapely.geometry import Point
 from src.shared.config.settings import settings
 from src.shared.models.work import Category, Work
-from src.shared.schemas.organization import OrganizationI
+from src.shared.database.search_projection import refresh_organization_search
+from src.shared.cache.base import TaggedCache
+from src.shared.cache.organization import organization_tags
+from src.shared.schemas.organization import OrganizationI, CategoryI, BulkLoadStats
+
+
+logger = logging.getLogger(__name__)
+
+
+def _batched(data: Iterable[OrganizationI], size: int) -> Iterator[list[OrganizationI]]:
+    iterator = iter(data)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
 
 class OrgAggregate:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, cache: Optional[TaggedCache] = None):
         self.session = session
+        # Кэш результатов поиска, инвалидируется после каждого коммита
+        self._cache = cache
+        # path -> category_id, живет вместе с агрегатом (на всю пакетную загрузку)
+        self._category_ids: dict[str, int] = {}
 
     async def create_organization(self, data: OrganizationI):
         try:
@@ -29,20 +52,168 @@ class OrgAggregate:
             stmt_geo = insert(Geo).values(office_id=office_id, geog=from_shape(Point(geo.lon, geo.lat), srid=settings.SRID_GEO))
             await self.session.execute(stmt_geo)
             
-            stmt_categories = insert(Category).values(
-                [{"title": category.title, "path": category.path} for category in data.categories]
-            ).returning(Category.category_id)
-            category_ids = (await self.session.execute(stmt_categories)).scalars().all()
+            await self._upsert_categories(data.categories)
+            category_ids = {self._category_ids[category.path] for category in data.categories}
             
             stmt_works = insert(Work).values(
                 [{"org_id": org_id, "category_id": category_id} for category_id in category_ids]
             )
             await self.session.execute(stmt_works)
+            await refresh_organization_search(self.session, [org_id])
             await self.session.commit()
+            await self._invalidate(org_id, data)
             return org_id
         
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback()
             raise e
 
-        
+    async def create_organizations_bulk(
+        self,
+        data: Iterable[OrganizationI],
+        batch_size: int = settings.BULK_BATCH_SIZE
+    ) -> BulkLoadStats:
+        '''
+        Потоковая загрузка организаций пачками по batch_size.
+        Идентификаторы резервируются заранее из последовательностей, поэтому связи
+        между таблицами строятся на клиенте, а каждая таблица пишется одним COPY
+        (geo - одним INSERT ... SELECT FROM unnest). Коммит после каждой пачки.
+        Returns:
+            статистика загрузки BulkLoadStats
+        '''
+        stats = BulkLoadStats()
+        started = perf_counter()
+        for batch in _batched(data, batch_size):
+            try:
+                rows, org_ids = await self._insert_batch(batch)
+                await self.session.commit()
+            except Exception as e:
+                await self._rollback()
+                raise e
+            await self._invalidate_batch(org_ids, batch)
+
+            stats.organizations += len(batch)
+            stats.rows += rows
+            stats.batches += 1
+            stats.elapsed = perf_counter() - started
+            logger.info(
+                "Bulk load: %d organizations, %.0f rows/sec",
+                stats.organizations,
+                stats.rows_per_sec
+            )
+        stats.elapsed = perf_counter() - started
+        return stats
+
+    async def _insert_batch(self, batch: list[OrganizationI]) -> tuple[int, list[int]]:
+        org_ids = await self._reserve_ids(Organization.__tablename__, 'org_id', len(batch))
+        office_ids = await self._reserve_ids(Office.__tablename__, 'office_id', len(batch))
+        rows = await self._upsert_categories(
+            category for org in batch for category in org.categories
+        )
+
+        organizations, phones, offices, works = [], [], [], []
+        geo_office_ids, geo_lons, geo_lats = [], [], []
+        for org_id, office_id, org in zip(org_ids, office_ids, batch):
+            organizations.append((org_id, org.title, True))
+            phones.extend((org_id, phone.phone) for phone in org.phones)
+            offices.append((office_id, org_id, org.office.address))
+            geo_office_ids.append(office_id)
+            geo_lons.append(org.office.geo.lon)
+            geo_lats.append(org.office.geo.lat)
+            works.extend(
+                (org_id, category_id)
+                for category_id in {self._category_ids[category.path] for category in org.categories}
+            )
+
+        rows += await self._copy(Organization.__tablename__, ['org_id', 'title', 'is_active'], organizations)
+        rows += await self._copy(Phone.__tablename__, ['org_id', 'phone'], phones)
+        rows += await self._copy(Office.__tablename__, ['office_id', 'org_id', 'address'], offices)
+        rows += await self._insert_geo(geo_office_ids, geo_lons, geo_lats)
+        rows += await self._copy(Work.__tablename__, ['org_id', 'category_id'], works)
+        await refresh_organization_search(self.session, org_ids)
+        return rows, org_ids
+
+    async def _upsert_categories(self, categories: Iterable[CategoryI]) -> int:
+        '''
+        Категории уникальны по path: повторный path не создает новую строку,
+        а возвращает существующий category_id (ON CONFLICT DO UPDATE ... RETURNING).
+        Название существующей категории не меняется: иначе разошлись бы
+        organization_search остальных организаций этой категории.
+        Уже известные пути берутся из кэша агрегата без обращения к базе.
+        Returns:
+            количество отправленных в базу категорий
+        '''
+        missing = {
+            category.path: category.title
+            for category in categories
+            if category.path not in self._category_ids
+        }
+        if not missing:
+            return 0
+        stmt = insert(Category).values(
+            [{"title": title, "path": path} for path, title in missing.items()]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Category.path],
+            # Пустое обновление: без него RETURNING не вернет существующую строку
+            set_={"path": stmt.excluded.path}
+        ).returning(Category.path, Category.category_id)
+        self._category_ids.update((await self.session.execute(stmt)).tuples().all())
+        return len(missing)
+
+    async def _invalidate(self, org_id: int, data: OrganizationI):
+        if self._cache is not None:
+            await self._cache.invalidate(organization_tags(org_id, data))
+
+    async def _invalidate_batch(self, org_ids: list[int], batch: list[OrganizationI]):
+        if self._cache is None:
+            return
+        tags = set()
+        for org_id, org in zip(org_ids, batch):
+            tags.update(organization_tags(org_id, org))
+        await self._cache.invalidate(sorted(tags))
+
+    async def _rollback(self):
+        await self.session.rollback()
+        # Кэш мог получить id строк, созданных в откаченной транзакции
+        self._category_ids.clear()
+
+    async def _reserve_ids(self, table: str, column: str, count: int) -> list[int]:
+        stmt = select(
+            func.nextval(func.pg_get_serial_sequence(table, column))
+        ).select_from(func.generate_series(1, count))
+        return list((await self.session.execute(stmt)).scalars().all())
+
+    async def _copy(self, table: str, columns: list[str], records: list[tuple]) -> int:
+        if not records:
+            return 0
+        # COPY идет через то же asyncpg-соединение, что и сессия, то есть в её транзакции
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            table,
+            records=records,
+            columns=columns
+        )
+        return len(records)
+
+    async def _insert_geo(self, office_ids: list[int], lons: list[float], lats: list[float]) -> int:
+        if not office_ids:
+            return 0
+        points = func.unnest(
+            cast(office_ids, ARRAY(Integer)),
+            cast(lons, ARRAY(Float)),
+            cast(lats, ARRAY(Float))
+        ).table_valued('office_id', 'lon', 'lat')
+        stmt_geo = insert(Geo).from_select(
+            ['office_id', 'geog'],
+            select(
+                points.c.office_id,
+                cast(
+                    func.ST_SetSRID(func.ST_MakePoint(points.c.lon, points.c.lat), settings.SRID_GEO),
+                    Geography(geometry_type="POINT", srid=settings.SRID_GEO)
+                )
+            )
+        )
+        await self.session.execute(stmt_geo)
+        return len(office_ids)
@@ -0,0 +1,77 @@
+from time import perf_counter
+from weakref import WeakSet
+
+from pydantic import BaseModel
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolStats(BaseModel):
+    checkouts: int = 0
+    # Checkout дольше wait_threshold: ждали свободный слот пула
+    waits: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    timeouts: int = 0
+    # Открытие новых соединений - отдельно от ожидания слота
+    connects: int = 0
+    connect_seconds_total: float = 0.0
+    # Сейчас ждут соединение в _do_get
+    waiting: int = 0
+
+    @property
+    def wait_seconds_avg(self) -> float:
+        return self.wait_seconds_total / self.checkouts if self.checkouts else 0.0
+
+
+class TimedAsyncPool(AsyncAdaptedQueuePool):
+    '''
+    AsyncAdaptedQueuePool, который считает ожидание свободного слота пула
+    и, отдельно, открытие новых соединений. В _do_get они взаимоисключающие:
+    новое соединение открывается, только если слот есть без ожидания.
+    '''
+
+    wait_threshold = 0.001
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        # Соединения, открытые в текущем _do_get
+        self._created = WeakSet()
+
+    def _create_connection(self):
+        started = perf_counter()
+        record = super()._create_connection()
+        self.stats.connects += 1
+        self.stats.connect_seconds_total += perf_counter() - started
+        self._created.add(record)
+        return record
+
+    def _do_get(self):
+        started = perf_counter()
+        self.stats.waiting += 1
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.waiting -= 1
+        waited = perf_counter() - started
+        if connection in self._created:
+            # Слот был свободен, все время ушло на открытие соединения
+            self._created.discard(connection)
+            waited = 0.0
+        self.stats.checkouts += 1
+        self.stats.wait_seconds_total += waited
+        if waited > self.wait_threshold:
+            self.stats.waits += 1
+        if waited > self.stats.wait_seconds_max:
+            self.stats.wait_seconds_max = waited
+        return connection
+
+
+def pool_waiting(pool) -> int:
+    """Сколько сессий ждут соединение; у пулов без статистики - 0"""
+    stats = getattr(pool, 'stats', None)
+    return stats.waiting if stats is not None else 0
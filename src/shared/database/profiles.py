@@ -0,0 +1,99 @@
+from typing import Any, Literal, Optional
+from uuid import uuid4
+
+from sqlalchemy import NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.shared.config.settings import settings
+from src.shared.database.pool import TimedAsyncPool
+
+
+Profile = Literal["direct", "pgbouncer", "test"]
+
+
+def pool_size(profile: Profile, workers: int = settings.WORKERS) -> tuple[int, int]:
+    '''
+    Размер пула одного воркера gunicorn.
+    pgbouncer: соединений у всех воркеров вместе не больше серверного пула
+    PgBouncer (default_pool_size + reserve_pool_size) - тогда очередь
+    за соединением видна в метриках пула приложения, а не скрыта в PgBouncer.
+    direct: max_connections без резерва делится между воркерами,
+    половина держится открытой, половина - overflow.
+    Returns:
+        (pool_size, max_overflow)
+    '''
+    if profile == "pgbouncer":
+        # Округление вниз: при ceil воркеры вместе просят больше серверного пула
+        total = max((settings.PGBOUNCER_DEFAULT_POOL_SIZE + settings.PGBOUNCER_RESERVE_POOL_SIZE) // workers, 1)
+        size = max(settings.PGBOUNCER_DEFAULT_POOL_SIZE // workers, 1)
+    else:
+        total = max((settings.POSTGRES_MAX_CONNECTIONS - settings.POSTGRES_RESERVED_CONNECTIONS) // workers, 1)
+        size = max(total // 2, 1)
+    if settings.POSTGRES_POOL_SIZE is not None:
+        size = settings.POSTGRES_POOL_SIZE
+    overflow = max(total - size, 0)
+    if settings.POSTGRES_MAX_OVERFLOW is not None:
+        overflow = settings.POSTGRES_MAX_OVERFLOW
+    return size, overflow
+
+
+def _statement_cache_args() -> dict[str, Any]:
+    if settings.PREPARED_STATEMENTS == "cached":
+        return {}
+    # Иначе asyncpg переиспользует имена __asyncpg_stmt_N__, а PgBouncer
+    # отдает следующую транзакцию другому серверному соединению
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+
+def engine_params(profile: Profile, workers: int = settings.WORKERS) -> dict[str, Any]:
+    '''
+    Параметры create_async_engine для профиля.
+    Pre-ping (POSTGRES_POOL_PRE_PING) стоит round-trip на каждый checkout, зато
+    соединение, оборванное рестартом Postgres или PgBouncer, заменяется до запроса,
+    а не отдает ошибку. pool_recycle закрывает соединения заранее: для PgBouncer
+    меньше client_idle_timeout, после которого он сам закрывает простаивающих клиентов.
+    '''
+    if profile == "test":
+        return {
+            "poolclass": NullPool,
+            "connect_args": _statement_cache_args(),
+        }
+
+    size, overflow = pool_size(profile, workers)
+    params = {
+        "poolclass": TimedAsyncPool,
+        "pool_size": size,
+        "max_overflow": overflow,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+        "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+    }
+    if profile == "pgbouncer":
+        params["pool_recycle"] = settings.PGBOUNCER_CLIENT_IDLE_TIMEOUT * 0.8
+        params["connect_args"] = _statement_cache_args()
+    else:
+        # Прямое подключение: кэш подготовленных выражений asyncpg всегда безопасен
+        params["pool_recycle"] = settings.POSTGRES_POOL_RECYCLE
+    return params
+
+
+def create_engine(
+    profile: Optional[Profile] = None,
+    uri: Optional[str] = None,
+    workers: int = settings.WORKERS,
+    **overrides
+) -> AsyncEngine:
+    '''
+    Движок профиля (по умолчанию settings.db_profile) на его адрес:
+    direct - Postgres, pgbouncer - PgBouncer, test - settings.postgres_uri
+    '''
+    profile = profile or settings.db_profile
+    if uri is None:
+        uri = {
+            "direct": settings.direct_uri,
+            "pgbouncer": settings.pgbouncer_uri,
+        }.get(profile, settings.postgres_uri)
+    return create_async_engine(uri, **{**engine_params(profile, workers), **overrides})
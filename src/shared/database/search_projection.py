@@ -0,0 +1,60 @@
+from typing import Iterable
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.shared.models.organization import Organization, Phone
+from src.shared.models.office import Office, Geo
+from src.shared.models.work import Category, Work
+from src.shared.models.search import OrganizationSearch
+
+
+def _search_rows(org_ids: list[int]):
+    '''
+    Строки проекции OrganizationSearch, собранные из нормализованных таблиц
+    '''
+    return (
+        select(
+            Organization.org_id,
+            Organization.title,
+            Office.address,
+            func.array_remove(func.array_agg(Phone.phone.distinct()), None),
+            func.array_remove(func.array_agg(Category.title.distinct()), None),
+            func.array_remove(func.array_agg(Category.path.distinct()), None),
+            Geo.geog
+        )
+        .select_from(Organization)
+        .join(Office, Organization.org_id == Office.org_id)
+        .join(Geo, Office.office_id == Geo.office_id)
+        .outerjoin(Phone, Organization.org_id == Phone.org_id)
+        .outerjoin(Work, Organization.org_id == Work.org_id)
+        .outerjoin(Category, Work.category_id == Category.category_id)
+        .where(Organization.org_id.in_(org_ids))
+        .group_by(Organization.org_id, Office.office_id, Geo.geo_id)
+    )
+
+
+async def refresh_organization_search(session: AsyncSession, org_ids: Iterable[int]) -> None:
+    '''
+    Пересобирает строки проекции для переданных организаций.
+    Выполняется в транзакции записи, поэтому проекция меняется атомарно с данными.
+    '''
+    org_ids = list(org_ids)
+    if not org_ids:
+        return
+    columns = [
+        'org_id',
+        'title',
+        'address',
+        'phones',
+        'categories_titles',
+        'categories_paths',
+        'geog'
+    ]
+    stmt = insert(OrganizationSearch).from_select(columns, _search_rows(org_ids))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[OrganizationSearch.org_id],
+        set_={column: stmt.excluded[column] for column in columns[1:]}
+    )
+    await session.execute(stmt)
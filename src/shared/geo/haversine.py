@@ -0,0 +1,94 @@
+import math
+from typing import Optional
+
+import numpy as np
+
+
+# Средний радиус Земли (IUGG), метры
+EARTH_RADIUS_M = 6_371_008.8
+# Метров в градусе широты
+METERS_PER_DEGREE = 111_320.0
+
+
+def haversine(lon: float, lat: float, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+    '''
+    Расстояние по сфере от точки (lon, lat) до каждой из точек lons/lats
+    Returns:
+        массив расстояний в метрах
+    '''
+    lon, lat = math.radians(lon), math.radians(lat)
+    lons, lats = np.radians(lons), np.radians(lats)
+    a = (
+        np.sin((lats - lat) / 2) ** 2
+        + math.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def rank_by_distance(
+    lon: float,
+    lat: float,
+    lons: np.ndarray,
+    lats: np.ndarray,
+    limit: Optional[int] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Порядок точек по расстоянию до (lon, lat) для переранжирования кандидатов
+    из кэша или GeoReplica. При limit сортируются только limit ближайших
+    (argpartition), а не весь набор.
+    Returns:
+        (индексы точек, ближние первыми; их расстояния в метрах)
+    '''
+    distances = haversine(lon, lat, lons, lats)
+    if limit is not None and limit < len(distances):
+        nearest = np.argpartition(distances, limit)[:limit]
+        order = nearest[np.argsort(distances[nearest], kind='stable')]
+    else:
+        order = np.argsort(distances, kind='stable')
+    return order, distances[order]
+
+
+def radius_box(lon: float, lat: float, radius: float) -> tuple[float, float, float, float]:
+    '''
+    Прямоугольник (min_lon, min_lat, max_lon, max_lat), содержащий круг радиуса radius метров.
+    Долгота может выйти за [-180, 180], см. split_lon
+    '''
+    dlat = radius / METERS_PER_DEGREE
+    cos_lat = math.cos(math.radians(min(abs(lat) + dlat, 90.0)))
+    dlon = 180.0 if cos_lat < 1e-6 else min(radius / (METERS_PER_DEGREE * cos_lat), 180.0)
+    return lon - dlon, max(lat - dlat, -90.0), lon + dlon, min(lat + dlat, 90.0)
+
+
+def geodesic_box(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> tuple[float, float, float, float]:
+    '''
+    Прямоугольник в градусах, содержащий ST_MakeEnvelope как geography:
+    ребра geography - дуги большого круга, поэтому широтные стороны
+    выгибаются к полюсу на atan(tan(lat) / cos(dlon / 2)) - lat
+    '''
+    half = math.radians(max_lon - min_lon) / 2
+    if half >= math.pi / 2:
+        # Дуга проходит через полюс
+        return min_lon, -90.0 if min_lat < 0 else min_lat, max_lon, 90.0 if max_lat > 0 else max_lat
+
+    def bulge(lat: float) -> float:
+        return math.degrees(math.atan(math.tan(math.radians(lat)) / math.cos(half)))
+
+    return (
+        min_lon,
+        -bulge(-min_lat) if min_lat < 0 else min_lat,
+        max_lon,
+        bulge(max_lat) if max_lat > 0 else max_lat
+    )
+
+
+def split_lon(min_lon: float, max_lon: float) -> list[tuple[float, float]]:
+    '''
+    Диапазон долгот, выходящий за антимеридиан, как один или два диапазона в [-180, 180]
+    '''
+    if max_lon - min_lon >= 360:
+        return [(-180.0, 180.0)]
+    if min_lon < -180:
+        return [(min_lon + 360, 180.0), (-180.0, max_lon)]
+    if max_lon > 180:
+        return [(min_lon, 180.0), (-180.0, max_lon - 360)]
+    return [(min_lon, max_lon)]
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from time import monotonic
+from typing import Callable, Optional
+
+import numpy as np
+import shapely
+from shapely import STRtree
+from sqlalchemy import select, func, bindparam, DateTime, Float, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.shared.config.settings import settings
+from src.shared.geo.haversine import haversine, radius_box, geodesic_box, split_lon
+from src.shared.models.organization import Organization
+from src.shared.models.office import Office, Geo
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Snapshot:
+    '''
+    Неизменяемый срез точек: массивы и STR-дерево строятся целиком
+    и подменяются одной ссылкой, поэтому чтение не блокируется обновлением
+    '''
+    __slots__ = ('org_ids', 'lons', 'lats', 'tree')
+
+    def __init__(self, org_ids: np.ndarray, lons: np.ndarray, lats: np.ndarray):
+        self.org_ids = org_ids
+        self.lons = lons
+        self.lats = lats
+        self.tree = STRtree(shapely.points(lons, lats))
+
+    def __len__(self) -> int:
+        return len(self.org_ids)
+
+
+class GeoReplica:
+    '''
+    Копия geo (org_id, lon, lat) в памяти процесса. Отдает кандидатов для
+    поиска по радиусу и боксу без обращения к базе: STR-дерево по прямоугольнику,
+    затем векторный haversine. Кандидатов берется с запасом (tolerance, изгиб
+    ребер geography), точное условие PostGIS проверяется в базе по org_id.
+    Обновляется дельтой по organizations.updated_at.
+    Копия отстает от базы: организация, созданная или перемещенная с новым
+    updated_at, не находится до следующего обновления (refresh interval),
+    офис, перемещенный без updated_at, - до полной перезагрузки. Лишних
+    результатов не бывает: удаленный офис отсекает точное условие в базе.
+    Копия старше max_staleness (обновление не проходит) не используется.
+    '''
+
+    def __init__(
+        self,
+        tolerance: float = settings.GEO_REPLICA_TOLERANCE,
+        overlap: float = settings.GEO_REPLICA_OVERLAP,
+        full_reload_interval: float = settings.GEO_REPLICA_FULL_RELOAD_INTERVAL,
+        max_staleness: float = settings.GEO_REPLICA_MAX_STALENESS
+    ):
+        self._tolerance = tolerance
+        self._overlap = timedelta(seconds=overlap)
+        self._full_reload_interval = full_reload_interval
+        self._max_staleness = max_staleness
+        self._snapshot: Optional[_Snapshot] = None
+        self._watermark: Optional[datetime] = None
+        self._loaded_at = 0.0
+        self._refreshed_at = 0.0
+        self._full = self._points_query(delta=False)
+        self._delta = self._points_query(delta=True)
+
+    @staticmethod
+    def _points_query(delta: bool) -> Select:
+        point = func.geometry(Geo.geog)
+        stmt = (
+            select(
+                Office.org_id,
+                func.ST_X(point, type_=Float),
+                func.ST_Y(point, type_=Float),
+                Organization.updated_at
+            )
+            .join(Geo, Office.office_id == Geo.office_id)
+            .join(Organization, Organization.org_id == Office.org_id)
+        )
+        if delta:
+            stmt = stmt.where(Organization.updated_at > bindparam('since', type_=DateTime))
+        return stmt
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def fresh(self) -> bool:
+        '''
+        Загружена и обновлялась не раньше max_staleness секунд назад
+        '''
+        return self._snapshot is not None and monotonic() - self._refreshed_at <= self._max_staleness
+
+    def __len__(self) -> int:
+        return 0 if self._snapshot is None else len(self._snapshot)
+
+    async def refresh(self, session: AsyncSession) -> int:
+        '''
+        Полная загрузка при первом вызове и раз в full_reload_interval,
+        иначе - организации с updated_at позже последнего увиденного (минус overlap)
+        Returns:
+            количество загруженных строк
+        '''
+        started = monotonic()
+        full = self._snapshot is None or started - self._loaded_at >= self._full_reload_interval
+        if full:
+            result = await session.execute(self._full)
+        else:
+            since = (self._watermark or datetime.min) - self._overlap
+            result = await session.execute(self._delta, {'since': since})
+        rows = result.all()
+
+        if rows:
+            org_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            lons = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+            lats = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+            watermark = max(row[3] for row in rows)
+            self._watermark = watermark if self._watermark is None else max(self._watermark, watermark)
+        else:
+            org_ids = np.empty(0, dtype=np.int64)
+            lons = lats = np.empty(0, dtype=np.float64)
+
+        if full:
+            self._snapshot = _Snapshot(org_ids, lons, lats)
+            self._loaded_at = started
+        elif rows:
+            # Измененные организации заменяют свои старые точки
+            current = self._snapshot
+            keep = ~np.isin(current.org_ids, org_ids)
+            self._snapshot = _Snapshot(
+                np.concatenate((current.org_ids[keep], org_ids)),
+                np.concatenate((current.lons[keep], lons)),
+                np.concatenate((current.lats[keep], lats))
+            )
+        self._refreshed_at = started
+        return len(rows)
+
+    async def run(self, session_factory: Callable, interval: float = settings.GEO_REPLICA_REFRESH_INTERVAL):
+        '''
+        Фоновое обновление раз в interval секунд, до отмены задачи
+        '''
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as session:
+                    await self.refresh(session)
+            except Exception:
+                logger.exception("Geo replica refresh failed")
+
+    def _in_box(self, min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> np.ndarray:
+        snapshot = self._snapshot
+        indices = [
+            snapshot.tree.query(shapely.box(west, min_lat, east, max_lat))
+            for west, east in split_lon(min_lon, max_lon)
+        ]
+        return indices[0] if len(indices) == 1 else np.unique(np.concatenate(indices))
+
+    def radius(self, lon: float, lat: float, radius: float) -> list[int]:
+        '''
+        Кандидаты для ST_DWithin(geog, point, radius)
+        Returns:
+            org_id точек не дальше radius * (1 + tolerance) метров по сфере
+        '''
+        snapshot = self._snapshot
+        radius = radius * (1 + self._tolerance)
+        index = self._in_box(*radius_box(lon, lat, radius))
+        distances = haversine(lon, lat, snapshot.lons[index], snapshot.lats[index])
+        return snapshot.org_ids[index[distances <= radius]].tolist()
+
+    def box(self, min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> list[int]:
+        '''
+        Кандидаты для ST_Intersects(geog, envelope::geography)
+        Returns:
+            org_id точек в прямоугольнике, расширенном на изгиб ребер geography
+        '''
+        return self._snapshot.org_ids[self._in_box(*geodesic_box(min_lon, min_lat, max_lon, max_lat))].tolist()
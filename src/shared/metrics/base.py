@@ -0,0 +1,163 @@
+from bisect import bisect_left
+from math import inf
+from typing import Callable, Iterable, Optional, Protocol
+
+from pydantic import BaseModel
+
+
+# Границы по умолчанию: от 100 мкс до 10 с
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if value == inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Collector(Protocol):
+    def render(self) -> Iterable[str]:
+        ...
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, value: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in self._values.items():
+            yield f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}'
+
+
+class Histogram:
+    '''
+    Гистограмма Prometheus. observe - поиск корзины bisect и два сложения:
+    корзины хранятся без накопления, накопленные суммы считаются при выдаче
+    '''
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._bounds = tuple(buckets) + (inf,)
+        # labels -> [счетчики корзин..., сумма]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * len(self._bounds) + [0.0]
+        series[bisect_left(self._bounds, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series is not None else 0
+
+    def sum(self, *labels: str) -> float:
+        series = self._series.get(labels)
+        return series[-1] if series is not None else 0.0
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self._bounds, series):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}'
+
+
+class GaugeCallback:
+    '''
+    Gauge, значение которого читается при выдаче (размер пула и т.п.)
+    '''
+
+    def __init__(self, name: str, help: str, callback: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self._callback = callback
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} gauge'
+        yield f'{self.name} {_number(self._callback())}'
+
+
+class StatsCollector:
+    '''
+    Поля pydantic-модели статистики (CacheStats, PoolStats...) как метрики
+    {prefix}_{поле}: накопительные - counter с суффиксом _total,
+    перечисленные в gauges - gauge. Источник читается при выдаче.
+    '''
+
+    def __init__(self, prefix: str, source: Callable[[], Optional[BaseModel]], gauges: Iterable[str] = ()):
+        self._prefix = prefix
+        self._source = source
+        self._gauges = set(gauges)
+
+    def render(self) -> Iterable[str]:
+        stats = self._source()
+        if stats is None:
+            return
+        for field, value in stats:
+            if field in self._gauges:
+                name, kind = f'{self._prefix}_{field}', 'gauge'
+            else:
+                suffix = '' if field.endswith('_total') else '_total'
+                name, kind = f'{self._prefix}_{field}{suffix}', 'counter'
+            yield f'# TYPE {name} {kind}'
+            yield f'{name} {_number(value)}'
+
+
+class Registry:
+    def __init__(self):
+        self._collectors: dict[str, Collector] = {}
+
+    def register(self, name: str, collector: Collector) -> Collector:
+        # Повторная регистрация (новый bootstrap) заменяет источник
+        self._collectors[name] = collector
+        return collector
+
+    def render(self) -> str:
+        lines = []
+        for collector in self._collectors.values():
+            lines.extend(collector.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
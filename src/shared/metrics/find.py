@@ -0,0 +1,32 @@
+from src.shared.metrics.base import Counter, Histogram, registry
+
+
+# Этапы одного find: parse - разбор query-параметра (UnionQueryParser),
+# build - statement и параметры (OrganizationQueryBuilder.__call__),
+# pool_wait - получение соединения, execute - запрос в базу,
+# materialize - строки и модели страницы, serialize - JSON ответа
+FIND_STAGE_SECONDS = registry.register(
+    'find_stage_seconds',
+    Histogram(
+        'find_stage_seconds',
+        'Время этапа поиска организаций по типу запроса',
+        labelnames=('query_type', 'stage')
+    )
+)
+FIND_ROWS = registry.register(
+    'find_rows',
+    Histogram(
+        'find_rows',
+        'Организаций на странице ответа по типу запроса',
+        labelnames=('query_type',),
+        buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+    )
+)
+FIND_ERRORS = registry.register(
+    'find_errors',
+    Counter(
+        'find_errors_total',
+        'Ошибки поиска организаций по типу запроса',
+        labelnames=('query_type',)
+    )
+)
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import os
+from typing import Iterable, Optional
+
+from .base import Registry, registry as default_registry, _escape
+from src.shared.config.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = '.prom'
+
+
+def _alive(pid: int) -> bool:
+    """Процесс с pid еще работает (воркеры gunicorn - в одном pid namespace)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _with_label(line: str, label: str) -> str:
+    """Добавляет метку к строке значения: name{a="b"} 1 -> name{a="b",label} 1"""
+    space = line.find(' ')
+    brace = line.find('{')
+    if brace != -1 and brace < space:
+        # Значение - число, последняя } закрывает метки
+        close = line.rindex('}')
+        return f'{line[:close]},{label}{line[close:]}'
+    return f'{line[:space]}{{{label}}}{line[space:]}'
+
+
+def merge(texts: dict[str, str]) -> str:
+    """
+    Объединяет выдачи Registry.render нескольких воркеров: заголовки
+    HELP/TYPE метрики - один раз, значения каждого воркера - с меткой worker
+    """
+    families: dict[str, tuple[list[str], list[str]]] = {}
+    owners: dict[str, str] = {}
+    for worker, text in texts.items():
+        label = f'worker="{_escape(worker)}"'
+        family = None
+        for line in text.splitlines():
+            if not line:
+                continue
+            if line.startswith('#'):
+                family = line.split(' ', 3)[2]
+                if family not in families:
+                    families[family] = ([], [])
+                    owners[family] = worker
+                # Заголовки берутся у первого воркера, у которого есть метрика
+                if owners[family] == worker:
+                    families[family][0].append(line)
+                continue
+            families[family][1].append(_with_label(line, label))
+    lines = []
+    for headers, samples in families.values():
+        lines.extend(headers)
+        lines.extend(samples)
+    return '\n'.join(lines) + '\n'
+
+
+class WorkerMetrics:
+    '''
+    Метрики всех воркеров gunicorn в одном ответе /metrics. Registry у каждого
+    воркера свой, а скрейпер попадает в случайный воркер, поэтому каждый
+    воркер раз в interval пишет свою выдачу в файл {path}/{pid}.prom,
+    а /metrics объединяет файлы всех живых воркеров с меткой worker="pid".
+    Значения других воркеров отстают не больше чем на interval.
+    Файлы завершившихся воркеров удаляются при чтении: их счетчики пропадают,
+    rate() по метке worker это переживает как сброс.
+    '''
+
+    def __init__(
+        self,
+        path: str,
+        registry: Registry = default_registry,
+        worker: Optional[int] = None
+    ):
+        self._path = path
+        self._registry = registry
+        self._worker = worker if worker is not None else os.getpid()
+
+    @property
+    def file(self) -> str:
+        return os.path.join(self._path, f'{self._worker}{_SUFFIX}')
+
+    def dump(self) -> None:
+        '''
+        Записывает выдачу registry этого воркера
+        '''
+        os.makedirs(self._path, exist_ok=True)
+        tmp = f'{self.file}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self._registry.render())
+        # Читатель видит либо прежний файл, либо новый целиком
+        os.replace(tmp, self.file)
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.file)
+        except FileNotFoundError:
+            pass
+
+    def _files(self) -> Iterable[tuple[int, str]]:
+        for name in os.listdir(self._path):
+            stem = name[:-len(_SUFFIX)]
+            if name.endswith(_SUFFIX) and stem.isdigit():
+                yield int(stem), os.path.join(self._path, name)
+
+    def render(self) -> str:
+        '''
+        Выдача всех живых воркеров, своя - на момент вызова
+        '''
+        self.dump()
+        texts = {}
+        for worker, file in sorted(self._files()):
+            if worker != self._worker and not _alive(worker):
+                # Файл мог уже удалить другой воркер
+                try:
+                    os.remove(file)
+                except FileNotFoundError:
+                    pass
+                continue
+            try:
+                with open(file, encoding='utf-8') as f:
+                    texts[str(worker)] = f.read()
+            except FileNotFoundError:
+                continue
+        return merge(texts)
+
+    async def run(self, interval: float = settings.METRICS_FLUSH_INTERVAL):
+        '''
+        Фоновая запись раз в interval секунд, до отмены задачи
+        '''
+        while True:
+            try:
+                self.dump()
+            except OSError:
+                logger.exception("Metrics dump failed")
+            await asyncio.sleep(interval)
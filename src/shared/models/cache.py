@@ -0,0 +1,14 @@
+from .base import Base
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger
+from sqlalchemy.dialects.postgresql import VARCHAR
+
+
+class CacheTagVersion(Base):
+    '''версии тегов кэша поиска: общие для всех воркеров API и процессов записи'''
+
+    __tablename__ = "cache_tag_versions"
+
+    tag: Mapped[str] = mapped_column(VARCHAR(255), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
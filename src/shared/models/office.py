@@ -2,13 +2,21 @@ from .base import Base
 from src.shared.config.settings import settings
 
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import VARCHAR
 from geoalchemy2 import Geography
 
 
 class Office(Base):
     __tablename__ = "offices"
+    __table_args__ = (
+        Index(
+            "ix_offices_address_trgm",
+            "address",
+            postgresql_using="gin",
+            postgresql_ops={"address": "gin_trgm_ops"}
+        ),
+    )
 
     office_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
     address: Mapped[str] = mapped_column(VARCHAR(255))
@@ -17,6 +25,10 @@ class Office(Base):
 
 class Geo(Base):
     __tablename__ = "geo"
+    __table_args__ = (
+        # Отбор точек тайла в координатах geometry (&& по прямоугольнику)
+        Index("ix_geo_geom_gist", text("geometry(geog)"), postgresql_using="gist"),
+    )
 
     geo_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
     office_id: Mapped[int] = mapped_column(ForeignKey("offices.office_id", ondelete="CASCADE"), index=True, unique=True)
@@ -0,0 +1,21 @@
+from .base import Base
+from src.shared.config.settings import settings
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey
+from sqlalchemy.dialects.postgresql import VARCHAR, ARRAY
+from geoalchemy2 import Geography
+
+
+class OrganizationSearch(Base):
+    '''read-модель поиска: одна денормализованная строка на организацию'''
+
+    __tablename__ = "organization_search"
+
+    org_id: Mapped[int] = mapped_column(ForeignKey("organizations.org_id", ondelete="CASCADE"), primary_key=True)
+    title: Mapped[str] = mapped_column(VARCHAR(255))
+    address: Mapped[str] = mapped_column(VARCHAR(255))
+    phones: Mapped[list[str]] = mapped_column(ARRAY(VARCHAR(255)))
+    categories_titles: Mapped[list[str]] = mapped_column(ARRAY(VARCHAR(255)))
+    categories_paths: Mapped[list[str]] = mapped_column(ARRAY(VARCHAR(255)))
+    geog: Mapped[Geography] = mapped_column(Geography(geometry_type="POINT", srid=settings.SRID_GEO), comment="WGS84")
@@ -0,0 +1,26 @@
+from sqlalchemy import ColumnElement, func
+from sqlalchemy.types import UserDefinedType
+
+
+class LTREE(UserDefinedType):
+    '''Тип ltree (расширение ltree), значения передаются текстом: "a.b.c"'''
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "LTREE"
+
+
+class LQUERY(UserDefinedType):
+    '''Шаблон ltree для оператора ~, например "a.*{1}"'''
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "LQUERY"
+
+
+# Путь категории "/a/b/c" -> ltree "a.b.c"
+PATH_TO_LTREE_SQL = "text2ltree(replace(ltrim(path, '/'), '/', '.'))"
+
+
+def path_to_ltree(path: ColumnElement) -> ColumnElement:
+    return func.text2ltree(func.replace(func.ltrim(path, '/'), '/', '.'), type_=LTREE)
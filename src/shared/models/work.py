@@ -1,8 +1,9 @@
 from .base import Base
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, Computed
 from sqlalchemy.dialects.postgresql import VARCHAR
+from .types import LTREE, PATH_TO_LTREE_SQL
 
 
 
@@ -18,10 +19,21 @@ class Work(Base):
     
 class Category(Base):
     __tablename__ = "categories"
+    __table_args__ = (
+        Index(
+            "ix_categories_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"}
+        ),
+        Index("ix_categories_tree_gist", "tree", postgresql_using="gist"),
+    )
 
     category_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
     title: Mapped[str] = mapped_column(VARCHAR(255))
-    path: Mapped[str] = mapped_column(VARCHAR(255))
+    path: Mapped[str] = mapped_column(VARCHAR(255), index=True, unique=True)
+    # Тот же путь в виде ltree: поддерево (<@), предки (@>) и уровни (~) по GiST-индексу
+    tree: Mapped[str] = mapped_column(LTREE, Computed(PATH_TO_LTREE_SQL, persisted=True))
 
     organizations: Mapped[list["Organization"]] = relationship(
         "Organization",
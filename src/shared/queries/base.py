@@ -1,4 +1,5 @@
 from typing import Protocol, Any
+from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeMeta
 from src.shared.schemas.organization import (
@@ -9,7 +10,9 @@ from src.shared.schemas.organization import (
     CategoryTitleQuery,
     OfficeAddressQuery,
     GeoRadiusQuery,
-    GeoBoxQuery
+    GeoBoxQuery,
+    GeoNearestQuery,
+    CompoundQuery
 )
 
 class BaseQuery(Protocol):
@@ -42,5 +45,20 @@ class QueryBuilder(Protocol):
     async def _get_by_geo_box(self, query: GeoBoxQuery):
         ...
 
-    async def __call__(self, query: OrganizationQueryI):
+    async def _get_by_geo_nearest(self, query: GeoNearestQuery):
+        ...
+
+    async def _get_by_compound(self, query: CompoundQuery):
+        ...
+
+    def page_size(self, query: OrganizationQueryI) -> int:
+        ...
+
+    def ids_query(self) -> Select:
+        ...
+
+    async def facets(self, query: OrganizationQueryI) -> tuple[Select, dict[str, Any]]:
+        ...
+
+    async def __call__(self, query: OrganizationQueryI, paginate: bool = True) -> tuple[Select, dict[str, Any]]:
         ...
\ No newline at end of file
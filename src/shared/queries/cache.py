@@ -0,0 +1,54 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .base import BaseQuery
+from .organization import OrganizationQuery
+from src.shared.cache.base import TaggedCache
+from src.shared.cache.organization import query_cache_key, query_tags
+from src.shared.models.organization import Organization
+from src.shared.schemas.organization import OrganizationQueryI, OrganizationQueryO, OrganizationPageO, OrganizationFacetsO
+
+
+class CachedOrganizationQuery(BaseQuery):
+    '''
+    Кэширующая обертка над OrganizationQuery с тем же интерфейсом find.
+    Версии тегов читаются до запроса в базу: если запись организации
+    закоммитится во время запроса, результат сохранится со старыми версиями
+    и не будет отдан из кэша.
+    '''
+    _model = Organization
+
+    def __init__(self, query: OrganizationQuery, cache: TaggedCache):
+        self._query = query
+        self._cache = cache
+
+    @property
+    def cache(self) -> TaggedCache:
+        return self._cache
+
+    async def find(self, session: AsyncSession, query: OrganizationQueryI) -> OrganizationPageO:
+        key = query_cache_key(query)
+        versions = await self._cache.versions(query_tags(query))
+        page = await self._cache.get(key, versions, OrganizationPageO)
+        if page is not None:
+            return page
+        page = await self._query.find(session, query)
+        await self._cache.set(key, versions, page)
+        return page
+
+    async def facets(self, session: AsyncSession, query: OrganizationQueryI) -> OrganizationFacetsO:
+        # Фасеты считаются по всей выдаче: страница не входит в ключ
+        query = query.model_copy(update={'limit': None, 'cursor': None})
+        key = f"facets:{query_cache_key(query)}"
+        versions = await self._cache.versions(query_tags(query))
+        facets = await self._cache.get(key, versions, OrganizationFacetsO)
+        if facets is not None:
+            return facets
+        facets = await self._query.facets(session, query)
+        await self._cache.set(key, versions, facets)
+        return facets
+
+    async def find_by_ids(self, session: AsyncSession, org_ids: list[int]) -> dict[int, OrganizationQueryO]:
+        return await self._query.find_by_ids(session, org_ids)
+
+    def stream(self, session: AsyncSession, query: OrganizationQueryI, **kwargs):
+        return self._query.stream(session, query, **kwargs)
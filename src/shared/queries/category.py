@@ -0,0 +1,84 @@
+from sqlalchemy import select, func, bindparam, Integer, String, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .base import BaseQuery
+from src.shared.models.work import Work, Category
+from src.shared.models.types import LTREE, path_to_ltree
+from src.shared.schemas.category import CategoryTreeQuery, CategoryTreeO, CategoryO, CategoryNodeO
+
+
+class CategoryQuery(BaseQuery):
+    _model = Category
+
+    def __init__(self):
+        self._root_children = self._children_query(with_parent=False)
+        self._children = self._children_query(with_parent=True)
+        # Категории на пути от корня до родителя: tree @> ltree(:category_path)
+        self._ancestors = (
+            select(Category.path, Category.title)
+            .where(
+                Category.tree.op('@>', is_comparison=True)(
+                    path_to_ltree(bindparam('category_path', type_=String))
+                )
+            )
+            .order_by(func.nlevel(Category.tree))
+        )
+
+    @staticmethod
+    def _children_query(with_parent: bool) -> Select:
+        """
+        Дочерние узлы родителя с числом организаций в поддереве каждого.
+        Узел - префикс subpath(tree, 0, :depth) категорий поддерева, поэтому
+        промежуточные уровни без собственной строки в categories тоже попадают
+        в выдачу (название тогда - последняя метка пути).
+        """
+        depth = bindparam('depth', type_=Integer)
+        child = func.subpath(Category.tree, 0, depth, type_=LTREE)
+        descendants = (
+            select(child.label('child'), Work.org_id)
+            .join(Work, Work.category_id == Category.category_id)
+            .where(func.nlevel(Category.tree) >= depth)
+        )
+        if with_parent:
+            descendants = descendants.where(
+                Category.tree.op('<@', is_comparison=True)(
+                    path_to_ltree(bindparam('category_path', type_=String))
+                )
+            )
+        descendants = descendants.subquery()
+
+        node = Category.__table__.alias('node')
+        return (
+            select(
+                func.concat('/', func.replace(func.ltree2text(descendants.c.child), '.', '/')).label('path'),
+                func.coalesce(
+                    node.c.title,
+                    func.ltree2text(func.subpath(descendants.c.child, -1, type_=LTREE))
+                ).label('title'),
+                func.count(descendants.c.org_id.distinct()).label('organizations')
+            )
+            .outerjoin(node, node.c.tree == descendants.c.child)
+            .group_by(descendants.c.child, node.c.title)
+            .order_by(descendants.c.child)
+        )
+
+    async def find(self, session: AsyncSession, query: CategoryTreeQuery) -> CategoryTreeO:
+        '''
+        Дочерние категории query.category_path (или верхний уровень) с количеством
+        организаций в поддереве каждой - одним запросом по GiST-индексу ltree
+        '''
+        if query.category_path is None:
+            children = await session.execute(self._root_children, {'depth': 1})
+            ancestors = []
+        else:
+            params = {
+                'category_path': query.category_path,
+                'depth': len([part for part in query.category_path.split('/') if part]) + 1
+            }
+            children = await session.execute(self._children, params)
+            result = await session.execute(self._ancestors, {'category_path': query.category_path})
+            ancestors = [CategoryO.model_validate(row) for row in result.mappings()]
+        return CategoryTreeO(
+            ancestors=ancestors,
+            children=[CategoryNodeO.model_validate(row) for row in children.mappings()]
+        )
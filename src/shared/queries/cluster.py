@@ -0,0 +1,81 @@
+from sqlalchemy import select, func, cast, bindparam, Float, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from geoalchemy2 import Geometry
+
+from .base import BaseQuery
+from .organization import OrganizationQueryBuilder
+from src.shared.config.settings import settings
+from src.shared.models.office import Office, Geo
+from src.shared.schemas.cluster import GeoClusterQuery, GeoClustersO, GeoClusterO
+
+
+class ClusterQuery(BaseQuery):
+    _model = Geo
+
+    def __init__(
+        self,
+        cells_per_tile: int = settings.CLUSTER_CELLS_PER_TILE,
+        max_cells_per_side: int = settings.CLUSTER_MAX_CELLS_PER_SIDE,
+        sample_size: int = settings.CLUSTER_SAMPLE_SIZE
+    ):
+        self._cells_per_tile = cells_per_tile
+        self._max_cells_per_side = max_cells_per_side
+        self._clusters = self._clusters_query(sample_size)
+
+    @staticmethod
+    def _clusters_query(sample_size: int) -> Select:
+        """
+        Точки окна (GiST-индекс geog) группируются по ST_SnapToGrid(:grid).
+        Сетка привязана к началу координат, поэтому при сдвиге окна
+        кластеры внутри него не меняются.
+        """
+        point = cast(Geo.geog, Geometry(srid=settings.SRID_GEO))
+        cell = func.ST_SnapToGrid(point, bindparam('grid', type_=Float))
+        centroid = func.ST_Centroid(func.ST_Collect(point))
+        return (
+            select(
+                func.ST_X(centroid).label('lon'),
+                func.ST_Y(centroid).label('lat'),
+                func.count(Office.org_id.distinct()).label('count'),
+                func.array_agg(Office.org_id.distinct())[1:sample_size].label('org_ids')
+            )
+            .select_from(Geo)
+            .join(Office, Office.office_id == Geo.office_id)
+            .where(OrganizationQueryBuilder._box_condition())
+            .group_by(cell)
+            .order_by(func.count(Office.org_id.distinct()).desc())
+        )
+
+    def grid(self, query: GeoClusterQuery) -> float:
+        '''
+        Шаг сетки в градусах: из zoom - CLUSTER_CELLS_PER_TILE ячеек на тайл
+        (тайл zoom z - 360 / 2^z градусов долготы), не мельче, чем
+        CLUSTER_MAX_CELLS_PER_SIDE ячеек на сторону окна
+        '''
+        grid = query.grid
+        if grid is None:
+            grid = 360 / (2 ** query.zoom * self._cells_per_tile)
+        return max(
+            grid,
+            (query.max_lon - query.min_lon) / self._max_cells_per_side,
+            (query.max_lat - query.min_lat) / self._max_cells_per_side
+        )
+
+    async def find(self, session: AsyncSession, query: GeoClusterQuery) -> GeoClustersO:
+        '''
+        Кластеры организаций в окне карты одним запросом: центроид,
+        количество и несколько id на ячейку сетки
+        '''
+        grid = self.grid(query)
+        params = {
+            'min_lon': query.min_lon,
+            'min_lat': query.min_lat,
+            'max_lon': query.max_lon,
+            'max_lat': query.max_lat,
+            'grid': grid
+        }
+        result = await session.execute(self._clusters, params)
+        return GeoClustersO(
+            grid=grid,
+            clusters=[GeoClusterO.model_validate(row) for row in result.mappings()]
+        )
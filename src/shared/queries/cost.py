@@ -0,0 +1,71 @@
+import math
+
+from src.shared.config.settings import settings
+from src.shared.geo.haversine import EARTH_RADIUS_M
+from src.shared.schemas.organization import (
+    OrganizationQueryI,
+    CategoryPathQuery,
+    GeoRadiusQuery,
+    GeoBoxQuery,
+    CompoundQuery,
+    GeoI,
+)
+
+
+# Глубина пути категории по CATEGORY_PATH_PATTERN
+CATEGORY_MAX_DEPTH = 3
+
+_EARTH_RADIUS_KM = EARTH_RADIUS_M / 1000
+
+
+def box_area_km2(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> float:
+    """Площадь прямоугольника на сфере; бокс через антимеридиан - с min_lon > max_lon"""
+    width = math.radians((max_lon - min_lon) % 360)
+    height = abs(math.sin(math.radians(max_lat)) - math.sin(math.radians(min_lat)))
+    return _EARTH_RADIUS_KM ** 2 * width * height
+
+
+def radius_area_km2(radius: float) -> float:
+    return math.pi * (radius / 1000) ** 2
+
+
+def _geo_cost(area_km2: float) -> float:
+    return area_km2 / settings.ADMISSION_AREA_UNIT_KM2
+
+
+def _path_cost(path: str) -> float:
+    # Каждый уровень выше листа - примерно вдвое больше организаций
+    depth = path.count('/')
+    return 2.0 ** max(0, CATEGORY_MAX_DEPTH - depth)
+
+
+def _compound_cost(query: CompoundQuery) -> float:
+    # Как и теги кэша: выдачу ограничивает самый узкий из фильтров
+    costs = []
+    if query.box is not None:
+        costs.append(_geo_cost(box_area_km2(query.box.min_lon, query.box.min_lat, query.box.max_lon, query.box.max_lat)))
+    if query.geo is not None:
+        costs.append(_geo_cost(radius_area_km2(query.radius)))
+    if query.category_path is not None:
+        costs.append(_path_cost(query.category_path))
+    if query.org_title is not None or query.category_title is not None or query.office_address is not None:
+        costs.append(1.0)
+    return min(costs)
+
+
+def query_cost(query: OrganizationQueryI) -> float:
+    '''
+    Оценка стоимости запроса поиска без обращения к базе, 1.0 - обычный запрос:
+    площадь бокса или круга в ADMISSION_AREA_UNIT_KM2, для пути категории -
+    чем он короче, тем больше организаций под ним
+    '''
+    if isinstance(query, GeoBoxQuery):
+        return _geo_cost(box_area_km2(query.min_lon, query.min_lat, query.max_lon, query.max_lat))
+    if isinstance(query, GeoRadiusQuery):
+        return _geo_cost(radius_area_km2(query.radius))
+    if isinstance(query, CategoryPathQuery):
+        return _path_cost(query.category_path)
+    if isinstance(query, CompoundQuery):
+        return _compound_cost(query)
+    # Поиск по id, тексту и ближайшие соседи ограничены индексом и limit
+    return 1.0
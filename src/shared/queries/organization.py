@@ -1,34 +1,52 @@
-from typing import Any, Dict, Type
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Type
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import RowMapping
 from .base import BaseQuery
 from src.shared.models.organization import Organization, Phone
 from src.shared.models.work import Work, Category
 from src.shared.models.office import Office, Geo
+from src.shared.models.search import OrganizationSearch
+from src.shared.models.types import LTREE, path_to_ltree
 
 from src.shared.schemas.organization import (
     OrganizationQueryI,
     OrganizationQueryO,
+    OrganizationPageO,
+    OrganizationFacetsO,
+    FacetO,
+    GeoCellFacetO,
     OrgIdQuery,
     OrgTitleQuery,
     CategoryPathQuery,
     CategoryTitleQuery,
     OfficeAddressQuery,
     GeoRadiusQuery,
-    GeoBoxQuery
+    GeoBoxQuery,
+    GeoNearestQuery,
+    CompoundQuery
     )
-from sqlalchemy import select, func, or_
+from src.shared.schemas.pagination import decode_keyset, encode_cursor
+from sqlalchemy import select, func, and_, tuple_, cast, bindparam, any_, Select, ColumnElement, Float, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from .base import QueryBuilder
 from inspect import signature, getmembers, ismethod
 from src.shared.config.settings import settings
-from geoalchemy2.shape import from_shape
-from shapely.geometry import Point, box
+from geoalchemy2 import Geography, Geometry
+from src.shared.geo.replica import GeoReplica
+from src.shared.metrics.find import FIND_STAGE_SECONDS, FIND_ROWS
 
 
 class OrganizationQueryBuilder(QueryBuilder):
     
-    def __init__(self):
+    def __init__(self, use_projection: bool = False, replica: Optional[GeoReplica] = None):
+        self._use_projection = use_projection
+        # Загруженная копия geo: кандидаты радиуса и бокса ищутся в памяти
+        self._replica = replica
         self._query_handlers: Dict[Type[OrganizationQueryI], str] = {}
+        # Вариант запроса -> (готовый параметризованный statement, число ключей пагинации)
+        self._statements: Dict[tuple, tuple[Select, int]] = {}
         self._register_handlers()
     
     def _register_handlers(self):
@@ -44,6 +62,7 @@ class OrganizationQueryBuilder(QueryBuilder):
         """
         return (
             select(
+                Organization.org_id,
                 Organization.title.label('org_title'),
                 func.array_agg(Phone.phone.distinct()).label('phones'),
                 Office.address.label('office_address'),
@@ -54,115 +73,597 @@ class OrganizationQueryBuilder(QueryBuilder):
             .join(Office, Organization.org_id == Office.org_id)
             .join(Work, Organization.org_id == Work.org_id)
             .join(Category, Work.category_id == Category.category_id)
-            .group_by(Organization.title, Office.address)
+            .group_by(Organization.org_id, Organization.title, Office.address)
         )
     
+    def _projection_query(self):
+        """
+        Запрос к read-модели organization_search: без join и GROUP BY
+        """
+        return select(
+            OrganizationSearch.org_id,
+            OrganizationSearch.title.label('org_title'),
+            OrganizationSearch.phones,
+            OrganizationSearch.address.label('office_address'),
+            OrganizationSearch.categories_titles
+        )
+    
+    def _output_query(self, ids: Select):
+        """
+        Собирает строки OrganizationQueryO для организаций, отобранных фильтром ids.
+        Если фильтр отдает колонку rank (меньше - лучше), строки сортируются по ней,
+        остальные колонки фильтра (например distance_m) попадают в результат.
+        """
+        if 'rank' not in ids.selected_columns:
+            if self._use_projection:
+                return (
+                    self._projection_query()
+                    .where(OrganizationSearch.org_id.in_(ids))
+                    .order_by(OrganizationSearch.org_id)
+                )
+            return (
+                self._base_query()
+                .where(Organization.org_id.in_(ids))
+                .order_by(Organization.org_id)
+            )
+
+        ids = ids.subquery()
+        extra = [column for column in ids.c if column.key not in ('org_id', 'rank')]
+        if self._use_projection:
+            stmt = (
+                self._projection_query()
+                .add_columns(ids.c.rank, *extra)
+                .join(ids, ids.c.org_id == OrganizationSearch.org_id)
+            )
+        else:
+            stmt = (
+                self._base_query()
+                .add_columns(ids.c.rank, *extra)
+                .join(ids, ids.c.org_id == Organization.org_id)
+                .group_by(ids.c.rank, *extra)
+            )
+        return stmt.order_by(ids.c.rank, ids.c.org_id)
+
+    def page_size(self, query: OrganizationQueryI) -> int:
+        return query.limit or settings.FIND_DEFAULT_LIMIT
+
+    def _paginate(self, ids: Select, with_cursor: bool) -> tuple[Select, int]:
+        """
+        Keyset-пагинация фильтра по (rank, org_id) или по org_id.
+        Выбирается на одну строку больше страницы, чтобы узнать, есть ли следующая.
+        Размер страницы и значения курсора передаются параметрами limit и cursor_N.
+        Returns:
+            (statement, число ключей курсора)
+        """
+        ids = ids.subquery()
+        keys = [ids.c.rank, ids.c.org_id] if 'rank' in ids.c else [ids.c.org_id]
+        stmt = select(ids).order_by(*keys).limit(bindparam('limit', type_=Integer))
+        if with_cursor:
+            values = [bindparam(f'cursor_{i}', type_=key.type) for i, key in enumerate(keys)]
+            stmt = stmt.where(tuple_(*keys) > tuple_(*values))
+        return stmt, len(keys)
+
+    @staticmethod
+    def _nearest_limit(ids: Select, query: OrganizationQueryI) -> Select:
+        """
+        У ближайших соседей нет фильтра, только ранг <->: без пагинации
+        (поток, фасеты) выборка все равно ограничивается N ближайшими (limit запроса)
+        """
+        if isinstance(query, GeoNearestQuery):
+            return ids.order_by(ids.selected_columns.rank).limit(bindparam('limit', type_=Integer))
+        return ids
+
+    @staticmethod
+    def _variant(query: OrganizationQueryI, paginate: bool) -> tuple:
+        """
+        Форма запроса, от которой зависит текст SQL (но не значения параметров):
+        тип и набор заданных полей (нечеткий поиск, фильтры составного запроса)
+        """
+        fields = tuple(
+            name for name, value in query
+            if value is not None and name not in ('limit', 'cursor')
+        )
+        return (
+            type(query),
+            fields,
+            paginate and query.cursor is not None,
+            paginate
+        )
+
+    def _use_replica(self, query: OrganizationQueryI) -> bool:
+        """
+        Кандидаты радиуса и бокса берутся из GeoReplica, только пока она свежая:
+        устаревшая копия не видит новых и перемещенных организаций, и запрос
+        идет чистым PostGIS (свой вариант statement без org_id = ANY)
+        """
+        return (
+            self._replica is not None
+            and isinstance(query, (GeoRadiusQuery, GeoBoxQuery))
+            and self._replica.fresh
+        )
+
+    def _params(
+        self,
+        query: OrganizationQueryI,
+        paginate: bool,
+        key_count: int,
+        replica: bool = False
+    ) -> dict[str, Any]:
+        """
+        Значения bindparam: поля запроса (geo -> lon/lat, box -> min_lon...),
+        размер страницы, ключи курсора и кандидаты из GeoReplica
+        """
+        params = {}
+        for name, value in query.model_dump(exclude={'limit', 'cursor'}, exclude_none=True).items():
+            # Вложенные модели (geo, box) раскладываются на свои поля
+            if isinstance(value, dict):
+                params.update(value)
+            else:
+                params[name] = value
+        if paginate:
+            params['limit'] = self.page_size(query) + 1
+            if query.cursor is not None:
+                values = decode_keyset(query.cursor, key_count)
+                params.update((f'cursor_{i}', value) for i, value in enumerate(values))
+        elif isinstance(query, GeoNearestQuery):
+            params['limit'] = self.page_size(query)
+        if replica:
+            if isinstance(query, GeoRadiusQuery):
+                params['geo_ids'] = self._replica.radius(query.geo.lon, query.geo.lat, query.radius)
+            elif isinstance(query, GeoBoxQuery):
+                params['geo_ids'] = self._replica.box(query.min_lon, query.min_lat, query.max_lon, query.max_lat)
+        return params
+
+    @staticmethod
+    def _point() -> ColumnElement:
+        return cast(
+            func.ST_SetSRID(
+                func.ST_MakePoint(bindparam('lon', type_=Float), bindparam('lat', type_=Float)),
+                settings.SRID_GEO
+            ),
+            Geography(srid=settings.SRID_GEO)
+        )
+
+    def _radius_condition(self) -> ColumnElement:
+        return Geo.geog.ST_DWithin(self._point(), bindparam('radius', type_=Float))
+
+    @staticmethod
+    def _box_condition() -> ColumnElement:
+        bbox = func.ST_MakeEnvelope(
+            bindparam('min_lon', type_=Float),
+            bindparam('min_lat', type_=Float),
+            bindparam('max_lon', type_=Float),
+            bindparam('max_lat', type_=Float),
+            settings.SRID_GEO
+        )
+        return Geo.geog.ST_Intersects(cast(bbox, Geography(srid=settings.SRID_GEO)))
+
+    @staticmethod
+    def _replica_condition() -> ColumnElement:
+        """
+        Кандидаты из GeoReplica: org_id = ANY(:geo_ids) по индексу offices.org_id
+        вместо обхода GiST, точное гео-условие проверяется только на них
+        """
+        return Office.org_id == any_(bindparam('geo_ids', type_=ARRAY(Integer)))
+
+    @staticmethod
+    def _category_path_condition() -> ColumnElement:
+        """
+        Категория и все ее подкатегории: tree <@ ltree(:category_path), GiST-индекс
+        """
+        path = path_to_ltree(bindparam('category_path', type_=String))
+        return Category.tree.op('<@', is_comparison=True)(path)
+    
+    def _text_filter(self, column: ColumnElement, name: str, similarity: Optional[float]):
+        """
+        Условие поиска по подстроке (ilike) или, если задан порог, по похожести pg_trgm.
+        Оба варианта обслуживаются GIN-индексом gin_trgm_ops.
+        Значение и порог передаются параметрами name и similarity.
+        Returns:
+            (условие, rank) - rank задан только для поиска по похожести
+        """
+        value = bindparam(name, type_=String)
+        if similarity is None:
+            return column.icontains(value), None
+        condition = and_(
+            column.op('%')(value),
+            func.similarity(column, value) >= bindparam('similarity', type_=Float)
+        )
+        return condition, column.op('<->', return_type=Float)(value)
+    
     async def _get_by_id(self, query: OrgIdQuery):
         '''
         Поиск организации по id
         Returns:
-            seleceted organization by schema OrganizationQueryO
+            selected org_id
         '''
-        return self._base_query().where(Organization.org_id == query.org_id)
+        return select(Organization.org_id).where(Organization.org_id == bindparam('org_id', type_=Integer))
     
     async def _get_by_title(self, query: OrgTitleQuery):
         '''
         Поиск организации по названию
         Returns:
-            seleceted organization by schema OrganizationQueryO
+            selected org_id
         '''
-        return self._base_query().where(Organization.title.ilike(f"%{query.org_title}%"))
+        condition, rank = self._text_filter(Organization.title, 'org_title', query.similarity)
+        stmt = select(Organization.org_id).where(condition)
+        if rank is not None:
+            stmt = stmt.add_columns(rank.label('rank'))
+        return stmt
     
     async def _get_by_category_path(self, query: CategoryPathQuery):
         '''
         Поиск организации по пути категории
         Returns:
-            seleceted organization by schema OrganizationQueryO
+            selected org_id
         '''
-        return self._base_query().where(
-            or_(
-                Category.path == query.category_path,
-                Category.path.like(f"{query.category_path}/%")
-            )
+        return (
+            select(Work.org_id)
+            .join(Category, Work.category_id == Category.category_id)
+            .where(self._category_path_condition())
+            .distinct()
         )
 
     async def _get_by_category_title(self, query: CategoryTitleQuery):
         '''
         Поиск организации по названию категории
         Returns:
-            seleceted organization by schema OrganizationQueryO
+            selected org_id
         '''
-        return self._base_query().where(Category.title.ilike(f"%{query.category_title}%"))
+        condition, rank = self._text_filter(Category.title, 'category_title', query.similarity)
+        stmt = (
+            select(Work.org_id)
+            .join(Category, Work.category_id == Category.category_id)
+            .where(condition)
+        )
+        if rank is not None:
+            return stmt.add_columns(func.min(rank).label('rank')).group_by(Work.org_id)
+        return stmt.distinct()
     
     async def _get_by_office_address(self, query: OfficeAddressQuery):
         '''
         Поиск организации по адресу офиса
         Returns:
-            seleceted organization by schema OrganizationQueryO
+            selected org_id
         '''
-        return self._base_query().where(Office.address.ilike(f"%{query.office_address}%"))
+        condition, rank = self._text_filter(Office.address, 'office_address', query.similarity)
+        stmt = select(Office.org_id).where(condition)
+        if rank is not None:
+            stmt = stmt.add_columns(rank.label('rank'))
+        return stmt
     
     async def _get_by_geo_radius(self, query: GeoRadiusQuery):
         '''
-        Поиск организации по радиусу
+        Поиск организации по радиусу, ближние первыми: rank = distance_m = ST_Distance
+        по сфероиду, считается только для точек внутри радиуса
         Returns:
-            seleceted organization by schema OrganizationQueryO
+            selected org_id, distance_m
         '''
-        point = Point(query.geo.lon, query.geo.lat)
-        return (
-            self._base_query()
-            .join(Geo, Office.office_id == Geo.office_id)
-            .where(
-                Geo.geog.ST_DWithin(
-                    from_shape(point, srid=settings.SRID_GEO),
-                    query.radius
-                )
+        distance = Geo.geog.ST_Distance(self._point())
+        stmt = (
+            select(
+                Office.org_id,
+                distance.label('rank'),
+                distance.label('distance_m')
             )
+            .join(Geo, Office.office_id == Geo.office_id)
+            .where(self._radius_condition())
         )
+        return stmt
     
     async def _get_by_geo_box(self, query: GeoBoxQuery):
         '''
         Поиск организации по гео-боксу
         Returns:
-            seleceted organization by schema OrganizationQueryO
+            selected org_id
         '''
-        bbox = box(
-            query.min_lon,
-            query.min_lat,
-            query.max_lon,
-            query.max_lat
+        stmt = (
+            select(Office.org_id)
+            .join(Geo, Office.office_id == Geo.office_id)
+            .where(self._box_condition())
         )
+        return stmt
+    
+    async def _get_by_geo_nearest(self, query: GeoNearestQuery):
+        '''
+        Поиск N ближайших организаций: rank = geog <-> point, поэтому
+        ORDER BY rank LIMIT N при пагинации обходит GiST-индекс idx_geo_geog (KNN)
+        вместо сортировки всех точек
+        Returns:
+            selected org_id, distance_m
+        '''
+        point = self._point()
         return (
-            self._base_query()
+            select(
+                Office.org_id,
+                Geo.geog.op('<->', return_type=Float)(point).label('rank'),
+                Geo.geog.ST_Distance(point).label('distance_m')
+            )
             .join(Geo, Office.office_id == Geo.office_id)
-            .where(
-                Geo.geog.ST_Intersects(
-                    from_shape(bbox, srid=settings.SRID_GEO)
+        )
+
+    async def _get_by_compound(self, query: CompoundQuery):
+        '''
+        Пересечение нескольких фильтров в одном WHERE.
+        Фильтры по офису и категориям - полусоединения (IN), поэтому строки
+        не размножаются и DISTINCT не нужен. Порядок - от обычно самых
+        селективных и дешевых по индексу: гео (GiST), путь категории,
+        затем триграммные фильтры.
+        Returns:
+            selected org_id
+        '''
+        conditions = []
+
+        office_conditions = []
+        if query.geo is not None:
+            office_conditions.append(self._radius_condition())
+        if query.box is not None:
+            office_conditions.append(self._box_condition())
+        if office_conditions:
+            conditions.append(
+                Organization.org_id.in_(
+                    select(Office.org_id)
+                    .join(Geo, Office.office_id == Geo.office_id)
+                    .where(*office_conditions)
+                )
+            )
+
+        if query.category_path is not None:
+            conditions.append(
+                Organization.org_id.in_(
+                    select(Work.org_id)
+                    .join(Category, Work.category_id == Category.category_id)
+                    .where(self._category_path_condition())
+                )
+            )
+        if query.office_address is not None:
+            condition, _ = self._text_filter(Office.address, 'office_address', None)
+            conditions.append(Organization.org_id.in_(select(Office.org_id).where(condition)))
+        if query.org_title is not None:
+            condition, _ = self._text_filter(Organization.title, 'org_title', None)
+            conditions.append(condition)
+        if query.category_title is not None:
+            condition, _ = self._text_filter(Category.title, 'category_title', None)
+            conditions.append(
+                Organization.org_id.in_(
+                    select(Work.org_id)
+                    .join(Category, Work.category_id == Category.category_id)
+                    .where(condition)
+                )
+            )
+        return select(Organization.org_id).where(*conditions)
+
+    def ids_query(self) -> Select:
+        '''
+        Набор организаций по списку id одним запросом: org_id = ANY(:org_ids).
+        Используется для объединения OrgIdQuery из пакетного запроса.
+        '''
+        if 'ids' not in self._statements:
+            ids = select(Organization.org_id).where(
+                Organization.org_id == any_(bindparam('org_ids', type_=ARRAY(Integer)))
+            )
+            self._statements['ids'] = (self._output_query(ids), 0)
+        return self._statements['ids'][0]
+
+    def _facets_query(self, ids: Select) -> Select:
+        '''
+        Счетчики по отфильтрованным организациям одним GROUPING SETS:
+        категория верхнего уровня, название категории, ячейка гео-сетки (:cell градусов).
+        grouping_id показывает, к какому набору относится строка.
+        '''
+        ids = ids.subquery()
+        top_path = func.ltree2text(func.subpath(Category.tree, 0, 1, type_=LTREE)).label('top_path')
+        point = cast(Geo.geog, Geometry(srid=settings.SRID_GEO))
+        cell = bindparam('cell', type_=Float)
+        cell_x = func.floor(func.ST_X(point) / cell).label('cell_x')
+        cell_y = func.floor(func.ST_Y(point) / cell).label('cell_y')
+        return (
+            select(
+                func.grouping(top_path, Category.title, cell_x, cell_y).label('grouping_id'),
+                top_path,
+                Category.title.label('category_title'),
+                cell_x,
+                cell_y,
+                func.count(ids.c.org_id.distinct()).label('count')
+            )
+            .select_from(ids)
+            .outerjoin(Work, Work.org_id == ids.c.org_id)
+            .outerjoin(Category, Category.category_id == Work.category_id)
+            .outerjoin(Office, Office.org_id == ids.c.org_id)
+            .outerjoin(Geo, Geo.office_id == Office.office_id)
+            .group_by(
+                func.grouping_sets(
+                    tuple_(top_path),
+                    tuple_(Category.title),
+                    tuple_(cell_x, cell_y)
                 )
             )
         )
-        
-    async def __call__(self, query: OrganizationQueryI):
+
+    async def facets(self, query: OrganizationQueryI) -> tuple[Select, dict[str, Any]]:
+        '''
+        Фасеты для того же фильтра, что и __call__, без пагинации
+        (у ближайших соседей - по N ближайшим)
+        Returns:
+            (statement, параметры для session.execute)
+        '''
         query_type = type(query)
         if query_type not in self._query_handlers:
             raise ValueError(f"Unknown query type: {query_type}")
-            
-        handler_name = self._query_handlers[query_type]
-        handler = getattr(self, handler_name)
+
+        replica = self._use_replica(query)
+        variant = ('facets', *self._variant(query, paginate=False), replica)
+        if variant not in self._statements:
+            ids = self._nearest_limit(await self._filter(query, replica), query)
+            self._statements[variant] = (self._facets_query(ids), 0)
+        params = self._params(query, paginate=False, key_count=0, replica=replica)
+        params['cell'] = settings.FACET_GEO_CELL
+        return self._statements[variant][0], params
+
+    async def _filter(self, query: OrganizationQueryI, replica: bool) -> Select:
+        handler = getattr(self, self._query_handlers[type(query)])
+        ids = await handler(query)
+        if replica:
+            ids = ids.where(self._replica_condition())
+        return ids
+
+    async def _build(self, query: OrganizationQueryI, paginate: bool, replica: bool) -> tuple[Select, int]:
+        ids = await self._filter(query, replica)
+        key_count = 0
+        if paginate:
+            ids, key_count = self._paginate(ids, query.cursor is not None)
+        else:
+            ids = self._nearest_limit(ids, query)
+        return self._output_query(ids), key_count
         
-        return await handler(query)
+    async def __call__(self, query: OrganizationQueryI, paginate: bool = True) -> tuple[Select, dict[str, Any]]:
+        '''
+        Statement строится один раз на вариант запроса (тип, нечеткий поиск,
+        курсор, пагинация) и переиспользуется: значения идут только в параметрах,
+        поэтому у SQLAlchemy не пересчитывается cache key и не компилируется SQL,
+        а у asyncpg совпадает текст подготовленного выражения.
+        Returns:
+            (statement, параметры для session.execute)
+        '''
+        query_type = type(query)
+        if query_type not in self._query_handlers:
+            raise ValueError(f"Unknown query type: {query_type}")
+
+        replica = self._use_replica(query)
+        variant = (*self._variant(query, paginate), replica)
+        if variant not in self._statements:
+            self._statements[variant] = await self._build(query, paginate, replica)
+        stmt, key_count = self._statements[variant]
+        return stmt, self._params(query, paginate, key_count, replica)
 
 class OrganizationQuery(BaseQuery):
     _model = Organization
     
-    def __init__(self, builder: QueryBuilder):
+    def __init__(self, builder: QueryBuilder, trusted_output: bool = False):
         self._builder = builder
+        # Строки из базы уже соответствуют OrganizationQueryO: валидация пропускается
+        self._trusted_output = trusted_output
     
 
-    async def find(self, session: AsyncSession, **kwargs) -> list[OrganizationQueryO]:
-        stmt = await self._builder(**kwargs)
-        result = await session.execute(stmt)
+    @property
+    def builder(self) -> QueryBuilder:
+        return self._builder
+
+    async def find(self, session: AsyncSession, query: OrganizationQueryI) -> OrganizationPageO:
+        page, _ = await self.find_timed(session, query)
+        return page
+
+    async def find_timed(self, session: AsyncSession, query: OrganizationQueryI) -> tuple[OrganizationPageO, dict[str, float]]:
+        '''
+        find вместе со временем этапов (build, pool_wait, execute, materialize).
+        Время этапов пишется в гистограммы по типу запроса: несколько perf_counter
+        и observe (bisect) на запрос
+        '''
+        query_type = type(query).__name__
+        started = perf_counter()
+        stmt, params = await self._builder(query)
+        built = perf_counter()
+        # Соединение берется из пула отдельно, чтобы ожидание не попадало в execute
+        await session.connection()
+        connected = perf_counter()
+        result = await session.execute(stmt, params)
+        executed = perf_counter()
         rows = result.mappings().all()
-        return [OrganizationQueryO.model_validate(row) for row in rows]
+        page = self._page(rows, self._builder.page_size(query), self._trusted_output)
+        finished = perf_counter()
+
+        timings = {
+            'build': built - started,
+            'pool_wait': connected - built,
+            'execute': executed - connected,
+            'materialize': finished - executed
+        }
+        for stage, seconds in timings.items():
+            FIND_STAGE_SECONDS.observe(seconds, query_type, stage)
+        FIND_ROWS.observe(len(page.items), query_type)
+        return page, timings
+
+    async def find_by_ids(self, session: AsyncSession, org_ids: list[int]) -> dict[int, OrganizationQueryO]:
+        '''
+        Организации по списку id за один запрос
+        Returns:
+            org_id -> организация, отсутствующих id в словаре нет
+        '''
+        result = await session.execute(self._builder.ids_query(), {'org_ids': org_ids})
+        return {
+            row['org_id']: self._item(row, self._trusted_output)
+            for row in result.mappings()
+        }
+
+    async def facets(self, session: AsyncSession, query: OrganizationQueryI) -> OrganizationFacetsO:
+        '''
+        Количество организаций по фасетам для всей выдачи запроса
+        (курсор и limit не учитываются), по FACET_LIMIT крупнейших значений
+        '''
+        stmt, params = await self._builder.facets(query)
+        result = await session.execute(stmt, params)
+        return self._facets(result.mappings().all(), settings.FACET_GEO_CELL, settings.FACET_LIMIT)
+
+    @staticmethod
+    def _facets(rows: Sequence[RowMapping], cell: float, limit: int) -> OrganizationFacetsO:
+        # grouping(top_path, category_title, cell_x, cell_y): 1 - колонка не в наборе
+        paths, titles, cells = [], [], []
+        for row in rows:
+            if row['grouping_id'] == 0b0111 and row['top_path'] is not None:
+                paths.append(FacetO(value='/' + row['top_path'], count=row['count']))
+            elif row['grouping_id'] == 0b1011 and row['category_title'] is not None:
+                titles.append(FacetO(value=row['category_title'], count=row['count']))
+            elif row['grouping_id'] == 0b1100 and row['cell_x'] is not None:
+                cells.append(
+                    GeoCellFacetO(
+                        min_lon=row['cell_x'] * cell,
+                        min_lat=row['cell_y'] * cell,
+                        max_lon=(row['cell_x'] + 1) * cell,
+                        max_lat=(row['cell_y'] + 1) * cell,
+                        count=row['count']
+                    )
+                )
+        top = lambda facets: sorted(facets, key=lambda facet: -facet.count)[:limit]
+        return OrganizationFacetsO(
+            category_paths=top(paths),
+            category_titles=top(titles),
+            geo_cells=top(cells)
+        )
+
+    @staticmethod
+    def _item(row: RowMapping, trusted: bool = False) -> OrganizationQueryO:
+        if trusted:
+            return OrganizationQueryO.model_construct(**row)
+        return OrganizationQueryO.model_validate(row)
+
+    @staticmethod
+    def _page(rows: Sequence[RowMapping], limit: int, trusted: bool = False) -> OrganizationPageO:
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            keys = (last['rank'], last['org_id']) if 'rank' in last else (last['org_id'],)
+            next_cursor = encode_cursor(*keys)
+        items = [OrganizationQuery._item(row, trusted) for row in rows[:limit]]
+        if trusted:
+            return OrganizationPageO.model_construct(items=items, next_cursor=next_cursor)
+        return OrganizationPageO(items=items, next_cursor=next_cursor)
+
+    async def stream(
+        self,
+        session: AsyncSession,
+        query: OrganizationQueryI,
+        batch_size: int = settings.STREAM_BATCH_SIZE
+    ) -> AsyncIterator[OrganizationQueryO]:
+        '''
+        Все организации по запросу без пагинации через серверный курсор:
+        строки читаются пачками по batch_size, память не зависит от размера выборки.
+        Курсор живет внутри одной транзакции сессии, поэтому работает и через
+        PgBouncer в режиме transaction pooling.
+        '''
+        stmt, params = await self._builder(query, paginate=False)
+        result = await session.stream(stmt, params, execution_options={'yield_per': batch_size})
+        async for rows in result.mappings().partitions():
+            for row in rows:
+                yield self._item(row, self._trusted_output)
     
     
\ No newline at end of file
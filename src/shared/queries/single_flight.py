@@ -0,0 +1,43 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .base import BaseQuery
+from .organization import OrganizationQuery
+from src.shared.cache.organization import query_cache_key
+from src.shared.cache.single_flight import SingleFlight
+from src.shared.models.organization import Organization
+from src.shared.schemas.organization import OrganizationQueryI, OrganizationQueryO, OrganizationPageO, OrganizationFacetsO
+
+
+class SingleFlightOrganizationQuery(BaseQuery):
+    '''
+    Одинаковые (по каноническому ключу) конкурентные find разделяют один запрос
+    в базу: соединение из пула берет только первый, сессии остальных
+    не обращаются к базе
+    '''
+    _model = Organization
+
+    def __init__(self, query: OrganizationQuery, single_flight: SingleFlight):
+        self._query = query
+        self._single_flight = single_flight
+
+    @property
+    def single_flight(self) -> SingleFlight:
+        return self._single_flight
+
+    async def find(self, session: AsyncSession, query: OrganizationQueryI) -> OrganizationPageO:
+        return await self._single_flight.do(
+            query_cache_key(query),
+            lambda: self._query.find(session, query)
+        )
+
+    async def facets(self, session: AsyncSession, query: OrganizationQueryI) -> OrganizationFacetsO:
+        return await self._single_flight.do(
+            f"facets:{query_cache_key(query)}",
+            lambda: self._query.facets(session, query)
+        )
+
+    async def find_by_ids(self, session: AsyncSession, org_ids: list[int]) -> dict[int, OrganizationQueryO]:
+        return await self._query.find_by_ids(session, org_ids)
+
+    def stream(self, session: AsyncSession, query: OrganizationQueryI, **kwargs):
+        return self._query.stream(session, query, **kwargs)
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import logging
+import random
+from collections import deque
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+from sqlalchemy import Select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .base import BaseQuery
+from .organization import OrganizationQuery
+from src.shared.config.settings import settings
+from src.shared.database.explain import Explain, plan_problems
+from src.shared.models.organization import Organization
+from src.shared.schemas.diagnostics import SlowQueryO
+from src.shared.schemas.organization import OrganizationQueryI, OrganizationQueryO, OrganizationPageO, OrganizationFacetsO
+
+
+logger = logging.getLogger(__name__)
+
+
+class SlowQueryLog:
+    '''
+    Последние медленные запросы воркера (кольцевой буфер)
+    '''
+
+    def __init__(self, maxsize: int = settings.SLOW_QUERY_BUFFER_SIZE):
+        self._records: deque[SlowQueryO] = deque(maxlen=maxsize)
+
+    def add(self, record: SlowQueryO) -> None:
+        self._records.append(record)
+
+    def records(self) -> list[SlowQueryO]:
+        # Новые первыми
+        return list(reversed(self._records))
+
+    def clear(self) -> None:
+        self._records.clear()
+
+
+class SlowQueryOrganizationQuery(BaseQuery):
+    '''
+    Обертка над OrganizationQuery, которая записывает find дольше threshold:
+    SQL с параметрами, схему запроса и время этапов. Для доли explain_rate
+    из них в фоне выполняется EXPLAIN ANALYZE на отдельной сессии - ответ
+    клиенту не ждет повторного выполнения запроса.
+    '''
+    _model = Organization
+
+    def __init__(
+        self,
+        query: OrganizationQuery,
+        log: SlowQueryLog,
+        session_factory: Callable,
+        threshold: float = settings.SLOW_QUERY_THRESHOLD,
+        explain_rate: float = settings.SLOW_QUERY_EXPLAIN_RATE
+    ):
+        self._query = query
+        self._log = log
+        self._session_factory = session_factory
+        self._threshold = threshold
+        self._explain_rate = explain_rate
+        # Ссылки на фоновые EXPLAIN, чтобы задачи не собрал GC
+        self._explains: set[asyncio.Task] = set()
+
+    @property
+    def log(self) -> SlowQueryLog:
+        return self._log
+
+    async def find(self, session: AsyncSession, query: OrganizationQueryI) -> OrganizationPageO:
+        started = perf_counter()
+        page, timings = await self._query.find_timed(session, query)
+        total = perf_counter() - started
+        if total >= self._threshold:
+            await self._record(query, timings, total)
+        return page
+
+    async def _record(self, query: OrganizationQueryI, timings: dict[str, float], total: float) -> None:
+        stmt, params = await self._query.builder(query)
+        record = SlowQueryO(
+            recorded_at=datetime.now(timezone.utc),
+            query_type=type(query).__name__,
+            query=query.model_dump(mode='json', exclude_none=True),
+            sql=str(stmt.compile(dialect=postgresql.asyncpg.dialect())),
+            params=params,
+            total=total,
+            timings=timings
+        )
+        self._log.add(record)
+        logger.warning("Slow find %s: %.3f s %s", record.query_type, total, timings)
+        if random.random() < self._explain_rate:
+            task = asyncio.create_task(self._explain(record, stmt, params))
+            self._explains.add(task)
+            task.add_done_callback(self._explains.discard)
+
+    async def _explain(self, record: SlowQueryO, stmt: Select, params: dict[str, Any]) -> None:
+        try:
+            async with self._session_factory() as session:
+                plan = (await session.execute(Explain(stmt), params)).scalar_one()
+                # ANALYZE выполняет запрос: ничего не фиксируем
+                await session.rollback()
+            record.plan = json.loads(plan) if isinstance(plan, str) else plan
+            record.seq_scans, record.misestimates = plan_problems(record.plan)
+        except Exception:
+            logger.exception("EXPLAIN ANALYZE failed for slow %s", record.query_type)
+
+    async def facets(self, session: AsyncSession, query: OrganizationQueryI) -> OrganizationFacetsO:
+        return await self._query.facets(session, query)
+
+    async def find_by_ids(self, session: AsyncSession, org_ids: list[int]) -> dict[int, OrganizationQueryO]:
+        return await self._query.find_by_ids(session, org_ids)
+
+    def stream(self, session: AsyncSession, query: OrganizationQueryI, **kwargs):
+        return self._query.stream(session, query, **kwargs)
@@ -0,0 +1,113 @@
+from typing import Optional
+
+from sqlalchemy import select, func, bindparam, Integer, LargeBinary, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from geoalchemy2 import Geometry
+
+from .base import BaseQuery
+from .organization import OrganizationQueryBuilder
+from src.shared.cache.tiles import TileCache
+from src.shared.config.settings import settings
+from src.shared.models.organization import Organization
+from src.shared.models.office import Office, Geo
+from src.shared.models.work import Work, Category
+
+# Web Mercator - система координат ST_TileEnvelope и MVT
+SRID_MERCATOR = 3857
+LAYER_NAME = 'organizations'
+
+
+class TileQuery(BaseQuery):
+    _model = Geo
+
+    def __init__(
+        self,
+        cache: Optional[TileCache] = None,
+        extent: int = settings.TILE_EXTENT,
+        buffer: int = settings.TILE_BUFFER
+    ):
+        self._cache = cache
+        self._tile = self._tile_query(extent, buffer, with_path=False)
+        self._tile_by_path = self._tile_query(extent, buffer, with_path=True)
+
+    @property
+    def cache(self) -> Optional[TileCache]:
+        return self._cache
+
+    @staticmethod
+    def _tile_query(extent: int, buffer: int, with_path: bool) -> Select:
+        """
+        Mapbox Vector Tile слоя organizations (org_id, title) для тайла :z/:x/:y.
+        Точки отбираются по GiST-индексу geometry(geog) прямоугольником тайла
+        в WGS84 и переводятся в координаты тайла ST_AsMVTGeom.
+        """
+        envelope = func.ST_TileEnvelope(
+            bindparam('z', type_=Integer),
+            bindparam('x', type_=Integer),
+            bindparam('y', type_=Integer),
+            type_=Geometry
+        )
+        point = func.geometry(Geo.geog, type_=Geometry)
+        conditions = [point.op('&&')(func.ST_Transform(envelope, settings.SRID_GEO))]
+        if with_path:
+            conditions.append(
+                Organization.org_id.in_(
+                    select(Work.org_id)
+                    .join(Category, Work.category_id == Category.category_id)
+                    .where(OrganizationQueryBuilder._category_path_condition())
+                )
+            )
+        features = (
+            select(
+                func.ST_AsMVTGeom(
+                    func.ST_Transform(point, SRID_MERCATOR),
+                    envelope,
+                    extent,
+                    buffer,
+                    True,
+                    type_=Geometry
+                ).label('geom'),
+                Organization.org_id,
+                Organization.title
+            )
+            .select_from(Geo)
+            .join(Office, Office.office_id == Geo.office_id)
+            .join(Organization, Organization.org_id == Office.org_id)
+            .where(*conditions)
+            .subquery('tile')
+        )
+        return select(
+            func.ST_AsMVT(features.table_valued(), LAYER_NAME, extent, 'geom', type_=LargeBinary)
+        )
+
+    async def find(
+        self,
+        session: AsyncSession,
+        z: int,
+        x: int,
+        y: int,
+        category_path: Optional[str] = None
+    ) -> bytes:
+        '''
+        Тайл z/x/y, при category_path - только организации категории и подкатегорий
+        Returns:
+            байты MVT, пустые для тайла без организаций
+        '''
+        key = None
+        if self._cache is not None:
+            # Версия читается до запроса в базу, как в CachedOrganizationQuery
+            key = self._cache.key(await self._cache.version(), z, x, y, category_path)
+            tile = self._cache.get(key)
+            if tile is not None:
+                return tile
+
+        params = {'z': z, 'x': x, 'y': y}
+        stmt = self._tile
+        if category_path is not None:
+            params['category_path'] = category_path
+            stmt = self._tile_by_path
+        tile = (await session.execute(stmt, params)).scalar_one() or b''
+
+        if key is not None:
+            self._cache.set(key, tile)
+        return tile
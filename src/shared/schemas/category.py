@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from src.shared.schemas.organization import CATEGORY_PATH_PATTERN
+
+
+class CategoryTreeQuery(BaseModel):
+    category_path: Optional[str] = Field(
+        None,
+        pattern=CATEGORY_PATH_PATTERN,
+        description="Родительская категория, без нее - категории верхнего уровня"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "category_path": "/category1"
+            },
+            "title": "Дерево категорий",
+            "description": "Дочерние категории с количеством организаций в каждом поддереве"
+        }
+    }
+
+class CategoryO(BaseModel):
+    path: str = Field(..., description="Иерархический путь категории")
+    title: str = Field(..., description="Название категории")
+
+class CategoryNodeO(CategoryO):
+    organizations: int = Field(..., description="Организаций в категории и ее подкатегориях")
+
+class CategoryTreeO(BaseModel):
+    ancestors: list[CategoryO] = Field(..., description="Путь от корня до родительской категории включительно")
+    children: list[CategoryNodeO] = Field(..., description="Дочерние категории")
@@ -0,0 +1,40 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional
+
+from src.shared.schemas.organization import GeoBoxI
+
+
+class GeoClusterQuery(GeoBoxI):
+    zoom: Optional[int] = Field(None, ge=0, le=22, description="Уровень масштаба карты")
+    grid: Optional[float] = Field(None, gt=0, le=180, description="Шаг сетки кластеризации в градусах")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "min_lon": 37.5,
+                "min_lat": 55.7,
+                "max_lon": 37.7,
+                "max_lat": 55.9,
+                "zoom": 12
+            },
+            "title": "Кластеры в окне карты",
+            "description": "Организации в прямоугольнике, сгруппированные по ячейкам сетки"
+        }
+    }
+
+    @model_validator(mode='after')
+    def validate_grid(self) -> 'GeoClusterQuery':
+        """Нужен ровно один из zoom и grid"""
+        if (self.zoom is None) == (self.grid is None):
+            raise ValueError('Exactly one of zoom and grid is required')
+        return self
+
+class GeoClusterO(BaseModel):
+    lon: float = Field(..., description="Долгота центроида кластера")
+    lat: float = Field(..., description="Широта центроида кластера")
+    count: int = Field(..., description="Количество организаций")
+    org_ids: list[int] = Field(..., description="Несколько id организаций кластера")
+
+class GeoClustersO(BaseModel):
+    grid: float = Field(..., description="Фактический шаг сетки в градусах")
+    clusters: list[GeoClusterO] = Field(..., description="Кластеры, крупные первыми")
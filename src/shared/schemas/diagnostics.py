@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SlowQueryO(BaseModel):
+    recorded_at: datetime = Field(..., description="Время записи (UTC)")
+    query_type: str = Field(..., description="Схема запроса поиска")
+    query: dict[str, Any] = Field(..., description="Поля запроса")
+    sql: str = Field(..., description="SQL с именованными параметрами")
+    params: dict[str, Any] = Field(..., description="Значения параметров")
+    total: float = Field(..., description="Время find в секундах")
+    timings: dict[str, float] = Field(..., description="Время этапов find в секундах")
+    plan: Optional[Any] = Field(None, description="EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON), если запрос попал в выборку")
+    seq_scans: list[str] = Field(default_factory=list, description="Таблицы, прочитанные Seq Scan")
+    misestimates: list[str] = Field(default_factory=list, description="Узлы плана с ошибкой оценки строк на порядок")
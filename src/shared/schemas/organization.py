@@ -1,7 +1,12 @@
 from pydantic import BaseModel, Field, model_validator, field_validator
-from typing import Optional, Union
+from typing import Any, Optional, Union
 import re
 
+from src.shared.config.settings import settings
+from src.shared.schemas.pagination import PageI
+
+# Путь категории: /level1[/level2[/level3]], уровни - допустимые метки ltree
+CATEGORY_PATH_PATTERN = r"^/[a-zA-Zа-яА-Я0-9-_]+(/[a-zA-Zа-яА-Я0-9-_]+){0,2}$"
 class PhoneI(BaseModel):
     phone: str = Field(..., description="Телефон")
     
@@ -17,7 +22,7 @@ class CategoryI(BaseModel):
                 "/category1/subcategory1/subsubcategory1"
             ]
         },
-        pattern=r"^/[a-zA-Zа-яА-Я0-9-_]+(/[a-zA-Zа-яА-Я0-9-_]+){0,2}$"
+        pattern=CATEGORY_PATH_PATTERN
     )
 
     @field_validator('path')
@@ -45,7 +50,21 @@ class OrganizationI(BaseModel):
     phones: list[PhoneI] = Field(..., description="Телефоны организации")
     categories: list[CategoryI] = Field(..., description="Категории организации")
 
-class OrgIdQuery(BaseModel):
+class BulkLoadStats(BaseModel):
+    organizations: int = Field(0, description="Загружено организаций")
+    rows: int = Field(0, description="Вставлено строк во все таблицы")
+    batches: int = Field(0, description="Закоммичено пачек")
+    elapsed: float = Field(0.0, description="Время загрузки в секундах")
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def organizations_per_sec(self) -> float:
+        return self.organizations / self.elapsed if self.elapsed else 0.0
+
+class OrgIdQuery(PageI):
     org_id: int = Field(..., description="Идентификатор организации")
     
     model_config = {
@@ -58,8 +77,14 @@ class OrgIdQuery(BaseModel):
         }
     }
 
-class OrgTitleQuery(BaseModel):
+class OrgTitleQuery(PageI):
     org_title: str = Field(..., description="Название организации")
+    similarity: Optional[float] = Field(
+        None,
+        ge=0.3,
+        le=1.0,
+        description="Порог похожести pg_trgm: включает нечеткий поиск с сортировкой по похожести"
+    )
     
     model_config = {
         "json_schema_extra": {
@@ -71,8 +96,8 @@ class OrgTitleQuery(BaseModel):
         }
     }
 
-class CategoryPathQuery(BaseModel):
-    category_path: str = Field(..., description="Иерархический путь категории")
+class CategoryPathQuery(PageI):
+    category_path: str = Field(..., pattern=CATEGORY_PATH_PATTERN, description="Иерархический путь категории")
     
     model_config = {
         "json_schema_extra": {
@@ -96,8 +121,14 @@ class CategoryPathQuery(BaseModel):
         }
     }
 
-class CategoryTitleQuery(BaseModel):
+class CategoryTitleQuery(PageI):
     category_title: str = Field(..., description="Название категории")
+    similarity: Optional[float] = Field(
+        None,
+        ge=0.3,
+        le=1.0,
+        description="Порог похожести pg_trgm: включает нечеткий поиск с сортировкой по похожести"
+    )
     
     model_config = {
         "json_schema_extra": {
@@ -109,8 +140,14 @@ class CategoryTitleQuery(BaseModel):
         }
     }
 
-class OfficeAddressQuery(BaseModel):
+class OfficeAddressQuery(PageI):
     office_address: str = Field(..., description="Адрес офиса")
+    similarity: Optional[float] = Field(
+        None,
+        ge=0.3,
+        le=1.0,
+        description="Порог похожести pg_trgm: включает нечеткий поиск с сортировкой по похожести"
+    )
     
     model_config = {
         "json_schema_extra": {
@@ -122,7 +159,7 @@ class OfficeAddressQuery(BaseModel):
         }
     }
 
-class GeoRadiusQuery(BaseModel):
+class GeoRadiusQuery(PageI):
     geo: GeoI = Field(..., description="Гео-данные для поиска")
     radius: float = Field(..., description="Радиус поиска в метрах")
     
@@ -136,7 +173,7 @@ class GeoRadiusQuery(BaseModel):
                 "radius": 1000
             },
             "title": "Поиск по радиусу",
-            "description": "Поиск организаций в заданном радиусе от точки",
+            "description": "Поиск организаций в заданном радиусе от точки, ближние первыми, с расстоянием distance_m",
             "examples": [
                 {
                     "geo": {
@@ -158,7 +195,7 @@ class GeoRadiusQuery(BaseModel):
         }
     }
 
-class GeoBoxQuery(BaseModel):
+class GeoBoxQuery(PageI):
     min_lon: float = Field(..., description="Минимальная долгота")
     min_lat: float = Field(..., description="Минимальная широта")
     max_lon: Optional[float] = Field(None, description="Максимальная долгота")
@@ -207,11 +244,130 @@ class GeoBoxQuery(BaseModel):
             
         return self
 
+class GeoNearestQuery(PageI):
+    geo: GeoI = Field(..., description="Гео-данные точки поиска")
+    limit: Optional[int] = Field(10, ge=1, le=100, description="Количество ближайших организаций на странице")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "geo": {
+                    "lon": 37.6173,
+                    "lat": 55.7558
+                },
+                "limit": 10
+            },
+            "title": "Ближайшие организации",
+            "description": "Поиск N ближайших к точке организаций, отсортированных по расстоянию"
+        }
+    }
+
+class GeoBoxI(BaseModel):
+    min_lon: float = Field(..., description="Минимальная долгота")
+    min_lat: float = Field(..., description="Минимальная широта")
+    max_lon: float = Field(..., description="Максимальная долгота")
+    max_lat: float = Field(..., description="Максимальная широта")
+
+    @model_validator(mode='after')
+    def order_coordinates(self) -> 'GeoBoxI':
+        if self.min_lon > self.max_lon:
+            self.min_lon, self.max_lon = self.max_lon, self.min_lon
+        if self.min_lat > self.max_lat:
+            self.min_lat, self.max_lat = self.max_lat, self.min_lat
+        return self
+
+class CompoundQuery(PageI):
+    org_title: Optional[str] = Field(None, description="Подстрока названия организации")
+    category_path: Optional[str] = Field(None, pattern=CATEGORY_PATH_PATTERN, description="Иерархический путь категории")
+    category_title: Optional[str] = Field(None, description="Подстрока названия категории")
+    office_address: Optional[str] = Field(None, description="Подстрока адреса офиса")
+    geo: Optional[GeoI] = Field(None, description="Центр поиска по радиусу")
+    radius: Optional[float] = Field(None, description="Радиус поиска в метрах")
+    box: Optional[GeoBoxI] = Field(None, description="Географический прямоугольник")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "category_path": "/food",
+                "org_title": "Пицца",
+                "geo": {
+                    "lon": 37.6173,
+                    "lat": 55.7558
+                },
+                "radius": 1000
+            },
+            "title": "Составной поиск",
+            "description": "Поиск организаций, удовлетворяющих всем заданным фильтрам одновременно"
+        }
+    }
+
+    @model_validator(mode='after')
+    def validate_filters(self) -> 'CompoundQuery':
+        """Нужен хотя бы один фильтр, geo и radius задаются вместе"""
+        if (self.geo is None) != (self.radius is None):
+            raise ValueError('geo and radius must be set together')
+        filters = (
+            self.org_title,
+            self.category_path,
+            self.category_title,
+            self.office_address,
+            self.geo,
+            self.box
+        )
+        if all(value is None for value in filters):
+            raise ValueError('At least one filter is required')
+        return self
+
 class OrganizationQueryO(BaseModel):
+    org_id: int = Field(..., description="Идентификатор организации")
     org_title: str = Field(..., description="Название организации")
     phones: list[str] = Field(..., description="Телефоны организации")
     office_address: str = Field(..., description="Адрес офиса")
     categories_titles: list[str] = Field(..., description="Названия категорий")
+    distance_m: Optional[float] = Field(None, description="Расстояние до точки поиска в метрах")
+
+class OrganizationPageO(BaseModel):
+    items: list[OrganizationQueryO] = Field(..., description="Организации текущей страницы")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы, None - страница последняя")
+
+class FacetO(BaseModel):
+    value: str = Field(..., description="Значение фасета")
+    count: int = Field(..., description="Количество организаций")
+
+class GeoCellFacetO(BaseModel):
+    min_lon: float = Field(..., description="Минимальная долгота ячейки")
+    min_lat: float = Field(..., description="Минимальная широта ячейки")
+    max_lon: float = Field(..., description="Максимальная долгота ячейки")
+    max_lat: float = Field(..., description="Максимальная широта ячейки")
+    count: int = Field(..., description="Количество организаций")
+
+class OrganizationFacetsO(BaseModel):
+    category_paths: list[FacetO] = Field(..., description="По категориям верхнего уровня")
+    category_titles: list[FacetO] = Field(..., description="По названиям категорий")
+    geo_cells: list[GeoCellFacetO] = Field(..., description="По ячейкам гео-сетки")
+
+class OrganizationBatchI(BaseModel):
+    queries: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.FIND_BATCH_MAX_SIZE,
+        description="Запросы в формате /find/ (любой из OrganizationQueryI)"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "queries": [
+                    {"org_id": 1},
+                    {"org_id": 2},
+                    {"category_path": "/category1", "limit": 10}
+                ]
+            }
+        }
+    }
+
+class OrganizationBatchO(BaseModel):
+    results: dict[int, OrganizationPageO] = Field(..., description="Результаты по индексу запроса в queries")
 
 OrganizationQueryI = Union[
     OrgIdQuery,
@@ -220,5 +376,7 @@ OrganizationQueryI = Union[
     CategoryTitleQuery,
     OfficeAddressQuery,
     GeoRadiusQuery,
-    GeoBoxQuery
+    GeoBoxQuery,
+    GeoNearestQuery,
+    CompoundQuery
 ]
\ No newline at end of file
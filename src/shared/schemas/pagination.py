@@ -0,0 +1,71 @@
+import base64
+import json
+import math
+from typing import Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from src.shared.config.settings import settings
+
+
+# Границы колонки integer org_id: значение вне их Postgres не примет
+ORG_ID_MIN, ORG_ID_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def _is_number(value) -> bool:
+    """Конечное число JSON: bool, NaN и Infinity ключом сортировки не бывают"""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return True
+    return isinstance(value, float) and math.isfinite(value)
+
+
+def encode_cursor(*values: int | float) -> str:
+    '''
+    Непрозрачный курсор keyset-пагинации: значения ключа сортировки последней строки
+    '''
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list[int | float]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, list) or not all(_is_number(v) for v in values):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def decode_keyset(cursor: str, key_count: int) -> list[int | float]:
+    '''
+    Значения курсора для ключа (rank, org_id) или (org_id,): rank - число,
+    org_id - целое в границах колонки. Иначе значение дошло бы до запроса
+    и завершилось ошибкой базы вместо 400
+    Raises:
+        ValueError - курсор не подходит к запросу
+    '''
+    values = decode_cursor(cursor)
+    if len(values) != key_count:
+        raise ValueError("Cursor does not match the query type")
+    org_id = values[-1]
+    if not isinstance(org_id, int) or not ORG_ID_MIN <= org_id <= ORG_ID_MAX:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+class PageI(BaseModel):
+    limit: Optional[int] = Field(
+        None,
+        ge=1,
+        le=settings.FIND_MAX_LIMIT,
+        description=f"Размер страницы, по умолчанию {settings.FIND_DEFAULT_LIMIT}"
+    )
+    cursor: Optional[str] = Field(None, description="Курсор следующей страницы (next_cursor)")
+
+    @field_validator('cursor')
+    def validate_cursor(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None:
+            decode_cursor(v)
+        return v
@@ -5,6 +5,26 @@ from typing import Generator
 import pytest
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        help="run timing benchmarks (@pytest.mark.benchmark)"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Benchmarks only report timings and are deselected unless --benchmark is given."""
+    if config.getoption("--benchmark"):
+        return
+    selected, deselected = [], []
+    for item in items:
+        (deselected if item.get_closest_marker("benchmark") else selected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
 @pytest.fixture(scope="module")
 def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
     """Create event loop for all async tests."""
@@ -11,7 +11,7 @@ async def session():
         # Очистка таблиц после выполнения тестов
         
     async with get_session() as session:
-        tables = ['offices', 'geo', 'organizations', 'phones', 'works', 'categories']
+        tables = ['offices', 'geo', 'organizations', 'phones', 'works', 'categories', 'cache_tag_versions']
         for table in tables:
             await session.execute(text(f'TRUNCATE TABLE {table} CASCADE'))
         await session.commit()
@@ -0,0 +1,46 @@
+import pytest
+from time import perf_counter
+
+from src.shared.database.org_aggregate import OrgAggregate
+from src.shared.schemas.organization import OrganizationI
+
+
+COUNT = 500
+
+
+def _organizations(prefix: str):
+    for i in range(COUNT):
+        yield OrganizationI(
+            title=f"{prefix} {i}",
+            office={
+                "address": f"{prefix} Address {i}",
+                "geo": {"lon": 37.6 + i / 100000, "lat": 55.7}
+            },
+            phones=[{"phone": f"+7911{i:07d}"}, {"phone": f"+7912{i:07d}"}],
+            categories=[
+                {"title": "Еда", "path": "/food"},
+                {"title": "Кафе", "path": "/food/cafe"}
+            ]
+        )
+
+
+@pytest.mark.slow
+@pytest.mark.benchmark
+@pytest.mark.asyncio(loop_scope="module")
+async def test_bulk_vs_single_benchmark(session):
+    """Сравнение построчной и пакетной загрузки организаций"""
+    org_aggregate = OrgAggregate(session)
+
+    started = perf_counter()
+    for organization in _organizations("Single"):
+        await org_aggregate.create_organization(organization)
+    single_elapsed = perf_counter() - started
+
+    stats = await org_aggregate.create_organizations_bulk(_organizations("Bulk"), batch_size=100)
+
+    print(
+        f"\ncreate_organization: {COUNT / single_elapsed:.0f} orgs/sec"
+        f"\ncreate_organizations_bulk: {stats.organizations_per_sec:.0f} orgs/sec, "
+        f"{stats.rows_per_sec:.0f} rows/sec"
+    )
+    assert stats.organizations == COUNT
@@ -0,0 +1,44 @@
+import pytest
+from time import perf_counter
+
+from src.shared.cache.base import TaggedCache, LRUCache
+from src.shared.database.org_aggregate import OrgAggregate
+from src.shared.queries.cache import CachedOrganizationQuery
+from src.shared.queries.organization import OrganizationQuery, OrganizationQueryBuilder
+from src.shared.schemas.organization import OrganizationI, CategoryPathQuery
+
+
+COUNT = 200
+REPEAT = 200
+
+
+@pytest.mark.slow
+@pytest.mark.benchmark
+@pytest.mark.asyncio(loop_scope="module")
+async def test_cache_benchmark(session):
+    """Сравнение повторных запросов с кэшем и без"""
+    await OrgAggregate(session).create_organizations_bulk(
+        OrganizationI(
+            title=f"Cached {i}",
+            office={"address": f"Cached Address {i}", "geo": {"lon": 30.3 + i / 100000, "lat": 59.9}},
+            phones=[{"phone": f"+7913{i:07d}"}],
+            categories=[{"title": "Кэш", "path": "/cache-benchmark"}]
+        )
+        for i in range(COUNT)
+    )
+    org_query = OrganizationQuery(OrganizationQueryBuilder(use_projection=True))
+    cached_query = CachedOrganizationQuery(org_query, TaggedCache(LRUCache(maxsize=100, ttl=60)))
+    query = CategoryPathQuery(category_path="/cache-benchmark")
+
+    started = perf_counter()
+    for _ in range(REPEAT):
+        await org_query.find(session, query)
+    uncached = (perf_counter() - started) / REPEAT
+
+    started = perf_counter()
+    for _ in range(REPEAT):
+        await cached_query.find(session, query)
+    cached = (perf_counter() - started) / REPEAT
+
+    print(f"\nuncached: {uncached * 1000:.2f} ms/query\ncached: {cached * 1000:.3f} ms/query")
+    assert cached_query.cache.stats.local_hits == REPEAT - 1
@@ -0,0 +1,54 @@
+import pytest
+from time import perf_counter
+
+from src.shared.database.org_aggregate import OrgAggregate
+from src.shared.geo.replica import GeoReplica
+from src.shared.queries.organization import OrganizationQuery, OrganizationQueryBuilder
+from src.shared.schemas.organization import OrganizationI, GeoRadiusQuery, GeoBoxQuery, GeoI
+
+
+COUNT = 20000
+REPEAT = 200
+
+
+@pytest.mark.slow
+@pytest.mark.benchmark
+@pytest.mark.asyncio(loop_scope="module")
+async def test_geo_replica_benchmark(session):
+    """Поиск по радиусу и боксу: GiST в PostGIS против кандидатов из GeoReplica"""
+    await OrgAggregate(session).create_organizations_bulk(
+        OrganizationI(
+            title=f"Replica {i}",
+            office={
+                "address": f"Replica Address {i}",
+                "geo": {"lon": 37.4 + (i % 200) / 500, "lat": 55.6 + (i // 200) / 250}
+            },
+            phones=[{"phone": f"+7914{i:07d}"}],
+            categories=[{"title": "Реплика", "path": "/replica-benchmark"}]
+        )
+        for i in range(COUNT)
+    )
+    replica = GeoReplica()
+    await replica.refresh(session)
+    assert len(replica) >= COUNT
+
+    postgis = OrganizationQuery(OrganizationQueryBuilder(use_projection=True))
+    local = OrganizationQuery(OrganizationQueryBuilder(use_projection=True, replica=replica))
+    queries = [
+        GeoRadiusQuery(geo=GeoI(lon=37.6, lat=55.8), radius=1000),
+        GeoBoxQuery(min_lon=37.55, min_lat=55.75, max_lon=37.6, max_lat=55.8)
+    ]
+    for query in queries:
+        expected = await postgis.find(session, query)
+        assert await local.find(session, query) == expected
+
+        timings = {}
+        for name, org_query in (('postgis', postgis), ('replica', local)):
+            started = perf_counter()
+            for _ in range(REPEAT):
+                await org_query.find(session, query)
+            timings[name] = (perf_counter() - started) / REPEAT
+        print(
+            f"\n{type(query).__name__}: postgis {timings['postgis'] * 1000:.2f} ms/query, "
+            f"replica {timings['replica'] * 1000:.2f} ms/query"
+        )
@@ -1,5 +1,6 @@
 import pytest
-from sqlalchemy import select, func
+from sqlalchemy import select, func, cast
+from geoalchemy2 import Geometry
 from sqlalchemy.orm import selectinload, joinedload
 
 from src.shared.database.org_aggregate import OrgAggregate
@@ -7,6 +8,8 @@ from src.shared.schemas.organization import OrganizationI
 from src.shared.models.organization import Organization, Phone
 from src.shared.models.office import Office, Geo
 from src.shared.models.work import Category, Work
+from src.shared.models.search import OrganizationSearch
+from src.shared.config.settings import settings
 
 
 @pytest.mark.asyncio(loop_scope='module')
@@ -66,4 +69,105 @@ async def test_org_aggregate(session):
     assert "Test Category" in result["category_titles"]
     assert "Test Category 2" in result["category_titles"]
     assert "/test-parent/test-category" in result["category_paths"]
-    assert "/test-parent/test-category-2" in result["category_paths"]
\ No newline at end of file
+    assert "/test-parent/test-category-2" in result["category_paths"]
+
+def _bulk_organizations(count: int, prefix: str = "Bulk Organization"):
+    for i in range(count):
+        yield OrganizationI(
+            title=f"{prefix} {i}",
+            office={
+                "address": f"Bulk Address {i}",
+                "geo": {"lon": 2.0 + i / 10000, "lat": 2.0}
+            },
+            phones=[{"phone": f"+7900000{i:04d}"}],
+            categories=[
+                {"title": "Bulk Category", "path": "/bulk-parent/bulk-category"}
+            ]
+        )
+
+
+@pytest.mark.asyncio(loop_scope='module')
+async def test_org_aggregate_bulk(session):
+    org_aggregate = OrgAggregate(session)
+    stats = await org_aggregate.create_organizations_bulk(_bulk_organizations(25), batch_size=10)
+
+    assert stats.organizations == 25
+    assert stats.batches == 3
+    # organizations, phones, offices, geo, works + одна общая категория
+    assert stats.rows == 25 * 5 + 1
+    assert stats.rows_per_sec > 0
+
+    stmt = (
+        select(
+            Organization.title,
+            Office.address,
+            func.ST_X(cast(Geo.geog, Geometry(srid=settings.SRID_GEO))).label("lon"),
+            Category.path
+        )
+        .select_from(Organization)
+        .join(Office, Organization.org_id == Office.org_id)
+        .join(Geo, Office.office_id == Geo.office_id)
+        .join(Work, Organization.org_id == Work.org_id)
+        .join(Category, Work.category_id == Category.category_id)
+        .where(Organization.title == "Bulk Organization 7")
+    )
+    result = (await session.execute(stmt)).mappings().one()
+
+    assert result["address"] == "Bulk Address 7"
+    assert result["lon"] == pytest.approx(2.0007)
+    assert result["path"] == "/bulk-parent/bulk-category"
+
+
+@pytest.mark.asyncio(loop_scope='module')
+async def test_org_aggregate_category_upsert(session):
+    org_aggregate = OrgAggregate(session)
+    await org_aggregate.create_organization(next(_bulk_organizations(1, prefix="Upsert Organization")))
+    # Новый агрегат - пустой кэш, id должен вернуться через ON CONFLICT
+    await OrgAggregate(session).create_organization(next(_bulk_organizations(1, prefix="Upsert Organization 2")))
+
+    categories = (
+        await session.execute(select(Category).where(Category.path == "/bulk-parent/bulk-category"))
+    ).scalars().all()
+    assert len(categories) == 1
+
+    works_count = (
+        await session.execute(
+            select(func.count()).select_from(Work).where(Work.category_id == categories[0].category_id)
+        )
+    ).scalar_one()
+    assert works_count == 27
+
+
+@pytest.mark.asyncio(loop_scope='module')
+async def test_org_aggregate_category_keeps_title(session):
+    first = next(_bulk_organizations(1, prefix="Title Organization"))
+    first_id = await OrgAggregate(session).create_organization(first)
+    renamed = next(_bulk_organizations(1, prefix="Title Organization 2"))
+    for category in renamed.categories:
+        category.title = "Renamed Category"
+    await OrgAggregate(session).create_organization(renamed)
+
+    title = (
+        await session.execute(select(Category.title).where(Category.path == "/bulk-parent/bulk-category"))
+    ).scalar_one()
+    assert title == "Bulk Category"
+    row = (
+        await session.execute(select(OrganizationSearch).where(OrganizationSearch.org_id == first_id))
+    ).scalar_one()
+    assert row.categories_titles == ["Bulk Category"]
+
+
+@pytest.mark.asyncio(loop_scope='module')
+async def test_org_aggregate_search_projection(session):
+    org_id = await OrgAggregate(session).create_organization(
+        next(_bulk_organizations(1, prefix="Projection Organization"))
+    )
+    row = (
+        await session.execute(select(OrganizationSearch).where(OrganizationSearch.org_id == org_id))
+    ).scalar_one()
+
+    assert row.title == "Projection Organization 0"
+    assert row.address == "Bulk Address 0"
+    assert row.phones == ["+79000000000"]
+    assert row.categories_titles == ["Bulk Category"]
+    assert row.categories_paths == ["/bulk-parent/bulk-category"]
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import text
+
+from src.shared.config.settings import settings
+from src.shared.database.load import run_load
+from src.shared.database.profiles import create_engine
+
+
+CONCURRENCY = 32
+REQUESTS = 1000
+
+
+async def _query(session, i: int):
+    await session.execute(text("SELECT pg_sleep(0.002)"))
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio(loop_scope="module")
+@pytest.mark.parametrize("profile", ["direct", "pgbouncer"])
+async def test_pool_load(profile):
+    """Ожидание соединения при нехватке пула видно в метриках, при достаточном - почти нулевое"""
+    reports = {}
+    for size in (2, CONCURRENCY):
+        engine = create_engine(profile, uri=settings.postgres_uri, pool_size=size, max_overflow=0)
+        try:
+            reports[size] = await run_load(engine, _query, CONCURRENCY, REQUESTS)
+        finally:
+            await engine.dispose()
+        print(f"\n{profile}, pool_size={size}: {reports[size].model_dump_json()}, rps={reports[size].rps:.0f}")
+
+    small, large = reports[2], reports[CONCURRENCY]
+    assert small.errors == large.errors == 0
+    assert small.pool.checkouts == large.pool.checkouts == REQUESTS
+    assert small.pool.waits > large.pool.waits
+    assert small.pool.wait_seconds_avg > large.pool.wait_seconds_avg
@@ -1,6 +1,20 @@
+from uuid import uuid4
+import numpy as np
 import pytest
+from sqlalchemy import select, func, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.shared.geo.haversine import haversine
 from src.shared.queries.organization import OrganizationQuery, OrganizationQueryBuilder
+from src.shared.queries.cache import CachedOrganizationQuery
+from src.shared.queries.category import CategoryQuery
+from src.shared.schemas.category import CategoryTreeQuery
+from src.shared.queries.cluster import ClusterQuery
+from src.shared.queries.tile import TileQuery
+from src.shared.schemas.cluster import GeoClusterQuery
+from src.shared.cache.base import TaggedCache, LRUCache
+from src.shared.cache.postgres import PostgresTagVersions
+from src.shared.database.base import get_session
+from src.api.bootstrap import bootstrap, org_aggregate
 from src.shared.database.org_aggregate import OrgAggregate
 from src.shared.schemas.organization import (
     OrganizationI,
@@ -12,6 +26,8 @@ from src.shared.schemas.organization import (
     OfficeAddressQuery,
     GeoRadiusQuery,
     GeoBoxQuery,
+    GeoNearestQuery,
+    CompoundQuery,
     GeoI
 )
 
@@ -60,10 +76,10 @@ TEST_DATA = {
     }
 }
 
-@pytest.fixture(scope="module")
-async def org_query():
-    """Фикстура для создания OrganizationQuery"""
-    builder = OrganizationQueryBuilder()
+@pytest.fixture(scope="module", params=[False, True], ids=["join", "projection"])
+async def org_query(request):
+    """Фикстура для создания OrganizationQuery (5-way join и read-модель)"""
+    builder = OrganizationQueryBuilder(use_projection=request.param)
     return OrganizationQuery(builder)
 
 @pytest.fixture(scope="module")
@@ -86,11 +102,13 @@ async def test_find_by_id(session: AsyncSession, org_query, test_data):
         session,
         query=OrgIdQuery(org_id=test_data)
     )
-    assert len(result) == 1
-    assert result[0].org_title == TEST_DATA["expected"]["org_title"]
-    assert set(result[0].phones) == set(TEST_DATA["expected"]["phones"])
-    assert result[0].office_address == TEST_DATA["expected"]["office_address"]
-    assert set(result[0].categories_titles) == set(TEST_DATA["expected"]["categories_titles"])
+    assert len(result.items) == 1
+    assert result.next_cursor is None
+    assert result.items[0].org_id == test_data
+    assert result.items[0].org_title == TEST_DATA["expected"]["org_title"]
+    assert set(result.items[0].phones) == set(TEST_DATA["expected"]["phones"])
+    assert result.items[0].office_address == TEST_DATA["expected"]["office_address"]
+    assert set(result.items[0].categories_titles) == set(TEST_DATA["expected"]["categories_titles"])
 
 
 @pytest.mark.asyncio(loop_scope="module")
@@ -100,11 +118,13 @@ async def test_find_by_title(session: AsyncSession, org_query, test_data):
         session,
         query=OrgTitleQuery(org_title=TEST_DATA["organization"]["title"])
     )
-    assert len(result) == 1
-    assert result[0].org_title == TEST_DATA["expected"]["org_title"]
-    assert set(result[0].phones) == set(TEST_DATA["expected"]["phones"])
-    assert result[0].office_address == TEST_DATA["expected"]["office_address"]
-    assert set(result[0].categories_titles) == set(TEST_DATA["expected"]["categories_titles"])
+    assert len(result.items) == 1
+    assert result.next_cursor is None
+    assert result.items[0].org_id == test_data
+    assert result.items[0].org_title == TEST_DATA["expected"]["org_title"]
+    assert set(result.items[0].phones) == set(TEST_DATA["expected"]["phones"])
+    assert result.items[0].office_address == TEST_DATA["expected"]["office_address"]
+    assert set(result.items[0].categories_titles) == set(TEST_DATA["expected"]["categories_titles"])
 
 
 @pytest.mark.asyncio(loop_scope="module")
@@ -131,6 +151,296 @@ async def test_find_by_title(session: AsyncSession, org_query, test_data):
 async def test_find_all(session: AsyncSession, org_query, query, expected_count):
     """Тест поиска всех организаций"""
     result = await org_query.find(session, query=query)
-    assert isinstance(result, list)
-    assert len(result) == expected_count
+    assert isinstance(result.items, list)
+    assert len(result.items) == expected_count
+
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_find_by_title_similarity(session: AsyncSession, org_query, test_data):
+    """Тест нечеткого поиска по названию с сортировкой по похожести"""
+    result = await org_query.find(
+        session,
+        query=OrgTitleQuery(org_title="Test Organisation", similarity=0.3)
+    )
+    assert len(result.items) >= 1
+    assert result.items[0].org_title == TEST_DATA["expected"]["org_title"]
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_find_nearest(session: AsyncSession, org_query, test_data):
+    """Тест поиска ближайших организаций с расстоянием"""
+    result = await org_query.find(
+        session,
+        query=GeoNearestQuery(
+            geo=GeoI(
+                lon=TEST_DATA["organization"]["office"]["geo"]["lon"],
+                lat=TEST_DATA["organization"]["office"]["geo"]["lat"]),
+            limit=2
+        )
+    )
+    assert [row.org_title for row in result.items] == ["Test Organization", "Another Organization"]
+    assert result.items[0].distance_m == pytest.approx(0, abs=1)
+    # 0.001 градуса по обеим осям на экваторе - около 157 метров
+    assert result.items[1].distance_m == pytest.approx(157, rel=0.02)
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_find_radius_by_distance(session: AsyncSession, org_query, test_data):
+    """Поиск по радиусу отдает ближние первыми и расстояние до точки"""
+    result = await org_query.find(
+        session,
+        query=GeoRadiusQuery(geo=GeoI(lon=1.0011, lat=1.0011), radius=1000)
+    )
+    assert [row.org_title for row in result.items] == ["Another Organization", "Test Organization"]
+    assert result.items[0].distance_m == pytest.approx(15.7, rel=0.02)
+    assert result.items[1].distance_m == pytest.approx(173, rel=0.02)
+
+    first = await org_query.find(
+        session,
+        query=GeoRadiusQuery(geo=GeoI(lon=1.0011, lat=1.0011), radius=1000, limit=1)
+    )
+    second = await org_query.find(
+        session,
+        query=GeoRadiusQuery(geo=GeoI(lon=1.0011, lat=1.0011), radius=1000, limit=1, cursor=first.next_cursor)
+    )
+    assert [row.org_id for row in first.items + second.items] == [row.org_id for row in result.items]
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_haversine_matches_postgis(session: AsyncSession):
+    """Сферический haversine расходится с ST_Distance по сфероиду не больше чем на 0.56%"""
+    rng = np.random.default_rng(0)
+    lons, lats = rng.uniform(-180, 180, 200), rng.uniform(-80, 80, 200)
+    point = func.ST_GeogFromText('SRID=4326;POINT(37.6173 55.7558)')
+    stmt = select(
+        func.ST_Distance(
+            point,
+            func.ST_GeogFromText(func.format('SRID=4326;POINT(%s %s)', bindparam('lon'), bindparam('lat')))
+        )
+    )
+    expected = [
+        (await session.execute(stmt, {'lon': float(lon), 'lat': float(lat)})).scalar_one()
+        for lon, lat in zip(lons, lats)
+    ]
+    assert haversine(37.6173, 55.7558, lons, lats) == pytest.approx(np.array(expected), rel=0.0056)
+
+
+@pytest.mark.asyncio(loop_scope="module")
+@pytest.mark.parametrize(
+    "query",
+    [
+        CategoryPathQuery(category_path='/test-parent', limit=1),
+        GeoNearestQuery(geo=GeoI(lon=1.0, lat=1.0), limit=1),
+    ]
+)
+async def test_find_keyset_pagination(session: AsyncSession, org_query, test_data, query):
+    """Тест постраничного обхода по next_cursor"""
+    first = await org_query.find(session, query=query)
+    assert len(first.items) == 1
+    assert first.next_cursor is not None
+
+    second = await org_query.find(session, query=query.model_copy(update={"cursor": first.next_cursor}))
+    assert len(second.items) == 1
+    assert second.items[0].org_id != first.items[0].org_id
+
+    last = await org_query.find(session, query=query.model_copy(update={"cursor": second.next_cursor}))
+    assert last.items == []
+    assert last.next_cursor is None
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stream(session: AsyncSession, org_query, test_data):
+    """Тест потоковой выдачи: все совпадения, limit не применяется"""
+    result = [
+        organization
+        async for organization in org_query.stream(
+            session,
+            query=CategoryPathQuery(category_path='/test-parent', limit=1),
+            batch_size=1
+        )
+    ]
+    assert {row.org_title for row in result} == {"Test Organization", "Another Organization"}
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stream_nearest(session: AsyncSession, org_query, test_data):
+    """Поток ближайших соседей ограничен limit запроса, а не всей таблицей geo"""
+    result = [
+        organization
+        async for organization in org_query.stream(
+            session,
+            query=GeoNearestQuery(geo=GeoI(lon=1.0, lat=1.0), limit=1)
+        )
+    ]
+    assert [row.org_title for row in result] == ["Test Organization"]
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_cached_find_invalidated_by_write(session: AsyncSession, org_query, test_data):
+    """Запись организации инвалидирует закэшированную выдачу"""
+    cache = TaggedCache(LRUCache(maxsize=100, ttl=60))
+    cached_query = CachedOrganizationQuery(org_query, cache)
+    path = f'/cache-{uuid4().hex[:8]}'
+    query = CategoryPathQuery(category_path=path)
+
+    assert (await cached_query.find(session, query)).items == []
+    assert (await cached_query.find(session, query)).items == []
+    assert cache.stats.local_hits == 1
+
+    data = OrganizationI(
+        title="Cached Organization",
+        office={"address": "Cached Address", "geo": {"lon": 50.0, "lat": 50.0}},
+        phones=[{"phone": "+79000000001"}],
+        categories=[{"title": "Cached Category", "path": f'{path}/child'}]
+    )
+    await OrgAggregate(session, cache=cache).create_organization(data)
+
+    result = await cached_query.find(session, query)
+    assert len(result.items) == 1
+    assert cache.stats.misses == 2
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_shared_tag_versions(session: AsyncSession, org_query, test_data):
+    """Запись через агрегат приложения инвалидирует кэш другого воркера через базу"""
+    versions = PostgresTagVersions(get_session)
+    worker = TaggedCache(LRUCache(maxsize=100, ttl=60), tag_versions=versions)
+    cached_query = CachedOrganizationQuery(org_query, worker)
+    path = f'/shared-{uuid4().hex[:8]}'
+    query = CategoryPathQuery(category_path=path)
+    assert (await cached_query.find(session, query)).items == []
+    assert (await cached_query.find(session, query)).items == []
+
+    await org_aggregate(session).create_organization(OrganizationI(
+        title="Shared Cache Organization",
+        office={"address": "Shared Address", "geo": {"lon": 51.0, "lat": 51.0}},
+        phones=[{"phone": "+79000000002"}],
+        categories=[{"title": "Shared Category", "path": path}]
+    ))
+
+    # Версии другого процесса видны после фонового обновления
+    assert (await cached_query.find(session, query)).items == []
+    await versions.load()
+    assert len((await cached_query.find(session, query)).items) == 1
+    assert worker.stats.misses == 2
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_find_by_ids(session: AsyncSession, org_query, test_data):
+    """Несколько организаций по id одним запросом"""
+    result = await org_query.find_by_ids(session, [test_data, -1])
+    assert list(result) == [test_data]
+    assert result[test_data].org_title == TEST_DATA["expected"]["org_title"]
+
+
+@pytest.mark.asyncio(loop_scope="module")
+@pytest.mark.parametrize(
+    "query, expected_count",
+    [
+        (CompoundQuery(org_title="Test Organization", category_path='/test-parent'), 1),
+        (CompoundQuery(
+            category_title="Test Category",
+            geo=GeoI(
+                lon=TEST_DATA["organization"]["office"]["geo"]["lon"],
+                lat=TEST_DATA["organization"]["office"]["geo"]["lat"]),
+            radius=1000
+            ), 2),
+        (CompoundQuery(org_title="Another", category_path='/test-parent/test-category-2'), 0),
+    ]
+)
+async def test_find_compound(session: AsyncSession, org_query, test_data, query, expected_count):
+    """Тест составного поиска: пересечение фильтров"""
+    result = await org_query.find(session, query=query)
+    assert len(result.items) == expected_count
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_category_tree(session: AsyncSession, test_data):
+    """Дочерние категории с количеством организаций в поддереве"""
+    category_query = CategoryQuery()
+
+    root = await category_query.find(session, CategoryTreeQuery())
+    assert root.ancestors == []
+    # У промежуточного уровня нет своей строки в categories: название - метка пути
+    assert {"path": "/test-parent", "title": "test-parent", "organizations": 2} in [
+        child.model_dump() for child in root.children
+    ]
+
+    tree = await category_query.find(session, CategoryTreeQuery(category_path='/test-parent'))
+    assert tree.ancestors == []
+    assert {child.path: child.organizations for child in tree.children} == {
+        '/test-parent/another-category': 1,
+        '/test-parent/test-category': 2,
+        '/test-parent/test-category-2': 1
+    }
+    assert {child.title for child in tree.children} == {"Test Category", "Test Category 2", "Another Category"}
+
+    leaf = await category_query.find(session, CategoryTreeQuery(category_path='/test-parent/test-category'))
+    assert [ancestor.title for ancestor in leaf.ancestors] == ["Test Category"]
+    assert leaf.children == []
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_facets(session: AsyncSession, org_query, test_data):
+    """Фасеты по всей выдаче запроса"""
+    facets = await org_query.facets(session, CategoryPathQuery(category_path='/test-parent', limit=1))
+    assert [(facet.value, facet.count) for facet in facets.category_paths] == [('/test-parent', 2)]
+    assert {facet.value: facet.count for facet in facets.category_titles} == {
+        "Test Category": 2,
+        "Test Category 2": 1,
+        "Another Category": 1
+    }
+    assert sum(cell.count for cell in facets.geo_cells) == 2
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_facets_nearest(session: AsyncSession, org_query, test_data):
+    """Фасеты ближайших соседей - только по N ближайшим организациям"""
+    facets = await org_query.facets(session, GeoNearestQuery(geo=GeoI(lon=1.0, lat=1.0), limit=1))
+    assert sum(cell.count for cell in facets.geo_cells) == 1
+    assert {facet.value for facet in facets.category_titles} == {"Test Category", "Test Category 2"}
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_clusters(session: AsyncSession, test_data):
+    """Близкие офисы попадают в один кластер крупной сетки и в разные - мелкой"""
+    viewport = {"min_lon": 0.9, "min_lat": 0.9, "max_lon": 1.1, "max_lat": 1.1}
+    coarse = await ClusterQuery().find(session, GeoClusterQuery(**viewport, grid=0.1))
+    assert [cluster.count for cluster in coarse.clusters] == [2]
+    assert coarse.clusters[0].lon == pytest.approx(1.0005)
+    assert test_data in coarse.clusters[0].org_ids
+
+    fine = await ClusterQuery(max_cells_per_side=1000).find(session, GeoClusterQuery(**viewport, grid=0.0001))
+    assert [cluster.count for cluster in fine.clusters] == [1, 1]
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_tile(session: AsyncSession, test_data):
+    """Тайл с офисами тестовых организаций непустой, дальний тайл пустой"""
+    tile_query = TileQuery()
+    # Тайл 10/514/509 покрывает точку (1.0, 1.0)
+    tile = await tile_query.find(session, 10, 514, 509)
+    assert b"organizations" in tile
+    assert b"Test Organization" in tile
+    assert await tile_query.find(session, 10, 0, 0) == b""
+    assert await tile_query.find(session, 10, 514, 509, category_path='/missing') == b""
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_tile_after_write(session: AsyncSession, test_data):
+    """Запись через агрегат приложения меняет версию данных: отдается новый тайл"""
+    tile = bootstrap()['organization_tile']
+    before = await tile(session, 10, 514, 509)
+    assert before == await tile(session, 10, 514, 509)
+
+    await org_aggregate(session).create_organization(OrganizationI(
+        title="Fresh Tile Organization",
+        office={"address": "Tile Address", "geo": {"lon": 1.002, "lat": 1.002}},
+        phones=[{"phone": "+79000000003"}],
+        categories=[{"title": "Tile Category", "path": "/tile-category"}]
+    ))
 
+    after = await tile(session, 10, 514, 509)
+    assert b"Fresh Tile Organization" in after
+    assert b"Fresh Tile Organization" not in before
@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from sqlalchemy import event
+
+from src.shared.cache.single_flight import SingleFlight
+from src.shared.database.base import engine, get_session
+from src.shared.database.org_aggregate import OrgAggregate
+from src.shared.queries.organization import OrganizationQuery, OrganizationQueryBuilder
+from src.shared.queries.single_flight import SingleFlightOrganizationQuery
+from src.shared.schemas.organization import OrganizationI, GeoRadiusQuery, GeoI
+
+
+BURST = 50
+
+
+async def _burst(org_query, query) -> int:
+    """Одновременные одинаковые запросы, каждый со своей сессией; возвращает число checkout из пула"""
+    checkouts = 0
+
+    def on_checkout(*args):
+        nonlocal checkouts
+        checkouts += 1
+
+    async def find():
+        async with get_session() as session:
+            return await org_query.find(session, query)
+
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    try:
+        results = await asyncio.gather(*(find() for _ in range(BURST)))
+    finally:
+        event.remove(engine.sync_engine, "checkout", on_checkout)
+    assert len({len(result.items) for result in results}) == 1
+    return checkouts
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio(loop_scope="module")
+async def test_single_flight_burst(session):
+    """Нагрузка на пул при всплеске одинаковых запросов с single-flight и без"""
+    await OrgAggregate(session).create_organizations_bulk(
+        OrganizationI(
+            title=f"Burst {i}",
+            office={"address": f"Burst Address {i}", "geo": {"lon": 60.6 + i / 100000, "lat": 56.8}},
+            phones=[{"phone": f"+7914{i:07d}"}],
+            categories=[{"title": "Всплеск", "path": "/burst"}]
+        )
+        for i in range(200)
+    )
+    query = GeoRadiusQuery(geo=GeoI(lon=60.6, lat=56.8), radius=2000)
+    org_query = OrganizationQuery(OrganizationQueryBuilder(use_projection=True))
+    coalescing_query = SingleFlightOrganizationQuery(org_query, SingleFlight())
+
+    plain = await _burst(org_query, query)
+    coalesced = await _burst(coalescing_query, query)
+
+    stats = coalescing_query.single_flight.stats
+    print(f"\ncheckouts without single-flight: {plain}\nwith single-flight: {coalesced}, {stats}")
+    assert stats.executed + stats.coalesced == BURST
+    assert coalesced < plain
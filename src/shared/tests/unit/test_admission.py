@@ -0,0 +1,302 @@
+import asyncio
+import pytest
+
+from fastapi import HTTPException
+
+from src.api.operations.ogranizations.find import FindOrganization
+from src.api.operations.ogranizations.facets import FacetOrganization
+from src.api.operations.ogranizations.stream import StreamOrganization
+from src.api.operations.ogranizations.batch import FindOrganizationBatch
+from src.api.security.admission import (
+    AdmissionController,
+    AdmittedOrganizationQuery,
+    ClientCharge,
+    charged_to
+)
+from src.api.security.keys import ApiClient, LEGACY_CLIENT
+from src.api.security.rate_limit import TokenBucket
+from src.shared.cache.base import TaggedCache, LRUCache
+from src.shared.queries.cache import CachedOrganizationQuery
+from src.shared.queries.cost import query_cost, box_area_km2
+from src.shared.schemas.organization import (
+    OrganizationPageO,
+    OrganizationFacetsO,
+    OrganizationBatchO,
+    OrgIdQuery,
+    GeoBoxQuery,
+    GeoRadiusQuery,
+    CategoryPathQuery,
+    CompoundQuery,
+)
+
+
+SMALL_BOX = GeoBoxQuery(min_lon=37.60, min_lat=55.70, max_lon=37.61, max_lat=55.71)
+# Вся Москва - около 2500 км2
+CITY_BOX = GeoBoxQuery(min_lon=37.2, min_lat=55.5, max_lon=38.0, max_lat=56.0)
+
+
+class _Pool:
+    def __init__(self):
+        self.waiting = 0
+
+    def __call__(self) -> int:
+        return self.waiting
+
+
+class _Query:
+    """Запрос поиска без базы: find ждет, пока его не отпустят"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = 0
+
+    async def find(self, session, query):
+        self.calls += 1
+        await self.release.wait()
+        return OrganizationPageO(items=[], next_cursor=None)
+
+    async def find_by_ids(self, session, org_ids):
+        return {}
+
+    async def facets(self, session, query):
+        await self.release.wait()
+        return OrganizationFacetsO(category_paths=[], category_titles=[], geo_cells=[])
+
+    async def stream(self, session, query):
+        await self.release.wait()
+        return
+        yield
+
+
+class _Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def _controller(pool: _Pool = None, **kwargs) -> AdmissionController:
+    params = dict(concurrency={'GeoBoxQuery': 8}, max_pool_waiters=2)
+    params.update(kwargs)
+    return AdmissionController(pool or _Pool(), **params)
+
+
+def _client(name: str, rate: float = 1, burst: float = 10) -> ApiClient:
+    return ApiClient(name, bucket=TokenBucket(rate, burst))
+
+
+def test_query_cost():
+    assert query_cost(OrgIdQuery(org_id=1)) == 1.0
+    assert query_cost(SMALL_BOX) < 1 < 20 < query_cost(CITY_BOX)
+    assert box_area_km2(-10, -10, 10, 10) == pytest.approx(box_area_km2(170, -10, -170, 10))
+    assert query_cost(GeoRadiusQuery(geo={"lon": 37.6, "lat": 55.7}, radius=20000)) > query_cost(
+        GeoRadiusQuery(geo={"lon": 37.6, "lat": 55.7}, radius=500)
+    )
+    assert query_cost(CategoryPathQuery(category_path='/food')) > query_cost(
+        CategoryPathQuery(category_path='/food/cafe/coffee')
+    ) == 1.0
+    assert query_cost(CompoundQuery(org_title='a', box=CITY_BOX.model_dump(exclude={'limit', 'cursor'}))) == 1.0
+
+
+def test_weight():
+    controller = _controller()
+    assert controller.weight(SMALL_BOX) == 1
+    # Не больше потолка типа: иначе запрос не допустить никогда
+    assert controller.weight(CITY_BOX) == 8
+    assert _controller(concurrency={}).weight(CITY_BOX) > 20
+
+
+def test_client_charge():
+    client = _client('a', rate=1, burst=5)
+    charge = ClientCharge(client)
+    # Один токен запрос уже отдал при проверке подписи
+    assert charge.acquire(3) == 0.0
+    assert client.bucket.acquire(3) == 0.0
+    # Вес больше запаса bucket списывается как весь запас
+    charge = ClientCharge(_client('b', rate=0.001, burst=5))
+    assert charge.acquire(100) == 0.0
+    assert charge.acquire(2) > 0
+    assert ClientCharge(None).acquire(100) == 0.0
+
+
+async def test_concurrency_cap():
+    controller = _controller()
+    async with controller.admit(CITY_BOX):
+        with pytest.raises(HTTPException) as e:
+            async with controller.admit(SMALL_BOX):
+                pass
+        assert e.value.status_code == 503
+        assert e.value.headers['Retry-After'] == '1'
+        # Другие типы не делят потолок GeoBoxQuery
+        async with controller.admit(OrgIdQuery(org_id=1)):
+            pass
+    async with controller.admit(SMALL_BOX):
+        assert controller.stats.in_flight == 1
+    assert controller.stats.rejected_concurrency == 1
+    assert controller.stats.in_flight == 0
+
+
+async def test_client_rate():
+    controller = _controller()
+    a = _client('a', rate=0.001)
+    async with controller.admit(CITY_BOX, ClientCharge(a)):
+        pass
+    with pytest.raises(HTTPException) as e:
+        async with controller.admit(CITY_BOX, ClientCharge(a)):
+            pass
+    assert e.value.status_code == 429
+    assert int(e.value.headers['Retry-After']) >= 1
+    # Лимит - bucket ключа клиента, у другого клиента свой
+    async with controller.admit(SMALL_BOX, ClientCharge(_client('b'))):
+        pass
+    assert controller.stats.rejected_rate == 1
+
+
+async def test_legacy_client_unlimited():
+    controller = _controller()
+    # У клиента SECRET_KEY нет bucket: общий лимит отклонял бы всех вызывающих
+    legacy = ApiClient(LEGACY_CLIENT)
+    for _ in range(5):
+        async with controller.admit(CITY_BOX, ClientCharge(legacy)):
+            pass
+    assert controller.stats.rejected_rate == 0
+
+    # Потолок типа действует и для него
+    async with controller.admit(CITY_BOX, ClientCharge(legacy)):
+        with pytest.raises(HTTPException) as e:
+            async with controller.admit(CITY_BOX, ClientCharge(legacy)):
+                pass
+        assert e.value.status_code == 503
+
+
+async def test_pool_saturated():
+    pool = _Pool()
+    controller = _controller(pool)
+    pool.waiting = 3
+    with pytest.raises(HTTPException) as e:
+        async with controller.admit(OrgIdQuery(org_id=1)):
+            pass
+    assert e.value.status_code == 503
+    pool.waiting = 2
+    async with controller.admit(OrgIdQuery(org_id=1)):
+        pass
+    assert controller.stats.rejected_pool == 1
+
+
+async def test_find_organization_admission():
+    query = _Query()
+    operation = FindOrganization(AdmittedOrganizationQuery(query, _controller(concurrency={'GeoBoxQuery': 1})))
+    heavy = asyncio.create_task(operation(_Session(), CITY_BOX, client=_client('a')))
+    await asyncio.sleep(0)
+
+    # Потолок GeoBoxQuery занят: отказ сразу, а не ожидание соединения
+    with pytest.raises(HTTPException) as e:
+        await asyncio.wait_for(operation(_Session(), SMALL_BOX, client=_client('b')), timeout=1)
+    assert e.value.status_code == 503
+
+    query.release.set()
+    await heavy
+    assert await operation(_Session(), SMALL_BOX, client=_client('b')) == OrganizationPageO(items=[], next_cursor=None)
+
+
+async def test_cache_hit_not_admitted():
+    query = _Query()
+    query.release.set()
+    controller = _controller()
+    cache = TaggedCache(LRUCache(maxsize=10, ttl=60))
+    operation = FindOrganization(CachedOrganizationQuery(AdmittedOrganizationQuery(query, controller), cache))
+    client = _client('a', rate=0.001, burst=10)
+
+    await operation(_Session(), CITY_BOX, client=client)
+    assert controller.stats.admitted == 1
+    # Ответ из кэша не занимает потолок и не тратит лимит сверх токена подписи
+    for _ in range(5):
+        await operation(_Session(), CITY_BOX, client=client)
+    assert query.calls == 1
+    assert controller.stats.admitted == 1
+    assert controller.stats.rejected_rate == 0
+    # Промах кэша снова платит вес запроса
+    with pytest.raises(HTTPException) as e:
+        await operation(_Session(), CITY_BOX.model_copy(update={'limit': 5}), client=client)
+    assert e.value.status_code == 429
+
+
+async def test_facets_admission():
+    query = _Query()
+    query.release.set()
+    controller = _controller(concurrency={'GeoBoxQuery': 1})
+    operation = FacetOrganization(AdmittedOrganizationQuery(query, controller))
+    async with controller.admit(CITY_BOX):
+        with pytest.raises(HTTPException) as e:
+            await operation(_Session(), SMALL_BOX, client=_client('b'))
+        assert e.value.status_code == 503
+    assert (await operation(_Session(), SMALL_BOX, client=_client('b'))).geo_cells == []
+
+
+async def test_stream_admission():
+    query = _Query()
+    controller = _controller(concurrency={'GeoBoxQuery': 1})
+    operation = StreamOrganization(query, controller)
+
+    # Допуск занят до возврата генератора, а не при первом чтении
+    stream = await operation(_Session(), CITY_BOX, client=_client('a', rate=1, burst=100))
+    assert controller.stats.in_flight == 1
+    with pytest.raises(HTTPException) as e:
+        await operation(_Session(), SMALL_BOX, client=_client('b'))
+    assert e.value.status_code == 503
+
+    query.release.set()
+    assert [chunk async for chunk in stream] == []
+    assert controller.stats.in_flight == 0
+
+    # Ответ, не начавший чтение, тоже освобождает допуск
+    stream = await operation(_Session(), CITY_BOX)
+    await stream.aclose()
+    assert controller.stats.in_flight == 0
+
+    # Вес списывается с лимита ключа клиента
+    client = _client('c', rate=0.001, burst=10)
+    client.bucket.acquire(5)
+    with pytest.raises(HTTPException) as e:
+        await StreamOrganization(query, _controller())(_Session(), CITY_BOX, client=client)
+    assert e.value.status_code == 429
+
+
+async def test_batch_admission():
+    query = _Query()
+    query.release.set()
+    controller = _controller()
+    operation = FindOrganizationBatch(AdmittedOrganizationQuery(query, controller), _Session, concurrency=4)
+
+    a = _client('a', rate=0.001, burst=10)
+    result = await operation([OrgIdQuery(org_id=1), OrgIdQuery(org_id=2), SMALL_BOX], client=a)
+    assert list(result.results) == [0, 1, 2]
+    # Запросы по id - одна группа с весом OrgIdQuery; первую группу оплатил
+    # токен подписи, вторая списала свой вес
+    assert controller.stats.admitted == 2
+    assert a.bucket.acquire(9) == 0.0
+
+    # Каждый элемент списывается с bucket клиента с весом отдельного find
+    with pytest.raises(HTTPException) as e:
+        await operation([CITY_BOX, CITY_BOX], client=_client('b'))
+    assert e.value.status_code == 429
+    assert controller.stats.in_flight == 0
+    assert await operation([SMALL_BOX], client=_client('c')) == OrganizationBatchO(
+        results={0: OrganizationPageO(items=[], next_cursor=None)}
+    )
+
+
+async def test_charged_to_scope():
+    controller = _controller()
+    client = _client('a', rate=0.001, burst=1)
+    client.bucket.acquire()
+    with charged_to(client):
+        async with controller.admit(SMALL_BOX):
+            pass
+        with pytest.raises(HTTPException):
+            async with controller.admit(SMALL_BOX):
+                pass
+    # Вне блока списывать не с кого
+    async with controller.admit(SMALL_BOX):
+        pass
@@ -0,0 +1,138 @@
+import json
+import os
+import pytest
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src.api import dependencies
+from src.api.main import app
+from src.api.security.keys import KeyStore, LEGACY_CLIENT
+from src.api.security.rate_limit import TokenBucket
+from src.api.security.security import generate_signature
+from src.shared.schemas.organization import OrgIdQuery, OrgTitleQuery
+
+
+MOBILE_KEY = 'mobile-0123456789abcdef'
+PARTNER_KEY = 'partner-0123456789abcdef'
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _write(path, clients: list[dict]):
+    path.write_text(json.dumps({"clients": clients}))
+    # mtime файловой системы бывает грубым, версия файла учитывает и размер
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def keys_file(tmp_path):
+    path = tmp_path / 'keys.json'
+    _write(path, [
+        {"client": "mobile", "key": MOBILE_KEY, "rate": 1, "burst": 2, "query_types": ["OrgIdQuery"]},
+        {"client": "partner", "key": PARTNER_KEY}
+    ])
+    return path
+
+
+def test_token_bucket():
+    clock = _Clock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.5)
+    clock.now = 0.5
+    assert bucket.acquire() == 0.0
+    clock.now = 100
+    assert [bucket.acquire() for _ in range(3)][-1] > 0
+
+
+def test_key_store(keys_file):
+    store = KeyStore(str(keys_file))
+    assert store.get(generate_signature()).name == LEGACY_CLIENT
+    assert store.get(MOBILE_KEY).name == 'mobile'
+    assert store.get('unknown') is None
+
+    mobile = store.get(MOBILE_KEY)
+    assert mobile.allows('OrgIdQuery') and not mobile.allows('OrgTitleQuery')
+    assert store.get(PARTNER_KEY).allows('OrgTitleQuery')
+    assert store.get(PARTNER_KEY).acquire() == 0.0
+
+    assert KeyStore(str(keys_file), legacy=False).get(generate_signature()) is None
+
+
+def test_key_store_reload(keys_file):
+    store = KeyStore(str(keys_file))
+    bucket = store.get(MOBILE_KEY).bucket
+    assert not store.reload()
+
+    _write(keys_file, [
+        {"client": "mobile", "key": MOBILE_KEY, "rate": 1, "burst": 2},
+        {"client": "partner", "key": PARTNER_KEY + '-rotated', "rate": 5}
+    ])
+    assert store.reload()
+    # Лимит не менялся - клиент сохраняет свой bucket
+    assert store.get(MOBILE_KEY).bucket is bucket
+    assert store.get(MOBILE_KEY).allows('OrgTitleQuery')
+    assert store.get(PARTNER_KEY) is None
+    assert store.get(PARTNER_KEY + '-rotated').bucket.burst == 5
+
+    # Некорректный файл не заменяет рабочую таблицу
+    keys_file.write_text('{"clients": [')
+    with pytest.raises(ValueError):
+        store.reload()
+    assert store.get(MOBILE_KEY).name == 'mobile'
+
+
+def test_duplicate_keys(tmp_path):
+    path = tmp_path / 'keys.json'
+    _write(path, [
+        {"client": "a", "key": MOBILE_KEY},
+        {"client": "b", "key": MOBILE_KEY}
+    ])
+    with pytest.raises(ValueError):
+        KeyStore(str(path))
+
+
+async def test_verify_request_signature(keys_file, monkeypatch):
+    monkeypatch.setattr(dependencies, 'key_store', KeyStore(str(keys_file)))
+    request = SimpleNamespace(state=SimpleNamespace())
+
+    with pytest.raises(HTTPException) as e:
+        await dependencies.verify_request_signature(request, 'unknown')
+    assert e.value.status_code == 403
+
+    await dependencies.verify_request_signature(request, MOBILE_KEY)
+    assert request.state.client.name == 'mobile'
+    dependencies.authorize_query(request, OrgIdQuery(org_id=1))
+    with pytest.raises(HTTPException) as e:
+        dependencies.authorize_query(request, OrgTitleQuery(org_title='a'))
+    assert e.value.status_code == 403
+
+    await dependencies.verify_request_signature(request, MOBILE_KEY)
+    with pytest.raises(HTTPException) as e:
+        await dependencies.verify_request_signature(request, MOBILE_KEY)
+    assert e.value.status_code == 429
+    assert int(e.value.headers['Retry-After']) >= 1
+
+
+def test_admin_only(keys_file, monkeypatch):
+    _write(keys_file, [
+        {"client": "mobile", "key": MOBILE_KEY, "query_types": ["OrgIdQuery"]},
+        {"client": "ops", "key": PARTNER_KEY, "admin": True}
+    ])
+    monkeypatch.setattr(dependencies, 'key_store', KeyStore(str(keys_file)))
+    client = TestClient(app)
+    url = '/api/v1/admin/slow-queries'
+
+    assert client.get(url, headers={'X-Signature': MOBILE_KEY}).status_code == 403
+    assert client.get(url, headers={'X-Signature': PARTNER_KEY}).status_code == 200
+    assert client.get(url, headers={'X-Signature': generate_signature()}).status_code == 200
@@ -0,0 +1,69 @@
+import pytest
+from time import perf_counter
+
+from sqlalchemy.dialects import postgresql
+
+from src.shared.queries.organization import OrganizationQueryBuilder
+from src.shared.schemas.organization import (
+    GeoI,
+    OrganizationQueryI,
+    OrgIdQuery,
+    OrgTitleQuery,
+    CategoryPathQuery,
+    CategoryTitleQuery,
+    OfficeAddressQuery,
+    GeoRadiusQuery,
+    GeoBoxQuery,
+    GeoNearestQuery
+)
+
+
+REPEAT = 200
+DIALECT = postgresql.asyncpg.dialect()
+
+
+QUERIES = [
+    OrgIdQuery(org_id=1),
+    OrgTitleQuery(org_title="Test Organization"),
+    OrgTitleQuery(org_title="Test Organization", similarity=0.4),
+    CategoryPathQuery(category_path="/food"),
+    CategoryTitleQuery(category_title="Кафе"),
+    OfficeAddressQuery(office_address="Пушкина"),
+    GeoRadiusQuery(geo=GeoI(lon=37.6, lat=55.7), radius=1000),
+    GeoBoxQuery(min_lon=37.5, min_lat=55.7, max_lon=37.7, max_lat=55.9),
+    GeoNearestQuery(geo=GeoI(lon=37.6, lat=55.7))
+]
+
+
+@pytest.mark.parametrize("query", QUERIES, ids=lambda query: type(query).__name__)
+async def test_builder_reuses_statement(query: OrganizationQueryI):
+    """Повторный запрос того же варианта берет готовый statement, меняются только параметры"""
+    builder = OrganizationQueryBuilder(use_projection=True)
+    stmt, params = await builder(query)
+    again, again_params = await builder(query)
+    assert again is stmt
+    assert again_params == params
+    assert len(builder._statements) == 1
+
+
+@pytest.mark.slow
+@pytest.mark.benchmark
+@pytest.mark.parametrize("query", QUERIES, ids=lambda query: type(query).__name__)
+async def test_builder_benchmark(query: OrganizationQueryI):
+    """Построение + компиляция на каждый запрос против готового statement"""
+    builder = OrganizationQueryBuilder(use_projection=True)
+    started = perf_counter()
+    for _ in range(REPEAT):
+        builder._statements.clear()
+        stmt, _ = await builder(query)
+        stmt.compile(dialect=DIALECT)
+    cold = (perf_counter() - started) / REPEAT
+
+    started = perf_counter()
+    for _ in range(REPEAT):
+        stmt, _ = await builder(query)
+        # То, что движок делает на каждый execute для поиска в compiled cache
+        stmt._generate_cache_key()
+    warm = (perf_counter() - started) / REPEAT
+
+    print(f"\n{type(query).__name__}: build+compile {cold * 1e6:.0f} us, cached {warm * 1e6:.0f} us")
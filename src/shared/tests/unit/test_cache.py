@@ -0,0 +1,213 @@
+import pytest
+
+from src.shared.cache.base import LRUCache, TaggedCache, InMemorySharedCache
+from src.shared.cache.organization import query_cache_key, query_tags, organization_tags, GEO_ALL_TAG
+from src.shared.cache.postgres import PostgresTagVersions
+from src.shared.cache.tiles import TileCache
+from src.shared.queries.cache import CachedOrganizationQuery
+from src.shared.queries.tile import TileQuery
+from src.shared.schemas.organization import (
+    OrganizationI,
+    OrganizationPageO,
+    OrgTitleQuery,
+    CategoryPathQuery,
+    GeoRadiusQuery,
+    GeoBoxQuery,
+    GeoNearestQuery,
+    CompoundQuery,
+    GeoI
+)
+
+
+ORGANIZATION = OrganizationI(
+    title="Test",
+    office={"address": "Address", "geo": {"lon": 37.6173, "lat": 55.7558}},
+    phones=[{"phone": "+79000000000"}],
+    categories=[{"title": "Кафе", "path": "/food/cafe"}]
+)
+
+
+class _Query:
+    """Подсчитывает обращения к базе вместо OrganizationQuery"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def find(self, session, query):
+        self.calls += 1
+        return OrganizationPageO(items=[], next_cursor=None)
+
+
+def test_cache_key_is_canonical():
+    assert query_cache_key(OrgTitleQuery(org_title="ООО Ромашка")) == \
+        query_cache_key(OrgTitleQuery(org_title="ооо ромашка"))
+    # Пробелы значимы для ILIKE: " cafe", "cafe" и "a  b" - разные запросы
+    assert query_cache_key(OrgTitleQuery(org_title=" cafe")) != \
+        query_cache_key(OrgTitleQuery(org_title="cafe"))
+    assert query_cache_key(OrgTitleQuery(org_title="a  b")) != \
+        query_cache_key(OrgTitleQuery(org_title="a b"))
+    assert query_cache_key(GeoNearestQuery(geo=GeoI(lon=37.61730000001, lat=55.7558))) == \
+        query_cache_key(GeoNearestQuery(geo=GeoI(lon=37.6173, lat=55.7558)))
+    assert query_cache_key(CategoryPathQuery(category_path="/Food")) != \
+        query_cache_key(CategoryPathQuery(category_path="/food"))
+
+
+def test_lru_eviction_and_ttl():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    expired = LRUCache(maxsize=2, ttl=-1)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+
+
+def test_organization_tags_cover_queries():
+    tags = set(organization_tags(1, ORGANIZATION))
+    for query in [
+        CategoryPathQuery(category_path="/food"),
+        CategoryPathQuery(category_path="/food/cafe"),
+        GeoRadiusQuery(geo=GeoI(lon=37.6173, lat=55.7558), radius=1000),
+        GeoBoxQuery(min_lon=37.5, min_lat=55.7, max_lon=37.7, max_lat=55.8),
+        GeoNearestQuery(geo=GeoI(lon=0, lat=0)),
+        CompoundQuery(org_title="Test", geo=GeoI(lon=37.6173, lat=55.7558), radius=500),
+        CompoundQuery(org_title="Test", category_path="/food"),
+    ]:
+        assert tags & set(query_tags(query))
+    assert not tags & set(query_tags(CategoryPathQuery(category_path="/auto")))
+    assert not tags & set(query_tags(GeoBoxQuery(min_lon=30.0, min_lat=59.9, max_lon=30.1, max_lat=60.0)))
+    assert query_tags(GeoBoxQuery(min_lon=-180, min_lat=-90, max_lon=180, max_lat=90)) == [GEO_ALL_TAG]
+
+
+@pytest.mark.parametrize("shared", [None, InMemorySharedCache()], ids=["local", "shared"])
+async def test_cached_query_invalidation(shared):
+    cache = TaggedCache(LRUCache(maxsize=10, ttl=60), shared=shared)
+    inner = _Query()
+    query = CachedOrganizationQuery(inner, cache)
+    search = CategoryPathQuery(category_path="/food")
+
+    await query.find(None, search)
+    await query.find(None, search)
+    assert inner.calls == 1
+    assert cache.stats.local_hits == 1
+
+    await cache.invalidate(organization_tags(1, ORGANIZATION))
+    await query.find(None, search)
+    assert inner.calls == 2
+    assert cache.stats.misses == 2
+
+
+async def test_shared_tier_hit():
+    shared = InMemorySharedCache()
+    first = TaggedCache(LRUCache(maxsize=10, ttl=60), shared=shared)
+    second = TaggedCache(LRUCache(maxsize=10, ttl=60), shared=shared)
+    inner = _Query()
+    search = OrgTitleQuery(org_title="Test")
+
+    await CachedOrganizationQuery(inner, first).find(None, search)
+    await CachedOrganizationQuery(inner, second).find(None, search)
+    assert inner.calls == 1
+    assert second.stats.shared_hits == 1
+
+
+class _VersionsSession:
+    """Таблица cache_tag_versions в словаре вместо AsyncSession"""
+
+    def __init__(self, table: dict[str, int]):
+        self.table = table
+        self.calls = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def execute(self, stmt):
+        self.calls += 1
+        if stmt.is_insert:
+            # Теги upsert задает тест: разбирать VALUES statement здесь незачем
+            tags = self.incr
+            for tag in tags:
+                self.table[tag] = self.table.get(tag, 0) + 1
+            self.rows = [(tag, self.table[tag]) for tag in tags]
+        else:
+            self.rows = list(self.table.items())
+        return self
+
+    async def commit(self):
+        pass
+
+    def tuples(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+async def test_postgres_tag_versions_in_memory():
+    session = _VersionsSession({"tag:data": 3})
+    versions = PostgresTagVersions(session, read_through=False)
+    cache = TaggedCache(LRUCache(maxsize=10, ttl=60), tag_versions=versions)
+    inner = _Query()
+    query = CachedOrganizationQuery(inner, cache)
+    search = OrgTitleQuery(org_title="Test")
+
+    assert await versions.load() == 1
+    await query.find(None, search)
+    await query.find(None, search)
+    # Попадание и промах читают версии из памяти, без обращения к базе
+    assert inner.calls == 1
+    assert session.calls == 1
+
+    # Другой процесс увеличил версию: видно после фонового обновления
+    session.table["tag:title"] = 1
+    await query.find(None, search)
+    assert inner.calls == 1
+    await versions.load()
+    await query.find(None, search)
+    assert inner.calls == 2
+
+    # Своя запись видна сразу
+    session.incr = ["tag:title"]
+    await cache.invalidate(["title"])
+    await query.find(None, search)
+    assert inner.calls == 3
+
+
+class _TileSession:
+    """Подсчитывает запросы тайлов вместо AsyncSession"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def execute(self, stmt, params):
+        self.calls += 1
+        return self
+
+    def scalar_one(self):
+        return b"tile"
+
+
+async def test_tile_cache_data_version():
+    cache = TaggedCache(LRUCache(maxsize=10, ttl=60))
+    tile_query = TileQuery(TileCache(LRUCache(maxsize=10, ttl=60), cache))
+    session = _TileSession()
+
+    assert await tile_query.find(session, 10, 619, 321) == b"tile"
+    await tile_query.find(session, 10, 619, 321)
+    assert session.calls == 1
+    await tile_query.find(session, 10, 619, 321, category_path="/food")
+    assert session.calls == 2
+
+    await cache.invalidate(organization_tags(1, ORGANIZATION))
+    await tile_query.find(session, 10, 619, 321)
+    assert session.calls == 3
+    assert tile_query.cache.stats.local_hits == 1
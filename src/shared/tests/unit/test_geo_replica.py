@@ -0,0 +1,121 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.shared.geo.haversine import haversine, rank_by_distance, geodesic_box, split_lon
+from src.shared.geo.replica import GeoReplica
+from src.shared.queries.organization import OrganizationQueryBuilder
+from src.shared.schemas.organization import GeoRadiusQuery, GeoBoxQuery, GeoI
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    """Отдает строки (org_id, lon, lat, updated_at) вместо AsyncSession"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.params = []
+
+    async def execute(self, stmt, params=None):
+        self.params.append(params)
+        return _Result(self.rows)
+
+
+def test_haversine():
+    # Москва - Санкт-Петербург, ~634 км
+    distance = haversine(37.6173, 55.7558, np.array([30.3351]), np.array([59.9343]))[0]
+    assert distance == pytest.approx(634_000, rel=0.005)
+    assert haversine(1.0, 1.0, np.array([1.0]), np.array([1.0]))[0] == 0
+
+
+def test_rank_by_distance():
+    lons = np.array([0.0, 3.0, 1.0, 2.0])
+    lats = np.zeros(4)
+    order, distances = rank_by_distance(0, 0, lons, lats)
+    assert order.tolist() == [0, 2, 3, 1]
+    assert np.all(np.diff(distances) >= 0)
+
+    order, distances = rank_by_distance(0, 0, lons, lats, limit=2)
+    assert order.tolist() == [0, 2]
+    assert distances[1] == pytest.approx(111_195, rel=0.001)
+
+
+def test_boxes():
+    # Северное ребро выгибается к полюсу, южное не сдвигается
+    min_lon, min_lat, max_lon, max_lat = geodesic_box(0, 50, 20, 60)
+    assert (min_lon, min_lat, max_lon) == (0, 50, 20)
+    assert max_lat > 60
+    assert geodesic_box(0, -60, 20, -50)[1] < -60
+    assert split_lon(170, 190) == [(170, 180), (-180, -170)]
+    assert split_lon(-10, 10) == [(-10, 10)]
+
+
+async def test_replica_matches_brute_force():
+    rng = np.random.default_rng(0)
+    lons, lats = rng.uniform(37, 38, 2000), rng.uniform(55, 56, 2000)
+    rows = [(i, lon, lat, datetime(2026, 1, 1)) for i, (lon, lat) in enumerate(zip(lons, lats))]
+    replica = GeoReplica(tolerance=0.0)
+    await replica.refresh(_Session(rows))
+    assert replica.ready and len(replica) == 2000
+
+    expected = np.flatnonzero(haversine(37.5, 55.5, lons, lats) <= 5000)
+    assert sorted(replica.radius(37.5, 55.5, 5000)) == expected.tolist()
+
+    inside = np.flatnonzero((lons >= 37.2) & (lons <= 37.4) & (lats >= 55.2) & (lats <= 55.4))
+    assert set(inside.tolist()) <= set(replica.box(37.2, 55.2, 37.4, 55.4))
+
+
+async def test_replica_delta_refresh():
+    replica = GeoReplica()
+    await replica.refresh(_Session([(1, 10.0, 10.0, datetime(2026, 1, 1)), (2, 20.0, 20.0, datetime(2026, 1, 2))]))
+
+    # Организация 1 переехала: старая точка заменяется
+    session = _Session([(1, 20.0, 20.0, datetime(2026, 1, 3))])
+    await replica.refresh(session)
+    assert session.params[0]['since'] < datetime(2026, 1, 2)
+    assert len(replica) == 2
+    assert replica.radius(10.0, 10.0, 100) == []
+    assert sorted(replica.radius(20.0, 20.0, 100)) == [1, 2]
+
+
+async def test_builder_uses_replica():
+    replica = GeoReplica()
+    await replica.refresh(_Session([(7, 1.0, 1.0, datetime(2026, 1, 1))]))
+    builder = OrganizationQueryBuilder(replica=replica)
+
+    stmt, params = await builder(GeoRadiusQuery(geo=GeoI(lon=1, lat=1), radius=100))
+    assert params['geo_ids'] == [7]
+    assert 'geo_ids' in str(stmt)
+
+    _, params = await builder(GeoBoxQuery(min_lon=2, min_lat=2, max_lon=3, max_lat=3))
+    assert params['geo_ids'] == []
+
+
+async def test_builder_skips_stale_replica(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('src.shared.geo.replica.monotonic', lambda: now[0])
+    replica = GeoReplica(max_staleness=60)
+    await replica.refresh(_Session([(7, 1.0, 1.0, datetime(2026, 1, 1))]))
+    builder = OrganizationQueryBuilder(replica=replica)
+    query = GeoRadiusQuery(geo=GeoI(lon=1, lat=1), radius=100)
+    assert replica.fresh
+
+    # Обновление не проходило дольше max_staleness: поиск без кандидатов копии
+    now[0] += 61
+    assert not replica.fresh
+    stmt, params = await builder(query)
+    assert 'geo_ids' not in params and 'geo_ids' not in str(stmt)
+    stmt, params = await builder.facets(query)
+    assert 'geo_ids' not in params and 'geo_ids' not in str(stmt)
+
+    await replica.refresh(_Session([]))
+    stmt, params = await builder(query)
+    assert params['geo_ids'] == [7] and 'geo_ids' in str(stmt)
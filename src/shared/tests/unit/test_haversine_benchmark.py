@@ -0,0 +1,62 @@
+import math
+from time import perf_counter
+
+import numpy as np
+import pytest
+
+from src.shared.geo.haversine import haversine, rank_by_distance
+
+
+COUNT = 1_000_000
+LIMIT = 100
+
+
+def _haversine_python(lon: float, lat: float, lons, lats) -> list[float]:
+    lon, lat = math.radians(lon), math.radians(lat)
+    distances = []
+    for point_lon, point_lat in zip(lons, lats):
+        point_lon, point_lat = math.radians(point_lon), math.radians(point_lat)
+        a = (
+            math.sin((point_lat - lat) / 2) ** 2
+            + math.cos(lat) * math.cos(point_lat) * math.sin((point_lon - lon) / 2) ** 2
+        )
+        distances.append(2 * 6_371_008.8 * math.asin(math.sqrt(min(a, 1.0))))
+    return distances
+
+
+def _points(count: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    return rng.uniform(37, 38, count), rng.uniform(55, 56, count)
+
+
+def test_haversine_matches_scalar():
+    """Векторные расстояния и top-N совпадают со скалярной формулой"""
+    lons, lats = _points(10_000)
+    expected = _haversine_python(37.6, 55.75, lons.tolist(), lats.tolist())
+    _, nearest = rank_by_distance(37.6, 55.75, lons, lats, limit=LIMIT)
+    assert haversine(37.6, 55.75, lons, lats) == pytest.approx(np.array(expected))
+    assert nearest.tolist() == pytest.approx(sorted(expected)[:LIMIT])
+
+
+@pytest.mark.slow
+@pytest.mark.benchmark
+def test_haversine_benchmark():
+    """Расстояния и top-N ближайших для 1M точек: NumPy против цикла Python"""
+    lons, lats = _points(COUNT)
+
+    started = perf_counter()
+    _haversine_python(37.6, 55.75, lons.tolist(), lats.tolist())
+    python = perf_counter() - started
+
+    started = perf_counter()
+    haversine(37.6, 55.75, lons, lats)
+    vectorized = perf_counter() - started
+
+    started = perf_counter()
+    rank_by_distance(37.6, 55.75, lons, lats, limit=LIMIT)
+    ranked = perf_counter() - started
+
+    print(
+        f"\npython: {python * 1000:.0f} ms\nnumpy: {vectorized * 1000:.1f} ms"
+        f"\nnumpy top-{LIMIT}: {ranked * 1000:.1f} ms"
+    )
@@ -0,0 +1,127 @@
+import os
+import subprocess
+import sys
+from time import perf_counter
+
+import pytest
+
+from src.shared.cache.base import CacheStats
+from src.shared.metrics.base import Counter, Histogram, StatsCollector, Registry
+from src.shared.metrics.find import FIND_STAGE_SECONDS, FIND_ROWS
+from src.shared.metrics.multiprocess import WorkerMetrics
+from src.shared.queries.organization import OrganizationQuery, OrganizationQueryBuilder
+from src.shared.schemas.organization import OrgTitleQuery, OrganizationQueryI
+from src.api.routers.operations import _timed_parser
+from src.api.utils.query_parser import UnionQueryParser
+
+
+class _Result:
+    def mappings(self):
+        return self
+
+    def all(self):
+        return [{
+            "org_id": 1,
+            "org_title": "Test",
+            "phones": ["+79000000000"],
+            "office_address": "Address",
+            "categories_titles": ["Кафе"]
+        }]
+
+
+class _Session:
+    async def connection(self):
+        return None
+
+    async def execute(self, stmt, params):
+        return _Result()
+
+
+def test_histogram_render():
+    histogram = Histogram('latency_seconds', 'Задержка', labelnames=('query_type',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, 'A"B')
+    lines = list(histogram.render())
+    assert 'latency_seconds_bucket{query_type="A\\"B",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{query_type="A\\"B",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{query_type="A\\"B",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{query_type="A\\"B"} 3' in lines
+    assert histogram.sum('A"B') == pytest.approx(5.55)
+
+
+def test_registry_render():
+    registry = Registry()
+    counter = registry.register('errors', Counter('errors_total', 'Ошибки', labelnames=('query_type',)))
+    counter.inc('OrgIdQuery')
+    registry.register('cache', StatsCollector('cache', lambda: CacheStats(misses=3), gauges={'local_hits'}))
+    text = registry.render()
+    assert 'errors_total{query_type="OrgIdQuery"} 1' in text
+    assert '# TYPE cache_misses_total counter\ncache_misses_total 3' in text
+    assert '# TYPE cache_local_hits gauge' in text
+    assert text.endswith('\n')
+
+
+
+def _worker_registry(errors: int) -> Registry:
+    registry = Registry()
+    counter = registry.register('errors', Counter('errors_total', 'Ошибки', labelnames=('query_type',)))
+    counter.inc('OrgIdQuery', value=errors)
+    registry.register('cache', StatsCollector('cache', lambda: CacheStats(misses=errors), gauges={'local_hits'}))
+    return registry
+
+
+def test_worker_metrics(tmp_path):
+    path = str(tmp_path)
+    # Завершившийся процесс: его файл удаляется при чтении
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    WorkerMetrics(path, _worker_registry(5), worker=dead.pid).dump()
+    WorkerMetrics(path, _worker_registry(2), worker=os.getppid()).dump()
+    current = WorkerMetrics(path, _worker_registry(1))
+
+    text = current.render()
+    assert text.count('# TYPE errors_total counter') == 1
+    assert f'errors_total{{query_type="OrgIdQuery",worker="{os.getpid()}"}} 1' in text
+    assert f'errors_total{{query_type="OrgIdQuery",worker="{os.getppid()}"}} 2' in text
+    assert text.count('# TYPE cache_misses_total counter') == 1
+    assert f'cache_misses_total{{worker="{os.getpid()}"}} 1' in text
+    assert f'worker="{dead.pid}"' not in text
+    assert not os.path.exists(os.path.join(path, f'{dead.pid}.prom'))
+
+    current.remove()
+    assert f'worker="{os.getpid()}"' in current.render()
+    current.remove()
+    assert sorted(os.listdir(path)) == [f'{os.getppid()}.prom']
+
+async def test_find_stages():
+    org_query = OrganizationQuery(OrganizationQueryBuilder(), trusted_output=True)
+    counts = {stage: FIND_STAGE_SECONDS.count('OrgTitleQuery', stage) for stage in ('build', 'pool_wait', 'execute', 'materialize')}
+
+    page = await org_query.find(_Session(), OrgTitleQuery(org_title="Test"))
+    assert len(page.items) == 1
+    for stage, count in counts.items():
+        assert FIND_STAGE_SECONDS.count('OrgTitleQuery', stage) == count + 1
+    assert FIND_ROWS.count('OrgTitleQuery') >= 1
+
+
+async def test_parse_stage():
+    count = FIND_STAGE_SECONDS.count('OrgTitleQuery', 'parse')
+    # Общий парсер метрик не пишет, этап parse - только у обертки /find/
+    await UnionQueryParser.parse(OrganizationQueryI)(query='{"org_title": "a"}')
+    assert FIND_STAGE_SECONDS.count('OrgTitleQuery', 'parse') == count
+    assert isinstance(await _timed_parser(OrganizationQueryI)(query='{"org_title": "a"}'), OrgTitleQuery)
+    assert FIND_STAGE_SECONDS.count('OrgTitleQuery', 'parse') == count + 1
+
+
+@pytest.mark.slow
+@pytest.mark.benchmark
+def test_observe_overhead():
+    """Стоимость записи одного значения в гистограмму"""
+    histogram = Histogram('overhead_seconds', 'Накладные расходы', labelnames=('query_type', 'stage'))
+    count = 200_000
+    started = perf_counter()
+    for i in range(count):
+        histogram.observe(i / count, 'OrgTitleQuery', 'execute')
+    per_observe = (perf_counter() - started) / count
+    print(f"\nobserve: {per_observe * 1e6:.3f} us")
+    assert histogram.count('OrgTitleQuery', 'execute') == count
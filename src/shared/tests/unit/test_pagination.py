@@ -0,0 +1,91 @@
+import base64
+
+import pytest
+
+from src.shared.queries.organization import OrganizationQuery, OrganizationQueryBuilder
+from src.shared.schemas.organization import OrgIdQuery, OrgTitleQuery, GeoRadiusQuery
+from src.shared.schemas.pagination import encode_cursor, decode_cursor
+
+
+def _row(org_id: int, **extra):
+    return {
+        "org_id": org_id,
+        "org_title": f"Organization {org_id}",
+        "phones": [],
+        "office_address": "Address",
+        "categories_titles": [],
+        **extra
+    }
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor(0.25, 7)) == [0.25, 7]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all",
+    encode_cursor()[:-1] + "!",
+    "eyJhIjogMX0=",
+    encode_cursor(True),
+    base64.urlsafe_b64encode(b'[NaN]').decode(),
+    base64.urlsafe_b64encode(b'["5"]').decode(),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        OrgIdQuery(org_id=1, cursor=cursor)
+
+
+def test_page_next_cursor():
+    rows = [_row(1), _row(2), _row(3)]
+    page = OrganizationQuery._page(rows, limit=2)
+    assert [item.org_id for item in page.items] == [1, 2]
+    assert decode_cursor(page.next_cursor) == [2]
+
+    page = OrganizationQuery._page(rows, limit=3)
+    assert page.next_cursor is None
+
+
+def test_page_next_cursor_ranked():
+    rows = [_row(5, rank=0.1), _row(3, rank=0.2)]
+    page = OrganizationQuery._page(rows, limit=1)
+    assert decode_cursor(page.next_cursor) == [0.1, 5]
+
+
+async def test_cursor_does_not_match_query(builder: OrganizationQueryBuilder):
+    with pytest.raises(ValueError):
+        await builder(OrgTitleQuery(org_title="Test", cursor=encode_cursor(0.1, 5)))
+
+
+
+@pytest.mark.parametrize("query", [
+    OrgTitleQuery(org_title="Test", cursor=encode_cursor(1.5)),
+    OrgTitleQuery(org_title="Test", cursor=encode_cursor(2 ** 31)),
+    GeoRadiusQuery(geo={"lon": 37.6, "lat": 55.7}, radius=500, cursor=encode_cursor(10.0, 5.5)),
+])
+async def test_cursor_value_types(builder: OrganizationQueryBuilder, query):
+    # Значение не того типа дошло бы до базы и вернуло 500 вместо 400
+    with pytest.raises(ValueError):
+        await builder(query)
+
+def test_page_trusted_output():
+    rows = [_row(1, rank=0.1, distance_m=12.5), _row(2, rank=0.2)]
+    trusted = OrganizationQuery._page(rows, limit=1, trusted=True)
+    validated = OrganizationQuery._page(rows, limit=1)
+    assert trusted.model_dump_json() == validated.model_dump_json()
+
+
+def test_facets_rows():
+    rows = [
+        {"grouping_id": 0b0111, "top_path": "food", "category_title": None, "cell_x": None, "cell_y": None, "count": 3},
+        {"grouping_id": 0b0111, "top_path": None, "category_title": None, "cell_x": None, "cell_y": None, "count": 1},
+        {"grouping_id": 0b1011, "top_path": None, "category_title": "Кафе", "cell_x": None, "cell_y": None, "count": 2},
+        {"grouping_id": 0b1011, "top_path": None, "category_title": "Бар", "cell_x": None, "cell_y": None, "count": 5},
+        {"grouping_id": 0b1100, "top_path": None, "category_title": None, "cell_x": 3761, "cell_y": 5575, "count": 4},
+    ]
+    facets = OrganizationQuery._facets(rows, cell=0.01, limit=10)
+    assert [(facet.value, facet.count) for facet in facets.category_paths] == [("/food", 3)]
+    assert [facet.value for facet in facets.category_titles] == ["Бар", "Кафе"]
+    assert facets.geo_cells[0].min_lon == pytest.approx(37.61)
+    assert facets.geo_cells[0].max_lat == pytest.approx(55.76)
+
+    assert len(OrganizationQuery._facets(rows, cell=0.01, limit=1).category_titles) == 1
@@ -0,0 +1,82 @@
+import asyncio
+import time
+import pytest
+from sqlalchemy import NullPool, exc
+from sqlalchemy.util import greenlet_spawn
+
+from src.shared.config.settings import settings
+from src.shared.database.pool import TimedAsyncPool, pool_waiting
+from src.shared.database.profiles import pool_size, engine_params
+
+
+class _Connection:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_pool_size_per_worker():
+    # Все воркеры вместе укладываются в серверный пул PgBouncer
+    size, overflow = pool_size("pgbouncer", workers=4)
+    assert (size + overflow) * 4 <= settings.PGBOUNCER_DEFAULT_POOL_SIZE + settings.PGBOUNCER_RESERVE_POOL_SIZE
+    assert size * 4 <= settings.PGBOUNCER_DEFAULT_POOL_SIZE
+    assert pool_size("pgbouncer", workers=1000) == (1, 0)
+
+    size, overflow = pool_size("direct", workers=4)
+    assert (size + overflow) * 4 <= settings.POSTGRES_MAX_CONNECTIONS - settings.POSTGRES_RESERVED_CONNECTIONS
+    assert pool_size("direct", workers=1000) == (1, 0)
+
+
+def test_engine_params():
+    assert engine_params("test")["poolclass"] is NullPool
+
+    params = engine_params("pgbouncer")
+    assert params["poolclass"] is TimedAsyncPool
+    assert params["pool_pre_ping"] is settings.POSTGRES_POOL_PRE_PING
+    assert params["pool_recycle"] < settings.PGBOUNCER_CLIENT_IDLE_TIMEOUT
+    assert "connect_args" not in engine_params("direct")
+
+
+async def test_timed_pool_stats():
+    def checkouts(pool: TimedAsyncPool):
+        first = pool.connect()
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        first.close()
+        pool.connect().close()
+
+    pool = TimedAsyncPool(_Connection, pool_size=1, max_overflow=0, timeout=0.05)
+    await greenlet_spawn(checkouts, pool)
+    assert pool.stats.checkouts == 2
+    assert pool.stats.timeouts == 1
+    assert pool.stats.wait_seconds_max < 0.05
+    assert pool_waiting(pool) == 0
+    assert pool_waiting(NullPool(_Connection)) == 0
+
+
+async def test_timed_pool_connect_is_not_wait():
+    def connect():
+        time.sleep(0.02)
+        return _Connection()
+
+    pool = TimedAsyncPool(connect, pool_size=1, max_overflow=0, timeout=1)
+    await greenlet_spawn(lambda: pool.connect().close())
+    await greenlet_spawn(lambda: pool.connect().close())
+    # Открытие соединения не считается ожиданием слота пула
+    assert pool.stats.checkouts == 2
+    assert pool.stats.wait_seconds_max < 0.02
+    assert pool.stats.connects == 1
+    assert pool.stats.connect_seconds_total >= 0.02
+
+
+async def test_timed_pool_waiting():
+    pool = TimedAsyncPool(_Connection, pool_size=1, max_overflow=0, timeout=1)
+    held = await greenlet_spawn(pool.connect)
+    waiter = asyncio.create_task(greenlet_spawn(pool.connect))
+    await asyncio.sleep(0.01)
+    assert pool_waiting(pool) == 1
+    held.close()
+    (await waiter).close()
+    assert pool_waiting(pool) == 0
@@ -1,6 +1,10 @@
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from src.shared.queries.organization import OrganizationQueryBuilder
+from src.shared.queries.category import CategoryQuery
+from src.shared.queries.cluster import ClusterQuery
+from src.shared.schemas.cluster import GeoClusterQuery
 from src.shared.schemas.organization import (
     GeoI,
     OrganizationQueryI,
@@ -10,19 +14,151 @@ from src.shared.schemas.organization import (
     CategoryTitleQuery,
     OfficeAddressQuery,
     GeoRadiusQuery,
-    GeoBoxQuery
+    GeoBoxQuery,
+    GeoNearestQuery,
+    CompoundQuery,
+    GeoBoxI
 )
 
 @pytest.mark.parametrize("query", [
     OrgIdQuery(org_id=1),
     OrgTitleQuery(org_title="Test Organization"),
-    CategoryPathQuery(category_path="Test Category Path"),
+    CategoryPathQuery(category_path="/test/category-path"),
     CategoryTitleQuery(category_title="Test Category Title"),
     OfficeAddressQuery(office_address="Test Office Address"),
     GeoRadiusQuery(geo=GeoI(lon=1, lat=1), radius=1),
-    GeoBoxQuery(min_lon=1, min_lat=1, max_lon=2, max_lat=2)
+    GeoBoxQuery(min_lon=1, min_lat=1, max_lon=2, max_lat=2),
+    OrgTitleQuery(org_title="Test Organization", similarity=0.4),
+    CategoryTitleQuery(category_title="Test Category Title", similarity=0.4),
+    OfficeAddressQuery(office_address="Test Office Address", similarity=0.4),
+    GeoNearestQuery(geo=GeoI(lon=1, lat=1), limit=5),
+    CompoundQuery(org_title="Test", category_path="/food"),
+    CompoundQuery(
+        category_title="Test",
+        office_address="Test",
+        geo=GeoI(lon=1, lat=1),
+        radius=1000,
+        box=GeoBoxI(min_lon=1, min_lat=1, max_lon=2, max_lat=2)
+    )
 ])
 async def test_organization_query_builder(builder: OrganizationQueryBuilder, query: OrganizationQueryI):
-    result = await builder(query)
-    assert result is not None
+    stmt, params = await builder(query)
+    compiled = stmt.compile(dialect=postgresql.asyncpg.dialect())
+    # Все значения запроса приходят параметрами, в statement остаются только константы
+    assert {name for name, value in compiled.params.items() if value is None} == set(params)
 
+
+async def test_organization_query_builder_projection():
+    builder = OrganizationQueryBuilder(use_projection=True)
+    stmt, _ = await builder(CategoryPathQuery(category_path="/food"))
+    sql = str(stmt)
+    assert "FROM organization_search" in sql
+    assert "GROUP BY" not in sql
+
+
+@pytest.mark.parametrize("use_projection", [False, True])
+async def test_organization_query_builder_similarity(use_projection: bool):
+    builder = OrganizationQueryBuilder(use_projection=use_projection)
+    stmt, _ = await builder(OrgTitleQuery(org_title="Test", similarity=0.5))
+    sql = str(stmt)
+    assert "similarity(organizations.title" in sql
+    assert "ORDER BY anon_1.rank" in sql
+
+
+async def test_organization_query_builder_without_pagination(builder: OrganizationQueryBuilder):
+    stmt, params = await builder(CategoryPathQuery(category_path="/food", limit=10), paginate=False)
+    assert "LIMIT" not in str(stmt)
+    assert "limit" not in params
+
+
+async def test_organization_query_builder_statement_reuse(builder: OrganizationQueryBuilder):
+    first, first_params = await builder(OrgTitleQuery(org_title="First", limit=5))
+    second, second_params = await builder(OrgTitleQuery(org_title="Second"))
+    assert first is second
+    assert first_params == {"org_title": "First", "limit": 6}
+    assert second_params["org_title"] == "Second"
+
+    fuzzy, _ = await builder(OrgTitleQuery(org_title="First", similarity=0.5))
+    assert fuzzy is not first
+
+
+@pytest.mark.parametrize("use_projection", [False, True])
+async def test_organization_query_builder_ids(use_projection: bool):
+    builder = OrganizationQueryBuilder(use_projection=use_projection)
+    stmt = builder.ids_query()
+    assert stmt is builder.ids_query()
+    sql = str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+    assert "organizations.org_id = ANY ($1::INTEGER[])" in sql
+
+
+async def test_organization_query_builder_compound(builder: OrganizationQueryBuilder):
+    geo_title, params = await builder(CompoundQuery(org_title="Pizza", geo=GeoI(lon=1, lat=2), radius=500))
+    assert params == {"org_title": "Pizza", "lon": 1, "lat": 2, "radius": 500, "limit": 101}
+    sql = str(geo_title.compile(dialect=postgresql.asyncpg.dialect()))
+    assert "ST_DWithin" in sql
+    assert "organizations.title ILIKE" in sql
+    assert "SELECT DISTINCT" not in sql
+
+    title, _ = await builder(CompoundQuery(org_title="Pizza"))
+    assert title is not geo_title
+
+
+async def test_category_path_uses_ltree(builder: OrganizationQueryBuilder):
+    stmt, _ = await builder(CategoryPathQuery(category_path="/food/cafe"))
+    sql = str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+    assert "categories.tree <@ text2ltree(" in sql
+    assert "LIKE" not in sql
+
+
+def test_category_tree_query():
+    query = CategoryQuery()
+    sql = str(query._children.compile(dialect=postgresql.asyncpg.dialect()))
+    assert "subpath(categories.tree" in sql
+    assert "categories.tree <@ text2ltree(" in sql
+    assert "<@" not in str(query._root_children.compile(dialect=postgresql.asyncpg.dialect()))
+
+
+@pytest.mark.parametrize("path", ["food", "/food/", "/a/b/c/d", "/with space"])
+def test_category_path_validation(path):
+    with pytest.raises(ValueError):
+        CategoryPathQuery(category_path=path)
+
+
+async def test_organization_query_builder_facets(builder: OrganizationQueryBuilder):
+    stmt, params = await builder.facets(OrgTitleQuery(org_title="Test", similarity=0.5, limit=5))
+    assert "limit" not in params
+    assert params["cell"] > 0
+    sql = str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+    assert "GROUPING SETS" in sql
+    assert "LIMIT" not in sql
+
+
+async def test_organization_query_builder_facets_nearest(builder: OrganizationQueryBuilder):
+    # Фасеты ближайших соседей считаются по N ближайшим, а не по всей базе
+    stmt, params = await builder.facets(GeoNearestQuery(geo=GeoI(lon=37.6, lat=55.7), limit=5))
+    sql = str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+    assert "GROUPING SETS" in sql
+    assert "LIMIT" in sql
+    assert params["limit"] == 5
+
+
+def test_cluster_grid():
+    cluster_query = ClusterQuery(cells_per_tile=8, max_cells_per_side=32)
+    viewport = {"min_lon": 37.6, "min_lat": 55.7, "max_lon": 37.7, "max_lat": 55.8}
+    assert cluster_query.grid(GeoClusterQuery(**viewport, zoom=10)) == pytest.approx(360 / (1024 * 8))
+    assert cluster_query.grid(GeoClusterQuery(**viewport, grid=0.01)) == pytest.approx(0.01)
+    # Слишком мелкая сетка укрупняется до 32 ячеек на сторону окна
+    assert cluster_query.grid(GeoClusterQuery(**viewport, zoom=22)) == pytest.approx(0.1 / 32)
+
+    with pytest.raises(ValueError):
+        GeoClusterQuery(**viewport)
+    with pytest.raises(ValueError):
+        GeoClusterQuery(**viewport, zoom=10, grid=0.01)
+
+
+async def test_organization_query_builder_nearest_without_pagination(builder: OrganizationQueryBuilder):
+    # Поток ближайших соседей - только N ближайших, а не вся таблица geo
+    stmt, params = await builder(GeoNearestQuery(geo=GeoI(lon=37.6, lat=55.7), limit=5), paginate=False)
+    sql = str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+    assert "LIMIT" in sql
+    assert params["limit"] == 5
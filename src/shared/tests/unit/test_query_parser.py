@@ -0,0 +1,143 @@
+import json
+import pytest
+from time import perf_counter
+
+from fastapi import HTTPException
+
+from src.api.utils.query_parser import UnionQueryParser
+from src.shared.schemas.organization import (
+    OrganizationQueryI,
+    OrgTitleQuery,
+    GeoBoxQuery,
+    GeoNearestQuery,
+    CompoundQuery,
+)
+
+
+QUERIES = [
+    '{"org_id": 1}',
+    '{"org_title": "Рога и копыта", "limit": 20}',
+    '{"category_path": "/food/cafe"}',
+    '{"geo": {"lon": 37.6, "lat": 55.7}, "radius": 1000}',
+    '{"min_lon": 37.5, "min_lat": 55.6, "max_lon": 37.7, "max_lat": 55.8}',
+    '{"geo": {"lon": 37.6, "lat": 55.7}}',
+    '{"org_title": "Рога", "category_path": "/food", "office_address": "Пушкина"}',
+]
+REPEAT = 5
+ROUNDS = 2000
+
+
+def _resolve(data: dict):
+    return UnionQueryParser.resolve(OrganizationQueryI, data)
+
+
+def test_optional_fields_match():
+    assert isinstance(_resolve({"min_lon": -1, "min_lat": -2}), GeoBoxQuery)
+    assert isinstance(_resolve({"geo": {"lon": 1, "lat": 2}, "limit": 5}), GeoNearestQuery)
+
+
+def test_most_specific_schema():
+    assert isinstance(_resolve({"org_title": "a"}), OrgTitleQuery)
+    assert isinstance(_resolve({"org_title": "a", "category_path": "/a"}), CompoundQuery)
+
+
+def test_unknown_fields():
+    with pytest.raises(HTTPException) as e:
+        _resolve({"org_title": "a", "title": "b"})
+    assert e.value.status_code == 400
+
+
+def test_type_discriminator():
+    query = _resolve({"type": "CompoundQuery", "org_title": "a"})
+    assert isinstance(query, CompoundQuery)
+    assert query.org_title == "a"
+
+    for data in (
+        {"type": "Unknown", "org_title": "a"},
+        {"type": "OrgTitleQuery", "org_title": "a", "radius": 1},
+        {"type": "OrgIdQuery", "org_id": "a"},
+        {"type": ["OrgTitleQuery"], "org_title": "a"},
+        {"type": {}, "org_title": "a"},
+        {"type": None, "org_title": "a"},
+    ):
+        with pytest.raises(HTTPException) as e:
+            _resolve(data)
+        assert e.value.status_code == 400
+
+
+async def test_parser():
+    parser = UnionQueryParser.parse(OrganizationQueryI)
+    assert isinstance(await parser(query='{"org_title": "a"}'), OrgTitleQuery)
+    with pytest.raises(HTTPException) as e:
+        await parser(query='{"org_title": ')
+    assert e.value.status_code == 400
+
+
+_SCHEMAS = [
+    (
+        schema,
+        set(UnionQueryParser.get_schema_examples(schema)['required']),
+        set(UnionQueryParser.get_schema_examples(schema)['properties'])
+    )
+    for schema in OrganizationQueryI.__args__
+]
+
+
+def _legacy(query: str):
+    # Разбор без индекса: json.loads, перебор всех схем по ключам и поиск класса по имени.
+    # Повторяет алгоритм прежнего парсера, но не его код: цифры только ориентир
+    data = json.loads(query)
+    request_fields = set(data.keys())
+    matching = [
+        (schema.__name__, len(fields))
+        for schema, required, fields in _SCHEMAS
+        if required <= request_fields <= fields
+    ]
+    smallest = min(size for _, size in matching)
+    name = next(name for name, size in matching if size == smallest)
+    for schema, _, _ in _SCHEMAS:
+        if schema.__name__ == name:
+            return schema(**data)
+
+
+async def _best(parse) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        started = perf_counter()
+        for _ in range(ROUNDS):
+            for query in QUERIES:
+                await parse(query)
+        timings.append(perf_counter() - started)
+    return min(timings) / (ROUNDS * len(QUERIES))
+
+
+@pytest.mark.slow
+@pytest.mark.benchmark
+async def test_parse_benchmark():
+    """Стоимость разбора одного query: перебор схем против индекса и явного type"""
+    parser = UnionQueryParser.parse(OrganizationQueryI)
+    tagged = {
+        query: json.dumps({"type": type(_legacy(query)).__name__, **json.loads(query)})
+        for query in QUERIES
+    }
+
+    async def legacy(query: str):
+        return _legacy(query)
+
+    async def indexed(query: str):
+        return await parser(query=query)
+
+    async def typed(query: str):
+        return await parser(query=tagged[query])
+
+    for query in QUERIES:
+        assert await indexed(query) == await legacy(query) == await typed(query)
+
+    before = await _best(legacy)
+    after = await _best(indexed)
+    explicit = await _best(typed)
+    print(
+        f"\nlegacy: {before * 1e6:.1f} us/query"
+        f"\nindexed: {after * 1e6:.1f} us/query"
+        f"\ntyped: {explicit * 1e6:.1f} us/query"
+    )
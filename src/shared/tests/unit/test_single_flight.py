@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+
+from src.shared.cache.single_flight import SingleFlight
+
+
+async def test_concurrent_calls_share_execution():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(10)))
+    assert results == [1] * 10
+    assert single_flight.stats.executed == 1
+    assert single_flight.stats.coalesced == 9
+
+    assert await single_flight.do("key", fetch) == 2
+
+
+async def test_error_is_shared():
+    single_flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert single_flight.stats.executed == 1
+
+
+async def test_cancelled_leader_is_retried_by_follower():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "ok"
+
+    leader = asyncio.create_task(single_flight.do("key", slow))
+    await started.wait()
+    follower = asyncio.create_task(single_flight.do("key", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "ok"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert single_flight.stats.executed == 2
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+from sqlalchemy.dialects import postgresql
+
+from src.shared.database.explain import Explain, plan_problems
+from src.shared.queries.organization import OrganizationQuery, OrganizationQueryBuilder
+from src.shared.queries.slow import SlowQueryOrganizationQuery, SlowQueryLog
+from src.shared.schemas.organization import OrganizationPageO, CategoryPathQuery
+
+
+PLAN = [{
+    "Plan": {
+        "Node Type": "Hash Join",
+        "Join Type": "Inner",
+        "Plan Rows": 1,
+        "Actual Rows": 5000,
+        "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "works", "Plan Rows": 1000, "Actual Rows": 1200},
+            {"Node Type": "Index Scan", "Relation Name": "categories", "Plan Rows": 10, "Actual Rows": 8}
+        ]
+    }
+}]
+
+
+class _Query(OrganizationQuery):
+    """OrganizationQuery без базы: этапы find заданы заранее"""
+
+    async def find_timed(self, session, query):
+        return OrganizationPageO(items=[], next_cursor=None), {"build": 0.001, "execute": 0.9}
+
+
+class _ExplainSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt, params):
+        self.statements.append(stmt)
+        return self
+
+    def scalar_one(self):
+        return json.dumps(PLAN)
+
+    async def rollback(self):
+        pass
+
+
+def test_plan_problems():
+    seq_scans, misestimates = plan_problems(PLAN)
+    assert seq_scans == ["works"]
+    assert misestimates == ["Hash Join Inner: estimated 1, actual 5000"]
+
+
+def test_explain_compiles_with_params():
+    stmt = Explain(OrganizationQueryBuilder().ids_query())
+    compiled = stmt.compile(dialect=postgresql.asyncpg.dialect())
+    assert str(compiled).startswith("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT")
+    assert "org_ids" in compiled.params
+
+
+async def test_slow_query_recorded_and_explained():
+    explain_session = _ExplainSession()
+
+    @asynccontextmanager
+    async def session_factory():
+        yield explain_session
+
+    log = SlowQueryLog(maxsize=2)
+    slow_query = SlowQueryOrganizationQuery(
+        _Query(OrganizationQueryBuilder()),
+        log,
+        session_factory,
+        threshold=0,
+        explain_rate=1.0
+    )
+    await slow_query.find(None, CategoryPathQuery(category_path="/food"))
+    await asyncio.gather(*slow_query._explains)
+
+    [record] = log.records()
+    assert record.query_type == "CategoryPathQuery"
+    assert record.params["category_path"] == "/food"
+    assert ":category_path" in record.sql or "$1" in record.sql
+    assert record.timings["execute"] == 0.9
+    assert record.seq_scans == ["works"]
+    assert isinstance(explain_session.statements[0], Explain)
+
+    for _ in range(3):
+        await slow_query.find(None, CategoryPathQuery(category_path="/food"))
+    assert len(log.records()) == 2
+
+
+async def test_fast_query_not_recorded():
+    log = SlowQueryLog()
+    slow_query = SlowQueryOrganizationQuery(_Query(OrganizationQueryBuilder()), log, None, threshold=10)
+    await slow_query.find(None, CategoryPathQuery(category_path="/food"))
+    assert log.records() == []